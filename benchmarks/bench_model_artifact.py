@@ -0,0 +1,165 @@
+"""Benchmark loading compact (memory mapped) model artifacts against pickles.
+
+Converts the serving pickle of each league to a compact artifact in a
+temporary directory, then measures the load time in this process and the
+memory added to each of several concurrent worker processes (RSS, and PSS
+which splits shared pages between the processes mapping them): for the
+model alone (scikit-learn already imported) and including the imports the
+load needs (unpickling imports scikit-learn, the compact artifact does
+not). Memory is read from /proc, so this runs on Linux only.
+
+Usage (from the root of the project):
+
+    ENV=TEST python -m benchmarks.bench_model_artifact
+"""
+
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+import numpy as np
+
+from freekick import ESTIMATOR_LOCATION
+from freekick.datastore.util import League
+from freekick.learners.artifact import (
+    compact_artifact_dir,
+    load_compact_artifact,
+    save_compact_artifact,
+)
+from freekick.learners.compiled import compile_model
+from freekick.learners.learner_utils import MODEL_REGISTRY
+
+WORKERS = 4
+LOADS = 20
+
+
+def _memory_kb() -> dict[str, int]:
+    """Rss and Pss of this process, in kB."""
+    memory = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                memory[key] = int(value.split()[0])
+    return memory
+
+
+def _load(fmt: str, path: Path) -> Any:
+    if fmt == "pickle":
+        return joblib.load(path)
+    return load_compact_artifact(compact_artifact_dir(path))[0]
+
+
+def _worker(
+    fmt: str,
+    path: Path,
+    n_features: int,
+    preimport: bool,
+    barrier: Any,
+    results: Any,
+) -> None:
+    if preimport:
+        import sklearn.tree  # noqa: F401
+    before = _memory_kb()
+    model = _load(fmt, path)
+    # Predict on enough samples to touch most of the model's pages.
+    X = np.random.default_rng(0).normal(size=(20_000, n_features)) * 1e9
+    model.predict(X)
+    barrier.wait()  # All workers hold the model when memory is read.
+    after = _memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait()
+
+
+def _workers_memory(
+    fmt: str, path: Path, n_features: int, preimport: bool
+) -> dict[str, float]:
+    """Mean memory (MB) added to each worker by loading the model."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(WORKERS)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(fmt, path, n_features, preimport, barrier, results),
+        )
+        for _ in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    memory = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        key: statistics.mean(worker[key] for worker in memory) / 1024
+        for key in memory[0]
+    }
+
+
+def _median_secs(func: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(LOADS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _median_load_secs(fmt: str, path: Path) -> float:
+    def load() -> Any:
+        return _load(fmt, path)
+
+    return _median_secs(load)
+
+
+def run() -> None:
+    for league in League:
+        estimator = MODEL_REGISTRY.estimator_name(league)
+        source = MODEL_REGISTRY.artifact_path(league, estimator)
+        model = joblib.load(source)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / source.name
+            path.write_bytes(source.read_bytes())
+            compiled = compile_model(model)
+            if compiled is None:
+                print(f"{league.value} {estimator}: no compact artifact")
+                continue
+            save_compact_artifact(
+                model=compiled, directory=compact_artifact_dir(path)
+            )
+            size_kb = (
+                sum(
+                    f.stat().st_size
+                    for f in compact_artifact_dir(path).iterdir()
+                )
+                / 1024
+            )
+            print(
+                f"{league.value} {estimator} "
+                f"({source.relative_to(ESTIMATOR_LOCATION)}): pickle "
+                f"{path.stat().st_size / 1024:.0f} kB, compact {size_kb:.0f} kB"
+            )
+            print(f"  per worker memory, {WORKERS} concurrent workers:")
+            for fmt in ("pickle", "compact"):
+                secs = _median_load_secs(fmt, path)
+                model_only, with_imports = (
+                    _workers_memory(
+                        fmt, path, model.n_features_in_, preimport=preimport
+                    )
+                    for preimport in (True, False)
+                )
+                print(
+                    f"  {fmt:>8}: load {secs * 1e3:7.3f} ms | model RSS "
+                    f"{model_only['Rss']:6.2f} MB, PSS "
+                    f"{model_only['Pss']:6.2f} MB | with imports RSS "
+                    f"{with_imports['Rss']:6.2f} MB, PSS "
+                    f"{with_imports['Pss']:6.2f} MB"
+                )
+
+
+if __name__ == "__main__":
+    run()
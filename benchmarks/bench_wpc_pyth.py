@@ -0,0 +1,114 @@
+"""Benchmark compute_wpc_pyth against the previous row-wise implementation.
+
+Usage (from the root of the project):
+
+    ENV=TEST python -m benchmarks.bench_wpc_pyth
+"""
+
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from freekick.datastore.util import DataStore, EPLData, League
+from freekick.learners.learner_utils import compute_wpc_pyth
+
+SYNTHETIC_FACTOR = 10
+
+
+def legacy_wpc_pyth(data: pd.DataFrame) -> pd.DataFrame:
+    """Row-wise implementation compute_wpc_pyth used to run."""
+    data = data.copy()
+    data["game_count"] = 1
+    data["home_win_value"] = np.where(
+        data["result"] == 1, 1, np.where(data["result"] == 0, 0.5, 0)
+    )
+    data["away_win_value"] = np.where(
+        data["result"] == -1, 1, np.where(data["result"] == 0, 0.5, 0)
+    )
+    cols = ["game_count", "home_goal", "away_goal"]
+    home = (
+        data.groupby(["season", "home_team"])[cols + ["home_win_value"]]
+        .sum()
+        .reset_index()
+        .rename(columns={"home_team": "team"})
+    )
+    away = (
+        data.groupby(["season", "away_team"])[cols + ["away_win_value"]]
+        .sum()
+        .reset_index()
+        .rename(columns={"away_team": "team"})
+    )
+    perf = pd.merge(
+        home, away, on=["season", "team"], suffixes=("_home", "_away")
+    ).set_index(["season", "team"])
+    goals_for = perf["home_goal_home"] + perf["away_goal_away"]
+    goals_against = perf["away_goal_home"] + perf["home_goal_away"]
+    perf["win_percentage"] = (
+        perf["home_win_value"] + perf["away_win_value"]
+    ) / (perf["game_count_home"] + perf["game_count_away"])
+    perf["pyth_expectation"] = goals_for**2 / (goals_for**2 + goals_against**2)
+    for side in ["home", "away"]:
+        data[f"{side}_win_percentage"] = data.apply(
+            lambda row, s=side: perf.loc[(row["season"], row[f"{s}_team"])][
+                "win_percentage"
+            ],
+            axis=1,
+        )
+        data[f"{side}_pyth_expectation"] = data.apply(
+            lambda row, s=side: perf.loc[(row["season"], row[f"{s}_team"])][
+                "pyth_expectation"
+            ],
+            axis=1,
+        )
+    return data
+
+
+def synthetic_history(data: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Repeat the history ``factor`` times, each copy as distinct seasons."""
+    copies = []
+    for i in range(factor):
+        copy = data.copy()
+        copy["season"] = copy["season"] + i * 100_000_000
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _time(
+    func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run() -> None:
+    history = EPLData(datastore=DataStore.CSV).load()
+    datasets = {
+        "full history": history,
+        f"{SYNTHETIC_FACTOR}x synthetic": synthetic_history(
+            history, SYNTHETIC_FACTOR
+        ),
+    }
+    for name, data in datasets.items():
+        legacy, legacy_secs = _time(legacy_wpc_pyth, data)
+        vectorized, new_secs = _time(compute_wpc_pyth, data, league=League.EPL)
+        # Both keep the first game of each team, so the rows line up.
+        legacy = legacy.drop_duplicates(subset="home_team")
+        np.testing.assert_array_equal(
+            legacy["home_win_percentage"], vectorized["win_percentage"]
+        )
+        np.testing.assert_array_equal(
+            legacy["home_pyth_expectation"],
+            vectorized["pythagorean_expectation"],
+        )
+        print(
+            f"{name:>16}: {len(data):>7} games | row-wise "
+            f"{legacy_secs:8.3f}s | vectorized {new_secs:8.3f}s | "
+            f"speedup {legacy_secs / new_secs:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -1,6 +1,6 @@
 import click
 
-from freekick.service import predict_match  # noqa E402
+from freekick.service import predict_match, predict_season  # noqa E402
 from freekick.utils import __version__, _logger  # noqa E402
 
 
@@ -59,10 +59,47 @@ def match(ctx, league, home, away, attendance):
 @click.option(
     "--league", "-l", required=True, help="Football/Soccer league code"
 )
+@click.option(
+    "--simulations",
+    "-n",
+    help="Number of seasons to simulate",
+    type=click.IntRange(min=1),
+    default=10_000,
+    show_default=True,
+)
+@click.option(
+    "--from-gameweek",
+    "-g",
+    help="Simulate from this gameweek on, instead of the games left to play",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--workers",
+    "-w",
+    help="Number of processes, defaults to the number of CPUs",
+    type=click.IntRange(min=1),
+)
+@click.option("--seed", help="Seed of the random draws", type=int)
 @click.pass_context
-def season(ctx, league):
-    """Predict all the games within a league."""
-    raise NotImplementedError("Sorry, I cannot predict seasons as yet!")
+def season(ctx, league, simulations, from_gameweek, workers, seed):
+    """Predict the final standings of the current season of a league."""
+    prediction = predict_season(
+        league=league,
+        simulations=simulations,
+        from_gameweek=from_gameweek,
+        workers=workers,
+        seed=seed,
+    )
+    lines = [
+        f"{prediction.season}, {prediction.simulations} simulations",
+        f"{'Team':<6}{'Pts':>5}{'xPts':>8}{'Title':>8}{'Top 4':>8}{'Rel.':>8}",
+    ]
+    for team in prediction.teams:
+        lines.append(
+            f"{team.code:<6}{team.points:>5}{team.expected_points:>8.1f}"
+            f"{team.title:>8.1%}{team.top_four:>8.1%}{team.relegation:>8.1%}"
+        )
+    _logger.info("\n".join(lines))
 
 
 if __name__ == "__main__":
@@ -15,7 +15,7 @@ from freekick.datastore.util import (
     League,
     get_league_data_container,
 )
-from freekick.learners.learner_utils import update_wpc_pyth
+from freekick.learners.learner_utils import apply_new_results, update_wpc_pyth
 from freekick.utils import _logger
 
 UPDATE_TYPES = [
@@ -77,13 +77,22 @@ def update(data_type, league, persist, env):
             league_container = get_league_data_container(league=league)
             session = get_or_create_session()
             repo = SQLAlchemyRepository(session)
+            new_games = None
             for store in DataStore:
                 league_data = league_container(
                     datastore=store, repository=repo
                 )
-                league_data.update_current_season(persist=persist)
+                new_games = league_data.update_current_season(persist=persist)
+            if new_games is not None:
+                # Only the games not seen before, or with a corrected
+                # score, are added to the totals.
+                apply_new_results(
+                    league=League[league], games=new_games, persist=True
+                )
         case "wpc_pyth":
-            update_wpc_pyth(league=League[league], persist=True, cache=True)
+            update_wpc_pyth(
+                league=League[league], persist=True, cache=True, rebuild=True
+            )
         case _:
             raise ValueError(
                 "Invalid data_type. Please select from %s", UPDATE_TYPES
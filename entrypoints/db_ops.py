@@ -4,6 +4,9 @@ from freekick.datastore._migrate import (
     _csv_to_sqlite_migration,
     create_db,
     create_db_table,
+    create_indexes,
+    enable_wal,
+    fix_legacy_games,
 )
 
 
@@ -25,18 +28,45 @@ from freekick.datastore._migrate import (
     is_flag=True,
     default=False,
 )
+@click.option(
+    "-f",
+    "--fix-legacy-games",
+    "fix_games",
+    help="Correct games stored by older versions (before --optimize).",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "-o",
+    "--optimize",
+    help="Enable WAL and create missing indexes in DB.",
+    is_flag=True,
+    default=False,
+)
 @click.option(
     "-t",
     "--create_table",
     help="Create a single table in DB.",
 )
-def cli(create_database, recreate_database, migrate_csv_to_db, create_table):
+def cli(
+    create_database,
+    recreate_database,
+    migrate_csv_to_db,
+    fix_games,
+    optimize,
+    create_table,
+):
     if create_database:
         create_db(exists_ok=True)
     elif recreate_database:
         create_db(exists_ok=False)
     elif migrate_csv_to_db:
         _csv_to_sqlite_migration()
+    if fix_games:
+        fix_legacy_games()
+    if optimize:
+        enable_wal()
+        create_indexes()
     if create_table:
         create_db_table(create_table)
 
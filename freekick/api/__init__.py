@@ -3,8 +3,9 @@ from flask_restx import Api
 from freekick.utils import __version__
 
 from .gameweek import gameweek_ns
-from .healthcheck import HealthCheckApi
+from .healthcheck import HealthCheckApi, ReadinessApi
 from .match import match_ns
+from .metrics import MetricsApi
 from .season import season_ns
 from .settings import setting_ns
 
@@ -21,3 +22,5 @@ freekick_api.add_namespace(gameweek_ns)
 freekick_api.add_namespace(season_ns)
 freekick_api.add_namespace(setting_ns)
 freekick_api.add_resource(HealthCheckApi, "/health")
+freekick_api.add_resource(ReadinessApi, "/ready")
+freekick_api.add_resource(MetricsApi, "/metrics")
@@ -1,5 +1,6 @@
 from flask_restx import Namespace, Resource, fields, reqparse
 
+from freekick.datastore.fixtures import GameweekNotFoundError
 from freekick.service import predict_match_day
 
 gameweek_ns = Namespace("gameweek", description="Game week operations.")
@@ -14,6 +15,9 @@ gameweek_model = gameweek_ns.model(
 
 post_parser = reqparse.RequestParser()
 post_parser.add_argument("league", type=str, required=True, help="league code")
+post_parser.add_argument(
+    "gameweek", type=int, help="Gameweek, defaults to the next one to play"
+)
 
 
 @gameweek_ns.route("/")
@@ -23,5 +27,10 @@ class MatchDayApi(Resource):
     @gameweek_ns.expect(post_parser)
     def post(self):
         args = post_parser.parse_args(strict=True)
-        match_day_dto = predict_match_day(league=args["league"])
+        try:
+            match_day_dto = predict_match_day(
+                league=args["league"], gameweek=args["gameweek"]
+            )
+        except GameweekNotFoundError as e:
+            gameweek_ns.abort(404, str(e))
         return match_day_dto, 200
@@ -1,6 +1,16 @@
 from flask_restx import Resource
 
+from freekick.service.warm_up import WARM_UP
+
 
 class HealthCheckApi(Resource):
     def get(self):
         return "ok", 200
+
+
+class ReadinessApi(Resource):
+    def get(self) -> tuple[str, int]:
+        """Whether this worker is warmed up and ready to take traffic."""
+        if WARM_UP.ready:
+            return "ready", 200
+        return "warming up", 503
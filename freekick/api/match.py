@@ -1,9 +1,19 @@
 """API that calls the match_predictor service"""
 
+from typing import Any
+
 from flask_restx import Namespace, Resource, fields, reqparse
 
-from freekick.datastore.util import League
-from freekick.service import predict_match
+from freekick.datastore import READ_ONLY_REPOSITORY
+from freekick.datastore.util import DataStore, League, get_team_directory
+from freekick.service import (
+    FixtureDTO,
+    ProbabilityNotSupportedError,
+    predict_match,
+    predict_match_probabilities,
+    predict_match_probability,
+    predict_matches,
+)
 
 match_ns = Namespace("match", description="Single match operations.")
 match_model = match_ns.model(
@@ -14,6 +24,64 @@ match_model = match_ns.model(
         "predicted_winner": fields.String,
     },
 )
+outcome_model = match_ns.model(
+    "Outcome",
+    {
+        "outcome": fields.String(description="home_win, draw or away_win"),
+        "probability": fields.Float,
+    },
+)
+match_probability_model = match_ns.inherit(
+    "MatchProbability",
+    match_model,
+    {
+        "home_win": fields.Float,
+        "draw": fields.Float,
+        "away_win": fields.Float,
+        "outcomes": fields.List(
+            fields.Nested(outcome_model),
+            description="Most likely outcomes first",
+        ),
+    },
+)
+fixture_model = match_ns.model(
+    "Fixture",
+    {
+        "home_team": fields.String(
+            required=True, description="Home team code"
+        ),
+        "away_team": fields.String(
+            required=True, description="Away team code"
+        ),
+        "attendance": fields.Float(description="Approximate attendance"),
+        "match_time": fields.String(description="Match Time"),
+        "match_date": fields.String(description="Match Date"),
+    },
+)
+batch_model = match_ns.model(
+    "MatchBatch",
+    {
+        "league": fields.String(required=True, description="League code"),
+        "fixtures": fields.List(
+            fields.Nested(fixture_model), required=True, min_items=1
+        ),
+    },
+)
+batch_probability_model = match_ns.inherit(
+    "MatchBatchProbability",
+    batch_model,
+    {
+        "top_k": fields.Integer(
+            min=1, max=3, description="Only list the k most likely outcomes"
+        ),
+        "threshold": fields.Float(
+            min=0, max=1, description="Only list outcomes this likely"
+        ),
+    },
+)
+# Upper bound of fixtures per batch request, a full season of a 20 team
+# league is 380 games.
+MAX_BATCH_SIZE = 500
 
 post_parser = reqparse.RequestParser()
 post_parser.add_argument(
@@ -29,6 +97,14 @@ post_parser.add_argument(
 post_parser.add_argument("match_time", type=str, help="Match Time")
 post_parser.add_argument("match_date", type=str, help="Match Date")
 
+probability_parser = post_parser.copy()
+probability_parser.add_argument(
+    "top_k", type=int, help="Only list the k most likely outcomes"
+)
+probability_parser.add_argument(
+    "threshold", type=float, help="Only list outcomes this likely"
+)
+
 
 @match_ns.route("/")
 class MatchApi(Resource):
@@ -46,3 +122,92 @@ class MatchApi(Resource):
             match_date=args["match_date"] or None,
         )
         return match_dto, 200
+
+
+@match_ns.route("/probability")
+class MatchProbabilityApi(Resource):
+    @match_ns.doc("predict_match_probability")
+    @match_ns.marshal_with(match_probability_model)
+    @match_ns.expect(probability_parser)
+    def post(self):
+        args = probability_parser.parse_args(strict=True)
+        try:
+            match_dto = predict_match_probability(
+                league=League[args["league"].upper()],
+                home_team=args["home_team"].replace(" ", "-"),
+                away_team=args["away_team"].replace(" ", "-"),
+                attendance=args["attendance"],
+                time=args["match_time"],
+                match_date=args["match_date"] or None,
+                top_k=args["top_k"],
+                threshold=args["threshold"],
+            )
+        except ValueError as e:
+            match_ns.abort(400, str(e))
+        except ProbabilityNotSupportedError as e:
+            match_ns.abort(501, str(e))
+        return match_dto, 200
+
+
+def _parse_batch(payload: dict[str, Any]) -> tuple[League, list[FixtureDTO]]:
+    if len(payload["fixtures"]) > MAX_BATCH_SIZE:
+        match_ns.abort(400, f"At most {MAX_BATCH_SIZE} fixtures per batch.")
+    league = payload["league"].upper()
+    if league not in League.__members__:
+        match_ns.abort(400, f"Unknown league: {payload['league']}")
+    fixtures = [
+        FixtureDTO(
+            home_team=fixture["home_team"].replace(" ", "-"),
+            away_team=fixture["away_team"].replace(" ", "-"),
+            attendance=fixture.get("attendance"),
+            time=fixture.get("match_time"),
+            match_date=fixture.get("match_date") or None,
+        )
+        for fixture in payload["fixtures"]
+    ]
+    # Reject unknown teams up front rather than failing mid prediction.
+    teams = get_team_directory(
+        datastore=DataStore.DEFAULT, repository=READ_ONLY_REPOSITORY
+    ).ids(league=League[league].value)
+    unknown = [
+        f"fixtures[{i}].{side}={getattr(fixture, side)}"
+        for i, fixture in enumerate(fixtures)
+        for side in ("home_team", "away_team")
+        if getattr(fixture, side) not in teams
+    ]
+    if unknown:
+        match_ns.abort(400, f"Unknown team codes: {', '.join(unknown)}")
+    return League[league], fixtures
+
+
+@match_ns.route("/batch")
+class MatchBatchApi(Resource):
+    @match_ns.doc("predict_matches")
+    @match_ns.marshal_list_with(match_model)
+    @match_ns.expect(batch_model, validate=True)
+    def post(self):
+        league, fixtures = _parse_batch(match_ns.payload)
+        match_dtos = predict_matches(league=league, fixtures=fixtures)
+        return match_dtos, 200
+
+
+@match_ns.route("/batch/probability")
+class MatchBatchProbabilityApi(Resource):
+    @match_ns.doc("predict_match_probabilities")
+    @match_ns.marshal_list_with(match_probability_model)
+    @match_ns.expect(batch_probability_model, validate=True)
+    def post(self):
+        payload = match_ns.payload
+        league, fixtures = _parse_batch(payload)
+        try:
+            match_dtos = predict_match_probabilities(
+                league=league,
+                fixtures=fixtures,
+                top_k=payload.get("top_k"),
+                threshold=payload.get("threshold"),
+            )
+        except ValueError as e:
+            match_ns.abort(400, str(e))
+        except ProbabilityNotSupportedError as e:
+            match_ns.abort(501, str(e))
+        return match_dtos, 200
@@ -0,0 +1,8 @@
+from flask_restx import Resource
+
+from freekick.service import get_metrics
+
+
+class MetricsApi(Resource):
+    def get(self) -> tuple[dict[str, dict[str, object]], int]:
+        return get_metrics(), 200
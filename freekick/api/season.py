@@ -1,6 +1,7 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs, reqparse
 
-from freekick.service import get_current_season_teams
+from freekick.datastore.fixtures import GameweekNotFoundError
+from freekick.service import get_current_season_teams, predict_season
 
 season_ns = Namespace("season", description="Season operations")
 team_model = season_ns.model(
@@ -10,6 +11,40 @@ season_model = season_ns.model(
     "Season",
     {"season": fields.String, "teams": fields.List(fields.Nested(team_model))},
 )
+team_outlook_model = season_ns.model(
+    "TeamOutlook",
+    {
+        "code": fields.String,
+        "points": fields.Integer,
+        "expected_points": fields.Float,
+        "title": fields.Float,
+        "top_four": fields.Float,
+        "relegation": fields.Float,
+    },
+)
+season_simulation_model = season_ns.model(
+    "SeasonSimulation",
+    {
+        "season": fields.String,
+        "simulations": fields.Integer,
+        "teams": fields.List(fields.Nested(team_outlook_model)),
+    },
+)
+# Upper bound of simulations per request, about a second of CPU time.
+MAX_SIMULATIONS = 100_000
+
+simulation_parser = reqparse.RequestParser()
+simulation_parser.add_argument(
+    "simulations",
+    type=inputs.int_range(1, MAX_SIMULATIONS),
+    default=10_000,
+    help="Number of seasons to simulate",
+)
+simulation_parser.add_argument(
+    "from_gameweek",
+    type=inputs.positive,
+    help="Simulate from this gameweek on",
+)
 
 
 @season_ns.route("/<league>")
@@ -20,3 +55,26 @@ class SeasonApi(Resource):
         """Query the current season list of teams for a league."""
         season_dto = get_current_season_teams(league=league)
         return season_dto, 200
+
+
+@season_ns.route("/<league>/simulation")
+@season_ns.param("league", "League Code")
+class SeasonSimulationApi(Resource):
+    @season_ns.marshal_with(season_simulation_model)
+    @season_ns.expect(simulation_parser)
+    def get(self, league):
+        """Simulate the rest of the current season of a league."""
+        args = simulation_parser.parse_args(strict=True)
+        try:
+            simulation_dto = predict_season(
+                league=league,
+                simulations=args["simulations"],
+                from_gameweek=args["from_gameweek"],
+                # In this process, a pool per request would fork this
+                # multi threaded worker. simulation_parser caps
+                # simulations so this stays around a second.
+                workers=1,
+            )
+        except GameweekNotFoundError as e:
+            season_ns.abort(404, str(e))
+        return simulation_dto, 200
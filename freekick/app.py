@@ -5,7 +5,8 @@ from flask import Flask, render_template
 from flask_cors import CORS
 
 from freekick.api import freekick_api
-from freekick.learners.learner_utils import compute_cache_all_league_wpc_pyth
+from freekick.datastore import remove_sessions
+from freekick.service.warm_up import WARM_UP
 from freekick.utils import __version__, _logger, load_config, ensure_workspace
 
 
@@ -20,17 +21,14 @@ def _init_freekick(
     compute_wpc_pyth = False
     if init_wpc_pyth is not None:
         # If init_wpc_pyth passed, it takes priority, no need to check env
-        compute_wpc_pyth = True
+        compute_wpc_pyth = init_wpc_pyth
     else:
         compute_wpc_pyth = bool(config.get("INITIALIZE_WPC_PYTH", False))
 
-    if compute_wpc_pyth:
-        # Computing Win Percentage and Pythagorean Expectation is very expensive so
-        # lets ensure the are initially compted at launch.
-        _logger.info(
-            " Initiating Win Percentage and Pythagorean Expectation..."
-        )
-        compute_cache_all_league_wpc_pyth()
+    # Load the models and features in the background, the app reports
+    # ready (/api/ready) once done. A preloading gunicorn master waits for
+    # it before forking the workers, see gunicorn_config.py.
+    WARM_UP.start(compute_wpc_pyth=compute_wpc_pyth)
 
 
 def create_app(
@@ -56,6 +54,11 @@ def create_app(
 
     CORS(app)
 
+    @app.teardown_appcontext
+    def release_db_sessions(exception: Optional[BaseException]) -> None:
+        # Return each request's database sessions to the engine pool.
+        remove_sessions()
+
     @app.route("/")
     @app.route("/home")
     def welcome():
@@ -1,54 +1,100 @@
 import os
-from typing import Optional
+import threading
+from functools import partial
 
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import Session
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, scoped_session
 
 from freekick.utils import load_config
-from .repository import SQLAlchemyRepository
+from .engine import create_db_engine
+from .repository import ScopedSQLAlchemyRepository, create_scoped_session
 from .util import DATA_UTIL, League
 
 
-DEFAULT_SESSION: Optional[Session] = None
+# Nothing connects to the database on import, the engine and sessions are
+# created on first use.
 DEFAULT_ENGINE: Engine | None = None
-CFG: dict = load_config(environ=os.environ.get("ENV"))
-DB_URL: str = str(CFG["DATABASE_URL"])
+_SCOPED_SESSIONS: dict[bool, scoped_session[Session]] = {}
+_LOCK = threading.RLock()
 
 
-# TODO: Think about making this session a callable so we only create sessions
-# when needed instead of always having a session connected
 # Sessions and repos should only be instantiated in DB mode.
 def get_or_create_session() -> Session:
-    """Get existing or create a new Database Session."""
-    global DEFAULT_SESSION
-    if DEFAULT_SESSION:
-        return DEFAULT_SESSION
+    """Get the current thread's Database Session."""
+    return get_scoped_session()()
 
-    DEFAULT_SESSION = Session(get_or_create_engine())
-    return DEFAULT_SESSION
+
+def get_scoped_session(read_only: bool = False) -> scoped_session[Session]:
+    """Get existing or create a new thread local Database Session registry.
+
+    :param read_only: Registry of read-only sessions, defaults to False.
+    """
+    with _LOCK:
+        if read_only not in _SCOPED_SESSIONS:
+            _SCOPED_SESSIONS[read_only] = create_scoped_session(
+                engine=get_or_create_engine(), read_only=read_only
+            )
+        return _SCOPED_SESSIONS[read_only]
+
+
+def remove_sessions() -> None:
+    """Release the current thread's sessions, e.g at the end of a request."""
+    for registry in _SCOPED_SESSIONS.values():
+        registry.remove()
 
 
 def get_or_create_engine() -> Engine:
-    """Get existing or create a new Database Session."""
+    """Get existing or create a new Database Engine."""
     global DEFAULT_ENGINE
-    if DEFAULT_ENGINE:
+    with _LOCK:
+        if DEFAULT_ENGINE:
+            return DEFAULT_ENGINE
+
+        config = load_config(environ=os.environ.get("ENV"))
+        DEFAULT_ENGINE = create_db_engine(
+            str(config["DATABASE_URL"]),
+            pool_size=5,
+            max_overflow=10,
+            pool_timeout=10,
+        )
         return DEFAULT_ENGINE
 
-    DEFAULT_ENGINE = create_engine(
-        DB_URL,
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=10,
-    )
-    return DEFAULT_ENGINE
+
+def dispose_engine(close: bool = True) -> None:
+    """Release the engine's pooled connections, it opens new ones on use.
+
+    Call it in a process forked from one that used the database (e.g. a
+    gunicorn worker forked from a preloading master) with close=False:
+    the inherited connections belong to the parent, the child must
+    neither use nor close them.
+
+    :param close: Close the pooled connections and the current thread's
+        sessions, defaults to True. If False, they are only dropped.
+    """
+    with _LOCK:
+        if close:
+            remove_sessions()
+        else:
+            for registry in _SCOPED_SESSIONS.values():
+                registry.registry.clear()
+        if DEFAULT_ENGINE:
+            DEFAULT_ENGINE.dispose(close=close)
 
 
-DEFAULT_REPOSITORY = SQLAlchemyRepository(get_or_create_session())
+DEFAULT_REPOSITORY = ScopedSQLAlchemyRepository(get_scoped_session)
+# For code paths that only read, e.g predictions.
+READ_ONLY_REPOSITORY = ScopedSQLAlchemyRepository(
+    partial(get_scoped_session, read_only=True)
+)
 
 __all__ = [
     "DATA_UTIL",
+    "dispose_engine",
     "get_or_create_engine",
     "get_or_create_session",
+    "get_scoped_session",
+    "remove_sessions",
     "DEFAULT_REPOSITORY",
+    "READ_ONLY_REPOSITORY",
     "League",
 ]
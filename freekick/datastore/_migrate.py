@@ -1,15 +1,19 @@
+from datetime import date
+from typing import Any
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, bindparam, delete, func, select, text, update
 from sqlalchemy.orm import Session
 
 from freekick import DATA_DIR
+from freekick.datastore.engine import create_db_engine
 from freekick.datastore.repository import SQLAlchemyRepository
-from freekick.datastore.util import DBUtils
+from freekick.datastore.util import DATA_VERSION, DBUtils, League
 
-from .model import Base
+from .model import GAME_NATURAL_KEY, Base, Game
 
 DB_PATH = DATA_DIR / "freekick.db"
-ENGINE = create_engine(f"sqlite:///{str(DB_PATH)}")
+ENGINE = create_db_engine(f"sqlite:///{str(DB_PATH)}")
 REPOSITORY = SQLAlchemyRepository(Session(ENGINE))
 
 
@@ -34,30 +38,191 @@ def create_db_table(table_name: str) -> None:
     Base.metadata.tables["pyth_wpc"].create(ENGINE)
 
 
-def _csv_to_sqlite_migration(engine=ENGINE):
-    """Copy over data from csv, read csv and create models"""
+def enable_wal(engine: Engine = ENGINE) -> None:
+    """Switch the database to write-ahead logging, persisted in the file."""
+    with engine.connect() as connection:
+        mode = connection.execute(text("PRAGMA journal_mode=WAL")).scalar()
+    print(f"Journal mode: {mode}")
+
+
+def create_indexes(engine: Engine = ENGINE) -> None:
+    """Create the indexes declared on the models that are missing.
+
+    Databases created before an index was declared do not have it. Run
+    `fix_legacy_games` on those created before the game natural key first.
+    """
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+                print(f"Index ready: {index.name}")
+        # Refresh the statistics the query planner chooses indexes with.
+        connection.execute(text("ANALYZE"))
+
+
+def _load_games_from_csv() -> pd.DataFrame:
+    game_csv = DATA_DIR / "processed" / "epl.csv"
+    return pd.read_csv(game_csv).dropna(how="all")
+
+
+def _swap_day_month(day: date) -> date:
+    return day.replace(month=day.day, day=day.month) if day.day <= 12 else day
+
+
+def fix_legacy_games(engine: Engine = ENGINE) -> None:
+    """Correct the games stored by older versions, a one-off migration.
 
-    def load_teams_from_csv():
+    Older versions stored each game with its home and away team swapped
+    and parsed football-data's day first dates month first, so games
+    played on a day up to 12 have their day and month swapped too, e.g.
+    11/08/2023 stored as 2023-11-08. Each stored game is matched to the
+    fixture of the processed CSV (re-stitched with day first dates) of
+    the same league, season, teams either way round and score, played on
+    the stored date read either way. Matched games get the fixture's
+    teams and date; games matching no fixture, or several, are left as
+    is. Games then stored twice are dropped, keeping the latest, so the
+    unique natural key index can be created. Running it again changes
+    nothing.
+    """
+    with Session(engine) as session:
+        repository = SQLAlchemyRepository(session)
+        fixtures: dict[tuple[Any, ...], list[tuple[str, str, date]]] = {}
+        for fixture in DBUtils.create_game_records(
+            df=_load_games_from_csv(), repository=repository, league=League.EPL
+        ).itertuples(index=False):
+            teams = frozenset((fixture.home_team, fixture.away_team))
+            fixtures.setdefault(
+                (
+                    fixture.league,
+                    fixture.season,
+                    teams,
+                    fixture.home_goal,
+                    fixture.away_goal,
+                ),
+                [],
+            ).append((fixture.home_team, fixture.away_team, fixture.date))
+        stored = session.execute(
+            select(
+                Game.id,
+                Game.league,
+                Game.season,
+                Game.home_team,
+                Game.away_team,
+                Game.home_goal,
+                Game.away_goal,
+                Game.date,
+            ).order_by(Game.id.desc())
+        ).all()
+        kept = set()
+        fixes = []
+        stale = []
+        unmatched = 0
+        for game in stored:
+            teams = frozenset((game.home_team, game.away_team))
+            key = (
+                game.league,
+                game.season,
+                teams,
+                game.home_goal,
+                game.away_goal,
+            )
+            matches = [
+                (home, away, day)
+                for home, away, day in fixtures.get(key, [])
+                if game.date in (day, _swap_day_month(day))
+            ]
+            if len(matches) != 1:
+                unmatched += 1
+                kept.add(
+                    (
+                        game.league,
+                        game.season,
+                        game.date,
+                        game.home_team,
+                        game.away_team,
+                    )
+                )
+                continue
+            home, away, day = matches[0]
+            natural_key = (game.league, game.season, day, home, away)
+            if natural_key in kept:
+                # Also stored as a later row.
+                stale.append(game.id)
+                continue
+            kept.add(natural_key)
+            if (home, away, day) != (
+                game.home_team,
+                game.away_team,
+                game.date,
+            ):
+                fixes.append(
+                    {
+                        "game_id": game.id,
+                        "home": home,
+                        "away": away,
+                        "day": day,
+                    }
+                )
+        connection = session.connection()
+        connection.execute(delete(Game).where(Game.id.in_(stale)))
+        if fixes:
+            connection.execute(
+                update(Game)
+                .where(Game.id == bindparam("game_id"))
+                .values(
+                    home_team=bindparam("home"),
+                    away_team=bindparam("away"),
+                    date=bindparam("day"),
+                ),
+                fixes,
+            )
+        natural_key_columns = [getattr(Game, col) for col in GAME_NATURAL_KEY]
+        latest = select(func.max(Game.id)).group_by(*natural_key_columns)
+        dropped = len(stale) + (
+            connection.execute(
+                delete(Game).where(Game.id.not_in(latest))
+            ).rowcount
+        )
+        session.commit()
+    print(
+        f"Fixed {len(fixes)} games, dropped {dropped} duplicates, left "
+        f"{unmatched} games matching no single fixture of the CSV as is."
+    )
+    if fixes or dropped:
+        DATA_VERSION.bump()
+
+
+def _csv_to_sqlite_migration(
+    engine: Engine = ENGINE, chunk_size: int = 1000
+) -> None:
+    """Copy over data from csv, in bulk.
+
+    Teams are inserted first, then games in chunks of chunk_size, each
+    chunk committed on its own. Rows that already exist (matched on the
+    team code and the game natural key) are skipped, so an interrupted
+    migration resumes by running it again.
+    """
+
+    def load_teams_from_csv() -> pd.DataFrame:
         team_csv = DATA_DIR / "processed" / "team.csv"
         return pd.read_csv(team_csv)
 
-    def load_games_from_csv():
-        game_csv = DATA_DIR / "processed" / "epl.csv"
-        return pd.read_csv(game_csv).dropna(how="all")
-
+    Base.metadata.create_all(bind=engine)
     with Session(engine) as session:
-        # Populate teams
+        repository = SQLAlchemyRepository(session)
+        # Populate teams, committed so games can resolve team codes.
         teams_df = load_teams_from_csv()
-        teams_models = DBUtils.create_team_model(df=teams_df)
-        session.add_all(teams_models)
-        # Initial commit needed here so DBUtils.create_game_model can query
-        # team codes
-        session.commit()
+        DBUtils.upsert_teams(teams=teams_df, repository=repository)
+        print(f"Migrated {len(teams_df)} teams")
 
         # Populate games
-        games_df = load_games_from_csv()
-        games_models = DBUtils.create_game_model(
-            df=games_df, repository=REPOSITORY
+        games = DBUtils.create_game_records(
+            df=_load_games_from_csv(), repository=repository, league=League.EPL
         )
-        session.add_all(games_models)
-        session.commit()
+        for start in range(0, len(games), chunk_size):
+            chunk = games.iloc[start : start + chunk_size]
+            DBUtils.upsert_games(
+                games=chunk, repository=repository, update=False
+            )
+            print(f"Migrated games {start + len(chunk)}/{len(games)}")
+        DATA_VERSION.bump()
@@ -0,0 +1,40 @@
+from typing import Any
+
+from sqlalchemy import Engine, create_engine, event
+
+# Applied to every new SQLite connection. WAL, which lets readers (e.g.
+# gunicorn workers) run while a writer (e.g. the data maintainer) commits,
+# is a persistent property of the database file instead, see
+# _migrate.enable_wal.
+# - synchronous=NORMAL is durable with WAL, syncing at checkpoints only.
+# - mmap_size/cache_size keep the (small) database in memory.
+# - busy_timeout waits for a competing writer instead of failing at once.
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,  # 256MB
+    "cache_size": -65536,  # In KiB, 64MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str, **kwargs: Any) -> Engine:
+    """Create an engine, tuned with SQLITE_PRAGMAS for SQLite databases.
+
+    :param url: Database URL
+    :param kwargs: Passed on to sqlalchemy.create_engine
+    :return: Database engine
+    """
+    engine = create_engine(url, **kwargs)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
@@ -0,0 +1,242 @@
+"""Fixtures of the current season, grouped by gameweek.
+
+Fixtures are read from the league's raw football-data season file (played
+and scheduled games) and, when present, a local ``fixtures.csv`` in the
+same format (e.g. https://www.football-data.co.uk/fixtures.csv) holding the
+games still to be played.
+"""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from freekick import DATA_DIR
+
+from .repository import AbstractRepository
+from .util import DATA_VERSION, DataStore, League, Season, get_team_directory
+
+FIXTURES_FILE_NAME = "fixtures.csv"
+# football-data division code of each league.
+LEAGUE_DIVISION = {League.EPL: "E0"}
+FIXTURE_COLUMNS = [
+    "Div",
+    "Date",
+    "Time",
+    "HomeTeam",
+    "AwayTeam",
+    "FTHG",
+    "FTAG",
+]
+
+
+class GameweekNotFoundError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Fixtures:
+    """Fixtures of a league's season, indexed by gameweek.
+
+    :param version: Version of the sources the fixtures were loaded from.
+    :param data: One row per game: gameweek, date, time, home_team,
+        away_team (team codes), home_goal, away_goal and played.
+    :param gameweeks: Games of each gameweek, slices of data.
+    :param current: First gameweek with games left to play, the last
+        gameweek once the season is over.
+    """
+
+    version: tuple[int, ...]
+    data: pd.DataFrame
+    gameweeks: dict[int, pd.DataFrame]
+    current: int
+
+    def gameweek(self, gameweek: Optional[int] = None) -> pd.DataFrame:
+        """Games of a gameweek.
+
+        :param gameweek: Gameweek number, defaults to the current gameweek.
+        :raises GameweekNotFoundError: Raised when there is no such gameweek.
+        :return: Games of the gameweek.
+        """
+        gameweek = self.current if gameweek is None else gameweek
+        try:
+            return self.gameweeks[gameweek]
+        except KeyError:
+            raise GameweekNotFoundError(
+                f"Gameweek {gameweek} not found, expected 1 to "
+                f"{len(self.gameweeks)}."
+            ) from None
+
+
+def season_file_name(season: Season) -> str:
+    """Name of the raw football-data file of a season."""
+    return f"season_{season.value.removeprefix('S_').replace('_', '-')}.csv"
+
+
+def assign_gameweeks(
+    home_teams: pd.Series, away_teams: pd.Series
+) -> np.ndarray:  # type: ignore [type-arg]
+    """Gameweek of each game, games ordered by kick off.
+
+    football-data has no round numbers, so gameweeks are matchdays: runs
+    of consecutive games in which no team plays twice. A rearranged game
+    falls in the matchday it is played in, which can leave a season with a
+    few more (and smaller) gameweeks than rounds.
+
+    :param home_teams: Home team of each game.
+    :param away_teams: Away team of each game.
+    :return: Gameweek (from 1) of each game, aligned with the teams.
+    """
+    gameweeks = np.empty(len(home_teams), dtype="int64")
+    gameweek = 1
+    teams: set[str] = set()
+    for i, (home, away) in enumerate(zip(home_teams, away_teams, strict=True)):
+        if home in teams or away in teams:
+            gameweek += 1
+            teams.clear()
+        teams.update((home, away))
+        gameweeks[i] = gameweek
+    return gameweeks
+
+
+class FixtureStore:
+    """Fixtures of the current season per league, held in memory.
+
+    Reloaded when the source files change or DATA_VERSION is bumped (new
+    teams or games), so serving a gameweek is a dict lookup.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fixtures: dict[tuple[League, Season], Fixtures] = {}
+        self._lock = threading.Lock()
+
+    def _sources(self, league: League, season: Season) -> list[Path]:
+        sources = [
+            self.path / league.value / season_file_name(season),
+            self.path / league.value / FIXTURES_FILE_NAME,
+        ]
+        return [source for source in sources if source.is_file()]
+
+    def version(
+        self, league: League, season: Season = Season.CURRENT
+    ) -> tuple[int, ...]:
+        """Version of the fixtures, changes with any of their sources."""
+        return (
+            DATA_VERSION.current(),
+            *(
+                source.stat().st_mtime_ns
+                for source in self._sources(league=league, season=season)
+            ),
+        )
+
+    def load(
+        self,
+        league: League,
+        season: Season = Season.CURRENT,
+        datastore: DataStore = DataStore.DEFAULT,
+        repository: Optional[AbstractRepository] = None,
+    ) -> Fixtures:
+        """Fixtures of a league's season, from memory when up to date.
+
+        :param league: League of the fixtures.
+        :param season: Season of the fixtures, defaults to Season.CURRENT
+        :param datastore: DataStore the teams are looked up in.
+        :param repository: Repository, required if DataStore.DATABASE
+        :raises GameweekNotFoundError: Raised when there are no fixtures.
+        :return: Fixtures of the season.
+        """
+        version = self.version(league=league, season=season)
+        fixtures = self._fixtures.get((league, season))
+        if fixtures is not None and fixtures.version == version:
+            return fixtures
+        with self._lock:
+            fixtures = self._fixtures.get((league, season))
+            if fixtures is None or fixtures.version != version:
+                fixtures = self._read(
+                    league=league,
+                    season=season,
+                    version=version,
+                    datastore=datastore,
+                    repository=repository,
+                )
+                self._fixtures[(league, season)] = fixtures
+        return fixtures
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fixtures.clear()
+
+    def _read(
+        self,
+        league: League,
+        season: Season,
+        version: tuple[int, ...],
+        datastore: DataStore,
+        repository: Optional[AbstractRepository],
+    ) -> Fixtures:
+        frames = [
+            pd.read_csv(
+                source,
+                usecols=lambda col: col in FIXTURE_COLUMNS,
+                dtype={"Time": "object"},
+            )
+            for source in self._sources(league=league, season=season)
+        ]
+        if not frames:
+            raise GameweekNotFoundError(
+                f"No fixtures found for {league} {season.value} in "
+                f"{self.path / league.value}."
+            )
+        games = pd.concat(frames, ignore_index=True).reindex(
+            columns=FIXTURE_COLUMNS
+        )
+        games = games[
+            games["Div"].isna() | (games["Div"] == LEAGUE_DIVISION[league])
+        ]
+        games = games.dropna(subset=["HomeTeam", "AwayTeam", "Date"])
+        # Each pairing is played once a season, results come first so they
+        # win over the same game in the fixtures file.
+        games = games.drop_duplicates(
+            subset=["HomeTeam", "AwayTeam"], keep="first"
+        )
+        teams = get_team_directory(datastore=datastore, repository=repository)
+        data = pd.DataFrame(
+            {
+                "date": pd.to_datetime(
+                    games["Date"], dayfirst=True, format="mixed"
+                ),
+                "time": games["Time"].fillna("13:30"),
+                "home_team": teams.codes_for_names(
+                    league.value, games["HomeTeam"]
+                ),
+                "away_team": teams.codes_for_names(
+                    league.value, games["AwayTeam"]
+                ),
+                "home_goal": games["FTHG"].astype("float64"),
+                "away_goal": games["FTAG"].astype("float64"),
+                "played": games["FTHG"].notna() & games["FTAG"].notna(),
+            }
+        )
+        data = data.sort_values(["date", "time"], kind="stable")
+        data = data.reset_index(drop=True)
+        data.insert(
+            0,
+            "gameweek",
+            assign_gameweeks(data["home_team"], data["away_team"]),
+        )
+        gameweeks = {
+            int(gameweek): games.reset_index(drop=True)
+            for gameweek, games in data.groupby("gameweek", sort=True)
+        }
+        unplayed = data.loc[~data["played"], "gameweek"]
+        current = int(unplayed.min()) if len(unplayed) else max(gameweeks)
+        return Fixtures(
+            version=version, data=data, gameweeks=gameweeks, current=current
+        )
+
+
+FIXTURE_STORE = FixtureStore(path=DATA_DIR / "raw")
@@ -1,10 +1,13 @@
 import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 STRING_LENGTH = 50
+# Columns identifying a game, used to upsert games.
+GAME_NATURAL_KEY = ["league", "season", "date", "home_team", "away_team"]
+GAME_NATURAL_KEY_INDEX = "ix_game_natural_key"
 
 
 class Base(DeclarativeBase):
@@ -13,6 +16,11 @@ class Base(DeclarativeBase):
 
 class Game(Base):
     __tablename__ = "game"
+    __table_args__ = (
+        # Also serves (covers, for DBUtils.get_teams) league and
+        # league/season lookups through its leading columns.
+        Index(GAME_NATURAL_KEY_INDEX, *GAME_NATURAL_KEY, unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     home_team: Mapped[str] = mapped_column(ForeignKey("team.code"))
@@ -55,6 +63,7 @@ class PythWpc(Base):
     """Table representing Pythagorean Expectation and Win Percentage"""
 
     __tablename__ = "pyth_wpc"
+    __table_args__ = (Index("ix_pyth_wpc_league_season", "league", "season"),)
 
     pyth_wpc_id: Mapped[str] = mapped_column(primary_key=True)
     team_code: Mapped[str]
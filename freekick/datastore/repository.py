@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+    scoped_session,
+    sessionmaker,
+)
+
+
+class ReadOnlySessionError(Exception):
+    """Raised when writing through a read-only session."""
+
+    pass
 
 
 class AbstractRepository(ABC):
@@ -54,6 +66,72 @@ class SQLAlchemyRepository(AbstractRepository):
         self.session.commit()
 
 
+def _reject_flush(session: Session, *args: Any) -> None:
+    raise ReadOnlySessionError("Cannot flush changes in a read-only session.")
+
+
+def _reject_writes(orm_execute_state: ORMExecuteState) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        raise ReadOnlySessionError(
+            "Cannot execute writes in a read-only session."
+        )
+
+
+def create_scoped_session(
+    engine: Engine, read_only: bool = False
+) -> scoped_session[Session]:
+    """Registry handing out one session per thread, from the engine pool.
+
+    :param engine: Engine the sessions connect through.
+    :param read_only: Reject flushes and INSERT/UPDATE/DELETE statements,
+        defaults to False.
+    :return: Thread local session registry.
+    """
+    factory = sessionmaker(bind=engine, autoflush=not read_only)
+    if read_only:
+        event.listen(factory, "before_flush", _reject_flush)
+        event.listen(factory, "do_orm_execute", _reject_writes)
+    return scoped_session(factory)
+
+
+class ScopedSQLAlchemyRepository(SQLAlchemyRepository):
+    """SQLAlchemy Repository using the current thread's session.
+
+    Safe to share between threads (e.g. gunicorn threads and background
+    refreshes): each thread works with its own session from the registry,
+    released by `remove` (e.g. on Flask app context teardown).
+    """
+
+    def __init__(
+        self,
+        registry: scoped_session[Session]
+        | Callable[[], scoped_session[Session]],
+    ) -> None:
+        """
+        :param registry: Session registry, or a function returning it that
+            is called on first use, so nothing connects until needed.
+        """
+        self._registry = registry
+
+    @property
+    def registry(self) -> scoped_session[Session]:
+        if not isinstance(self._registry, scoped_session):
+            self._registry = self._registry()
+        return self._registry
+
+    @property
+    def session(self) -> Session:
+        return self.registry()
+
+    def remove(self) -> None:
+        """Close the current thread's session, returning its connection."""
+        self.registry.remove()
+
+
 class MockRepository(AbstractRepository):
     def __init__(self) -> None:
         pass
@@ -1,25 +1,38 @@
+import fcntl
+import hashlib
+import os
+import tempfile
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from functools import cache, partial
-from typing import Iterable, Optional, Any
+from functools import cache, wraps
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Any, TypeVar
 from pathlib import Path
 
-import dask.dataframe as dd
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from dateutil.parser import parse
-from sqlalchemy import select
+from sqlalchemy import Connection, func, select
 
 from freekick import DATA_DIR
-from freekick.utils import _logger
-
-from .model import Game, PythWpc, Team
+from freekick.utils import APP_WORKSPACE_DIR, _logger
+
+from .model import (
+    GAME_NATURAL_KEY,
+    GAME_NATURAL_KEY_INDEX,
+    Game,
+    PythWpc,
+    Team,
+)
 from .repository import AbstractRepository
 
+if TYPE_CHECKING:
+    # Scraping and raw data stitching dependencies are slow to import, so
+    # they are imported where used.
+    from bs4 import BeautifulSoup
+
+T = TypeVar("T")
+
 
 class TeamNotFoundError(Exception):
     pass
@@ -125,6 +138,170 @@ def fix_team_name(name: str) -> str:
             return name
 
 
+class DataVersion:
+    """Counter of data updates, shared by processes through a workspace file.
+
+    Writers `bump` it after changing games or teams in any datastore.
+    Long running processes (e.g. gunicorn workers) compare it on each cached
+    load, see `cache_by_data_version`, instead of serving data cached before
+    the update until restarted.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def current(self) -> int:
+        try:
+            return int(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = self.path.with_name(f".{self.path.name}.lock")
+        with open(lock_file, "a") as lock:
+            # Exclusive until closed, so concurrent bumps are not lost.
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            version = self.current() + 1
+            # Write a temporary file of our own then rename it, so readers
+            # never see a partial file.
+            with tempfile.NamedTemporaryFile(
+                mode="w",
+                dir=self.path.parent,
+                prefix=f".{self.path.name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as tmp_file:
+                tmp_file.write(str(version))
+            try:
+                os.replace(tmp_file.name, self.path)
+            except OSError:
+                os.unlink(tmp_file.name)
+                raise
+        _logger.info(f"Data version bumped to {version}")
+        return version
+
+
+DATA_VERSION = DataVersion(path=APP_WORKSPACE_DIR / "data_version")
+
+
+def cache_by_data_version(func: Callable[..., T]) -> Callable[..., T]:
+    """Like functools.cache, but cleared whenever DATA_VERSION changes."""
+    cached = cache(func)
+    cached_version: list[int] = []
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        version = DATA_VERSION.current()
+        if cached_version != [version]:
+            cached.cache_clear()
+            cached_version[:] = [version]
+        return cached(*args, **kwargs)
+
+    wrapper.cache_clear = cached.cache_clear  # type: ignore [attr-defined]
+    return wrapper
+
+
+def parse_game_dates(dates: pd.Series) -> pd.Series:
+    """Parse game dates, day first as in football-data files (dd/mm/yy).
+
+    ISO dates (yyyy-mm-dd), e.g. of processed files, are parsed as such.
+
+    :param dates: Dates to parse.
+    :return: Parsed dates.
+    """
+    iso = dates.astype(str).str.match(r"\d{4}-\d{2}-\d{2}")
+    return pd.to_datetime(dates.where(iso), format="ISO8601").fillna(
+        pd.to_datetime(dates.where(~iso), dayfirst=True, format="mixed")
+    )
+
+
+class TeamDirectory:
+    """In memory index of teams by name, code and id.
+
+    Built once from the teams of a datastore (code, name, league, team_id)
+    so a whole column of games is resolved with vectorized lookups instead
+    of a query or scan per row.
+    """
+
+    def __init__(self, teams: pd.DataFrame) -> None:
+        _validate_cols(
+            columns=teams.columns,
+            expected_columns={"code", "name", "league", "team_id"},
+        )
+        teams = teams.drop_duplicates(subset="code", keep="last").astype(
+            {"code": str, "name": str, "league": str, "team_id": "int64"}
+        )
+        self._code_by_name: dict[str, pd.Series] = {
+            league: pd.Series(
+                group["code"].to_numpy(), index=group["name"].to_numpy()
+            )
+            for league, group in teams.groupby("league")
+        }
+        self._id_by_code = pd.Series(
+            teams["team_id"].to_numpy(), index=teams["code"].to_numpy()
+        )
+        self._code_by_id = pd.Series(
+            teams["code"].to_numpy(), index=teams["team_id"].to_numpy()
+        )
+        self._league_by_code = pd.Series(
+            teams["league"].to_numpy(), index=teams["code"].to_numpy()
+        )
+
+    def __len__(self) -> int:
+        return len(self._id_by_code)
+
+    @staticmethod
+    def _map(values: pd.Series, index: pd.Series, kind: str) -> pd.Series:
+        mapped = values.map(index)
+        missing = sorted(map(str, values[mapped.isna()].unique()))
+        if missing:
+            raise TeamNotFoundError(f"Team {kind} not found for {missing}.")
+        return mapped.astype(index.dtype)
+
+    def codes_for_names(self, league: str, names: pd.Series) -> pd.Series:
+        """Team codes for full team names, after fix_team_name aliasing.
+
+        :param league: League code
+        :param names: Full names of the teams
+        :raises TeamNotFoundError: Raised when any team is not found.
+        :return: Team codes, aligned with names.
+        """
+        # Alias each distinct name once rather than once per game.
+        aliases = {name: fix_team_name(name) for name in names.unique()}
+        index = self._code_by_name.get(league, pd.Series(dtype=str))
+        return self._map(names.map(aliases), index, kind="code")
+
+    def ids(self, league: Optional[str] = None) -> dict[str, int]:
+        """Team id of each team code.
+
+        :param league: League code, only the league's teams when given.
+        :return: Team id by team code.
+        """
+        ids = self._id_by_code
+        if league is not None:
+            ids = ids[self._league_by_code == league]
+        return {str(code): int(team_id) for code, team_id in ids.items()}
+
+    def ids_for_codes(self, codes: pd.Series) -> pd.Series:
+        """Team ids for team codes.
+
+        :param codes: Team codes
+        :raises TeamNotFoundError: Raised when any team is not found.
+        :return: Team ids, aligned with codes.
+        """
+        return self._map(codes, self._id_by_code, kind="ID")
+
+    def codes_for_ids(self, team_ids: pd.Series) -> pd.Series:
+        """Team codes for team ids.
+
+        :param team_ids: Team ids
+        :raises TeamNotFoundError: Raised when any team is not found.
+        :return: Team codes, aligned with team_ids.
+        """
+        return self._map(team_ids, self._code_by_id, kind="code")
+
+
 class DataUtils(ABC):
     @abstractmethod
     def get_team_code(self, *args: Any, **kwargs: Any) -> str:
@@ -138,6 +315,10 @@ class DataUtils(ABC):
     def add_teams(self, teams: list[Team], *args: Any, **kwargs: Any) -> None:
         pass
 
+    @abstractmethod
+    def load_teams(self, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        pass
+
     def add_or_update_wpc_pyth(
         self,
         data: pd.DataFrame,
@@ -170,7 +351,9 @@ class DataUtils(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def load_wpc_pyth(self, league: League, season: Season) -> pd.DataFrame:
+    def load_wpc_pyth(
+        self, league: League, season: Season, *args: Any, **kwargs: Any
+    ) -> pd.DataFrame:
         raise NotImplementedError()
 
     @staticmethod
@@ -292,6 +475,49 @@ class DBUtils(DataUtils):
             teams.append(team)
         return teams
 
+    @staticmethod
+    def create_game_records(
+        df: pd.DataFrame,
+        repository: AbstractRepository,
+        league: League = League.EPL,
+    ) -> pd.DataFrame:
+        """Map raw game data (football-data columns) to game table rows.
+
+        :param df: DataFrame with game data
+        :param repository: Repository to use for db operations
+        :param league: League of the games, defaults to League.EPL
+        :return: One row per game, with the game table's columns. Missing
+            values are None so rows can be passed to the DB as is.
+        """
+        df = df.dropna(subset=["AwayTeam", "HomeTeam"])
+        # Convert team names to team codes
+        teams = get_team_directory(
+            datastore=DataStore.DATABASE, repository=repository
+        )
+        if "Attendance" in df.columns:
+            attendance = df["Attendance"].fillna(0).astype("int64")
+        else:
+            attendance = pd.Series(0, index=df.index)
+        games = pd.DataFrame(
+            {
+                "home_team": teams.codes_for_names(
+                    league.value, df["HomeTeam"]
+                ),
+                "away_team": teams.codes_for_names(
+                    league.value, df["AwayTeam"]
+                ),
+                "home_goal": df["FTHG"].fillna(0).astype("int64"),
+                "away_goal": df["FTAG"].fillna(0).astype("int64"),
+                "league": league.value,
+                "date": parse_game_dates(df["Date"]).dt.date,
+                "time": df["Time"],
+                "attendance": attendance,
+                "season": df["season"],
+                "result": df["FTR"],
+            }
+        )
+        return games.astype(object).where(games.notna(), None)
+
     @staticmethod
     def create_game_model(
         df: pd.DataFrame, repository: AbstractRepository
@@ -302,66 +528,121 @@ class DBUtils(DataUtils):
         :param repository: Repository to use for db operations
         :return: List of DB ORM Game models
         """
-        team_code = partial(
-            DBUtils.get_team_code, repository=repository, league="epl"
+        records = DBUtils.create_game_records(df=df, repository=repository)
+        return [Game(**record) for record in records.to_dict("records")]
+
+    @staticmethod
+    def upsert_games(
+        games: pd.DataFrame,
+        repository: AbstractRepository,
+        update: bool = True,
+    ) -> int:
+        """Insert games, or update those already stored, in bulk.
+
+        Games are matched on their natural key, GAME_NATURAL_KEY, with a
+        single INSERT ... ON CONFLICT statement.
+
+        :param games: Game table rows, see `create_game_records`.
+        :param repository: Repository to use for db operations
+        :param update: Update scores, time, attendance and result of games
+            that already exist, defaults to True. Otherwise keep them as is.
+        :return: Number of games written.
+        """
+        _validate_repository_for_db(repository)
+        if games.empty:
+            return 0
+        DBUtils.create_game_natural_key(repository.session.connection())
+        _bulk_upsert(
+            repository=repository,
+            model=Game,
+            data=games,
+            key=GAME_NATURAL_KEY,
+            update_columns=(
+                [col for col in games.columns if col not in GAME_NATURAL_KEY]
+                if update
+                else []
+            ),
         )
-        df = df.dropna(subset=["AwayTeam", "HomeTeam"])
-        games = []
-        df["Date"] = pd.to_datetime(df["Date"], format="mixed")
-        df["FTHG"] = df["FTHG"].fillna(0).astype("int64")
-        df["FTAG"] = df["FTAG"].fillna(0).astype("int64")
-        if "Attendance" in df.columns:
-            df["Attendance"] = df["Attendance"].fillna(0).astype("int64")
-        else:
-            df["Attendance"] = 0
-        # Convert team names to team codes
-        df["AwayTeam"] = df["AwayTeam"].apply(lambda x: team_code(team_name=x))
-        df["HomeTeam"] = df["HomeTeam"].apply(lambda x: team_code(team_name=x))
-        for _, series in df.iterrows():
-            game = Game(
-                home_team=series["AwayTeam"],
-                away_team=series["HomeTeam"],
-                home_goal=series["FTHG"],
-                away_goal=series["FTAG"],
-                league="epl",
-                date=series["Date"],
-                time=series["Time"],
-                attendance=series["Attendance"],
-                season=series["season"],
-                result=series["FTR"],
-            )
-            games.append(game)
-        return games
+        return len(games)
+
+    @staticmethod
+    def create_game_natural_key(connection: Connection) -> None:
+        """Create the game natural key index, if missing.
+
+        Databases created before the natural key existed do not have it.
+        The index is unique, so their games need the `fix_legacy_games`
+        migration (`db_ops --fix-legacy-games`) first.
+
+        :param connection: Connection to the database, in a transaction.
+        """
+        for index in Game.__table__.indexes:  # type: ignore [attr-defined]
+            if index.name == GAME_NATURAL_KEY_INDEX:
+                index.create(connection, checkfirst=True)
 
+    @staticmethod
     def add_teams(
-        self, teams: list[Team], repository: AbstractRepository, **kwargs: Any
+        teams: list[Team], repository: AbstractRepository, **kwargs: Any
     ) -> None:
         for instance in teams:
             repository.add(instance)
         repository.commit()
+        DATA_VERSION.bump()
+
+    @staticmethod
+    def upsert_teams(
+        teams: pd.DataFrame, repository: AbstractRepository
+    ) -> int:
+        """Insert teams in bulk, leaving teams whose code exists as is.
+
+        :param teams: DataFrame with code, name, league and team_id columns.
+        :param repository: Repository to use for db operations
+        :return: Number of teams written.
+        """
+        _validate_repository_for_db(repository)
+        written = _bulk_upsert(
+            repository=repository,
+            model=Team,
+            data=teams[["code", "name", "league", "team_id"]],
+            key=["code"],
+            update_columns=[],
+        )
+        DATA_VERSION.bump()
+        return written
+
+    @staticmethod
+    def load_teams(
+        repository: AbstractRepository, **kwargs: Any
+    ) -> pd.DataFrame:
+        """Load all teams in one query.
+
+        :param repository: Repository to use for db operations
+        :return: DataFrame with code, name, league and team_id columns.
+        """
+        _validate_repository_for_db(repository)
+        return pd.read_sql_query(
+            select(Team),
+            con=repository.session.get_bind(),
+        )
 
-    def _create_pyth_wpc_model(self, df: pd.DataFrame) -> list[PythWpc]:
-        """Create PythWpc models from a DataFrame object.
+    @staticmethod
+    def _create_pyth_wpc_records(df: pd.DataFrame) -> pd.DataFrame:
+        """Map wpc/pyth values to pyth_wpc table rows.
 
         :param df: Data to parse.
-        :return: List of PythWpc objects
+        :return: One row per pyth_wpc_id, with the pyth_wpc table's columns.
         """
-        if df.empty:
-            return []
-
-        pyth_wpc_list = []
-        for _, row in df.iterrows():
-            model = PythWpc(
-                pyth_wpc_id=row["pyth_wpc_id"],
-                team_code=row["team"],
-                season=row["season"],
-                league=row["league"],
-                win_percentage=row["win_percentage"],
-                pythagorean_expectation=row["pythagorean_expectation"],
-                last_update=row["last_update"],
-            )
-            pyth_wpc_list.append(model)
-        return pyth_wpc_list
+        return pd.DataFrame(
+            {
+                "pyth_wpc_id": df["pyth_wpc_id"],
+                # Team ids and seasons are stored as text.
+                "team_code": df["team"].astype(str),
+                "season": df["season"].astype(str),
+                "league": df["league"],
+                "win_percentage": df["win_percentage"],
+                "pythagorean_expectation": df["pythagorean_expectation"],
+                "last_update": pd.to_datetime(df["last_update"]),
+            }
+        ).drop_duplicates(subset="pyth_wpc_id", keep="last")
 
     def update_wpc_pyth(
         self,
@@ -371,25 +652,56 @@ class DBUtils(DataUtils):
     ) -> None:
         _logger.info("Updating WPC and PYTH for %s", self.__class__.__name__)
         _logger.info("Persisting wpc_pyth for league: %s", league)
-        models: list[PythWpc] = self._create_pyth_wpc_model(data)
-        for model in models:
-            db_model = repository.get(PythWpc, model.pyth_wpc_id)
-            if db_model:
-                # update instead. We only want to update some attrs
-                for attr in {
-                    "win_percentage",
-                    "pythagorean_expectation",
-                    "last_update",
-                }:
-                    setattr(db_model, attr, getattr(model, attr))
-            else:
-                # add new
-                repository.add(model)
-        repository.commit()
-        _logger.info("WPC/PYTH update completed successfully!")
+        _validate_repository_for_db(repository)
+        # Existing entries only get their values updated.
+        written = _bulk_upsert(
+            repository=repository,
+            model=PythWpc,
+            data=self._create_pyth_wpc_records(data),
+            key=["pyth_wpc_id"],
+            update_columns=[
+                "win_percentage",
+                "pythagorean_expectation",
+                "last_update",
+            ],
+        )
+        _logger.info(f"WPC/PYTH update completed successfully! ({written})")
 
-    def load_wpc_pyth(self, league: League, season: Season) -> pd.DataFrame:
-        raise NotImplementedError
+    def load_wpc_pyth(
+        self,
+        league: League,
+        season: Season,
+        repository: Optional[AbstractRepository] = None,
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        """Load persisted win percentage and pythagorean expectation.
+
+        :param league: League to load for.
+        :param season: Season to load for.
+        :param repository: Repository to use for db operations.
+        :raises ValueError: Raised when no entry exists for league and season.
+        :return: One row per team, in the format compute_wpc_pyth returns.
+        """
+        _validate_repository_for_db(repository)
+        statement = (
+            select(PythWpc)
+            .where(PythWpc.league == league.value)
+            .where(PythWpc.season == str(season_to_int(season)))
+        )
+        data = pd.read_sql_query(
+            statement,
+            con=repository.session.get_bind(),  # type: ignore [union-attr]
+            parse_dates=["last_update"],
+        )
+        if data.empty:
+            raise ValueError(
+                f"WPC-PYTH entry not found for league {league} and season "
+                f"{season}. Was wpc_pyth previously computed?"
+            )
+        # Team ids and seasons are stored as text.
+        return data.rename(columns={"team_code": "team"}).astype(
+            {"team": "int64", "season": "int64"}
+        )
 
 
 class CSVUtils(DataUtils):
@@ -442,13 +754,18 @@ class CSVUtils(DataUtils):
 
         file_path = str(DATA_DIR / "processed" / "team.csv")
         teams_df.to_csv(file_path, index=False)
+        DATA_VERSION.bump()
 
     @staticmethod
-    @cache
+    @cache_by_data_version
     def load_teams_csv() -> pd.DataFrame:
         file_path = str(DATA_DIR / "processed" / "team.csv")
         return pd.read_csv(file_path)
 
+    @staticmethod
+    def load_teams(*args: Any, **kwargs: Any) -> pd.DataFrame:
+        return CSVUtils.load_teams_csv()
+
     def update_wpc_pyth(
         self, data: pd.DataFrame, league: League, *args: Any, **kwargs: Any
     ) -> None:
@@ -458,9 +775,11 @@ class CSVUtils(DataUtils):
         data.to_csv(file_path, index=False)
         _logger.info("WPC/PYTH update complete!")
 
-    def load_wpc_pyth(self, league: League, season: Season) -> pd.DataFrame:
+    def load_wpc_pyth(
+        self, league: League, season: Season, *args: Any, **kwargs: Any
+    ) -> pd.DataFrame:
         file_path = self.wpc_pyth_base_path / f"{league.value}_wpc_pyth.csv"
-        data = pd.read_csv(file_path)
+        data = pd.read_csv(file_path, parse_dates=["last_update"])
         season_int = season_to_int(season.value)
         data = data[data["season"] == season_int]
         if data.empty:
@@ -479,6 +798,19 @@ class DataStore(Enum):
 
 DATA_UTIL = DataStore.DEFAULT.value
 
+
+@cache_by_data_version
+def get_team_directory(
+    datastore: DataStore, repository: Optional[AbstractRepository] = None
+) -> TeamDirectory:
+    """TeamDirectory of a datastore, loaded once per data version.
+
+    :param datastore: Datastore to load the teams from.
+    :param repository: Repository, required for DataStore.DATABASE.
+    :return: Directory of all the datastore's teams.
+    """
+    return TeamDirectory(datastore.value.load_teams(repository=repository))
+
 COLUMNS = {
     "Date": "date",
     "Time": "time",
@@ -497,7 +829,7 @@ LEAGUE_URI_LOOKUP = {
 }
 
 
-@cache
+@cache_by_data_version
 def load_csv(*args: Any, **kwargs: Any) -> pd.DataFrame:
     return pd.read_csv(*args, **kwargs)  # type: ignore [no-any-return]
 
@@ -513,7 +845,7 @@ class DataScraper:
         self.league: League = league
 
     def _parse_team_rating_request(
-        self, soup: BeautifulSoup, type: str
+        self, soup: "BeautifulSoup", type: str
     ) -> pd.DataFrame:
         """Parse a BS4 object for team or player rating data.
 
@@ -621,6 +953,9 @@ class DataScraper:
         _logger.info(
             f"Scraping {self.league} '{data_type}' data from {team_rating_uri}"
         )
+        import requests
+        from bs4 import BeautifulSoup
+
         with requests.Session() as session:
             page = session.get(url=team_rating_uri)
         page.raise_for_status()
@@ -657,7 +992,7 @@ class BaseData(ABC):
         pass
 
     @abstractmethod
-    def update_current_season(self) -> None:
+    def update_current_season(self) -> Optional[pd.DataFrame]:
         pass
 
     @abstractmethod
@@ -690,7 +1025,8 @@ class BaseData(ABC):
         X["result"] = np.where(
             X["result"] == "A", -1, np.where(X["result"] == "H", 1, 0)
         )
-        X["date"] = pd.to_datetime(X["date"])
+        # Raw football-data dates are day first, e.g. 13/08/2023.
+        X["date"] = parse_game_dates(X["date"])
         X["day_of_week"] = X["date"].dt.day_of_week
         X = X.dropna(
             subset=[
@@ -705,20 +1041,13 @@ class BaseData(ABC):
         X["time"] = pd.to_datetime(X["time"].fillna("13:30"), format="mixed")
         X["attendance"] = X["attendance"].fillna(0)
 
-        team_code = partial(
-            self.datastore.value.get_team_code,
-            league.value,
-            repository=self.repository,
-        )
-        if should_convert_team_name_to_code:
-            X["home_team"] = X["home_team"].apply(team_code)
-            X["away_team"] = X["away_team"].apply(team_code)
-        X["home_team"] = X["home_team"].apply(
-            self.datastore.value.get_team_id, repository=self.repository
-        )
-        X["away_team"] = X["away_team"].apply(
-            self.datastore.value.get_team_id, repository=self.repository
+        teams = get_team_directory(
+            datastore=self.datastore, repository=self.repository
         )
+        for col in ["home_team", "away_team"]:
+            if should_convert_team_name_to_code:
+                X[col] = teams.codes_for_names(league.value, X[col])
+            X[col] = teams.ids_for_codes(X[col])
         X["season"] = X["season"].apply(
             lambda x: int(x.removeprefix("S_").replace("_", ""))
         )
@@ -738,6 +1067,8 @@ class BaseData(ABC):
             If specified, new data file will be saved, by default False
         """
 
+        import dask.dataframe as dd
+
         dir_path = DATA_DIR / "raw" / league.value
 
         _logger.info(str(dir_path) + "/season*.csv")
@@ -748,7 +1079,7 @@ class BaseData(ABC):
             usecols=list(COLUMNS.keys()),
             skip_blank_lines=True,
         ).compute()
-        df["Date"] = pd.to_datetime(df["Date"], format="mixed")
+        df["Date"] = parse_game_dates(df["Date"])
         df["HomeTeam"] = df["HomeTeam"].apply(fix_team_name)
         df["AwayTeam"] = df["AwayTeam"].apply(fix_team_name)
         df = df.reset_index(drop=True)
@@ -756,6 +1087,7 @@ class BaseData(ABC):
             file_path = DATA_DIR / "processed" / f"{league.value}.csv"
             _logger.info(f"Persisting data: {file_path}")
             df.to_csv(file_path, index=False)
+            DATA_VERSION.bump()
         _logger.info(f"df.shape: {df.shape}")
 
     def load_wpc_pyth(self, league: League, season: Season) -> pd.DataFrame:
@@ -769,10 +1101,58 @@ def _validate_repository_for_db(repository: AbstractRepository | None) -> None:
             f"{DataStore.DATABASE.name}!"
         )
 
-@cache
+def _bulk_upsert(
+    repository: AbstractRepository,
+    model: type[Any],
+    data: pd.DataFrame,
+    key: list[str],
+    update_columns: list[str],
+) -> int:
+    """Insert rows, or update the ones whose key exists, in one statement.
+
+    :param repository: Repository to use for db operations
+    :param model: ORM model of the table to write to.
+    :param data: Rows to write, with the table's column names.
+    :param key: Primary key or columns of a unique index to match rows on.
+    :param update_columns: Columns to update on existing rows, if empty
+        existing rows are left as is.
+    :raises NotImplementedError: Raised for databases without upserts.
+    :return: Number of rows written.
+    """
+    if data.empty:
+        return 0
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    session = repository.session
+    statement: Any
+    match session.get_bind().dialect.name:
+        case "sqlite":
+            statement = sqlite.insert(model)
+        case "postgresql":
+            statement = postgresql.insert(model)
+        case dialect:
+            raise NotImplementedError(
+                f"Bulk upserts are not supported for {dialect} yet..."
+            )
+    if update_columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=key,
+            set_={col: statement.excluded[col] for col in update_columns},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=key)
+    records = data.astype(object).where(data.notna(), None)
+    session.execute(statement, records.to_dict("records"))
+    repository.commit()
+    return len(data)
+
+
+@cache_by_data_version
 def _do_load_data(league: League, datastore: DataStore, repository: AbstractRepository, path: Path) -> pd.DataFrame:
     """Load data from DataStore."""
 
+    from dateutil.parser import parse
+
     def clean_date(d: Any) -> datetime | float:
         """varying date formats so parse date in consistent format"""
         return parse(d) if isinstance(d, str) else np.nan
@@ -802,6 +1182,161 @@ def _do_load_data(league: League, datastore: DataStore, repository: AbstractRepo
 
     return data
 
+# Bump whenever _clean_format_data output changes so cached frames built by
+# the previous version are not served.
+CLEANED_DATA_FORMAT = 1
+
+
+def _source_fingerprint(
+    league: League,
+    datastore: DataStore,
+    repository: Optional[AbstractRepository],
+    path: Path,
+) -> str:
+    """Hash of the source data a cleaned league frame is built from.
+
+    CSV files are hashed whole. For the database, the league's game count,
+    last id, goal/attendance sums and date range are hashed, which changes
+    on inserts as well as on in place updates of results. Teams are part of
+    the source since cleaning maps team names/codes to ids.
+    """
+    digest = hashlib.sha256(
+        f"{CLEANED_DATA_FORMAT}:{league.value}:{datastore.name}".encode()
+    )
+    match datastore:
+        case DataStore.CSV:
+            digest.update((path / f"{league.value}.csv").read_bytes())
+        case DataStore.DATABASE:
+            _validate_repository_for_db(repository)
+            statement = select(
+                func.count(Game.id),
+                func.max(Game.id),
+                func.sum(Game.home_goal),
+                func.sum(Game.away_goal),
+                func.sum(Game.attendance),
+                func.min(Game.date),
+                func.max(Game.date),
+            ).where(Game.league == league.value)
+            session = repository.session  # type: ignore [union-attr]
+            row = tuple(session.execute(statement).one())
+            digest.update(repr(row).encode())
+        case _:
+            raise NotImplementedError(
+                f"Cannot fingerprint datastore '{datastore}' yet..."
+            )
+    teams = datastore.value.load_teams(repository=repository)
+    digest.update(pd.util.hash_pandas_object(teams, index=False).to_numpy())
+    return digest.hexdigest()[:16]
+
+
+def _cached_source_fingerprint(
+    league: League,
+    datastore: DataStore,
+    repository: Optional[AbstractRepository],
+    path: Path,
+) -> str:
+    """`_source_fingerprint`, computed again only once DATA_VERSION changes
+    or, for CSV, the file's modification time or size does."""
+    stamp = None
+    if datastore == DataStore.CSV:
+        stat = (path / f"{league.value}.csv").stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    return _stamped_source_fingerprint(
+        league=league,
+        datastore=datastore,
+        repository=repository,
+        path=path,
+        stamp=stamp,
+    )
+
+
+@cache_by_data_version
+def _stamped_source_fingerprint(
+    league: League,
+    datastore: DataStore,
+    repository: Optional[AbstractRepository],
+    path: Path,
+    stamp: Optional[tuple[int, int]],
+) -> str:
+    # stamp is only part of the cache key.
+    return _source_fingerprint(
+        league=league, datastore=datastore, repository=repository, path=path
+    )
+
+
+class CleanedDataCache:
+    """Parquet files of cleaned league data, keyed by a source fingerprint.
+
+    One file per league and datastore is kept; a file whose key no longer
+    matches the source is a miss and is replaced on the next `put`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    @staticmethod
+    def _prefix(league: League, datastore: DataStore) -> str:
+        return f"{league.value}_{datastore.name.lower()}"
+
+    def _file(self, league: League, datastore: DataStore, key: str) -> Path:
+        return self.path / f"{self._prefix(league, datastore)}_{key}.parquet"
+
+    def get(
+        self, league: League, datastore: DataStore, key: str
+    ) -> Optional[pd.DataFrame]:
+        file_path = self._file(league=league, datastore=datastore, key=key)
+        if not file_path.exists():
+            return None
+        try:
+            data = pd.read_parquet(file_path)
+        except (OSError, ValueError) as e:
+            _logger.warning(f"Ignoring unreadable cache {file_path}: {e}")
+            return None
+        # Parquet has no second resolution datetimes, restore exact dtypes.
+        return data.astype(data.attrs.pop("dtypes", {}))
+
+    def put(
+        self,
+        league: League,
+        datastore: DataStore,
+        key: str,
+        data: pd.DataFrame,
+    ) -> None:
+        file_path = self._file(league=league, datastore=datastore, key=key)
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            data = data.copy(deep=False)
+            data.attrs["dtypes"] = {
+                col: str(dtype) for col, dtype in data.dtypes.items()
+            }
+            # Write a temporary file of our own then rename it, so readers
+            # never see a partial file and concurrent writers don't clash.
+            tmp_file = tempfile.NamedTemporaryFile(
+                dir=self.path,
+                prefix=f".{file_path.name}.",
+                suffix=".tmp",
+                delete=False,
+            )
+            try:
+                with tmp_file:
+                    data.to_parquet(tmp_file)
+                os.replace(tmp_file.name, file_path)
+            except BaseException:
+                os.unlink(tmp_file.name)
+                raise
+            # Only drop stale files once the new one is in place.
+            prefix = self._prefix(league, datastore)
+            for old in self.path.glob(f"{prefix}_*.parquet"):
+                if old != file_path:
+                    old.unlink(missing_ok=True)
+        except OSError as e:
+            # The cache is an optimization, loading works without it.
+            _logger.warning(f"Unable to cache cleaned data {file_path}: {e}")
+
+
+CLEANED_DATA_CACHE = CleanedDataCache(path=APP_WORKSPACE_DIR / "cleaned")
+
+
 class EPLData(BaseData):
     def __init__(
         self,
@@ -815,30 +1350,56 @@ class EPLData(BaseData):
         self.env = env
         self.league = League.EPL
         self.repository = repository
-        self.datastore = datastore
+        self.datastore: DataStore = datastore
         if self.datastore == DataStore.DATABASE and not self.repository:
             raise ValueError(
                 "Repository is required when using DataStore.DATABASE"
             )
 
     def load(self) -> pd.DataFrame:
-        """Load EPL data from DataStore."""
-        data = _do_load_data(
+        """Load cleaned EPL data, from the cleaned data cache when the
+        DataStore's data has not changed since it was cached."""
+        key = _cached_source_fingerprint(
             league=self.league,
             datastore=self.datastore,
             repository=self.repository,
-            path=self._processed_data_path
+            path=self._processed_data_path,
         )
+        data = CLEANED_DATA_CACHE.get(
+            league=self.league, datastore=self.datastore, key=key
+        )
+        if data is None:
+            data = self.clean_format_data(
+                data=_do_load_data(
+                    league=self.league,
+                    datastore=self.datastore,
+                    repository=self.repository,
+                    path=self._processed_data_path,
+                )
+            )
+            CLEANED_DATA_CACHE.put(
+                league=self.league,
+                datastore=self.datastore,
+                key=key,
+                data=data,
+            )
+        return data
 
-        return self.clean_format_data(data=data)
-
-    def update_current_season(self, persist: bool = False) -> None:
+    def update_current_season(
+        self, persist: bool = False
+    ) -> Optional[pd.DataFrame]:
         """Get the latest data for the season.
 
         Parameters
         ----------
         persist : bool, optional
             If True. persists updated data to d_location, by default False
+
+        Returns
+        -------
+        pd.DataFrame or None
+            The cleaned season games when persisted so callers can apply
+            them incrementally (e.g. to wpc/pyth totals), otherwise None.
         """
         season = Season.CURRENT.value
         _logger.info(
@@ -874,35 +1435,24 @@ class EPLData(BaseData):
                 case DataStore.DATABASE:
                     _validate_repository_for_db(self.repository)
                     _logger.info("Updating Database...")
-                    # Create game models
-                    models_to_add = set()
-                    game_models = DBUtils.create_game_model(
-                        df=season_data,
+                    written = DBUtils.upsert_games(
+                        games=DBUtils.create_game_records(
+                            df=season_data,
+                            repository=self.repository,  # type: ignore [arg-type]
+                            league=self.league,
+                        ),
                         repository=self.repository,  # type: ignore [arg-type]
                     )
-                    for model in game_models:
-                        stmt = select(Game).where(
-                            Game.season == model.season,
-                            Game.league == model.league,
-                            Game.home_team == model.home_team,
-                            Game.away_team == model.away_team,
-                            Game.date == model.date,
-                        )
-                        scalar = self.repository.session.scalars(  # type: ignore [union-attr]
-                            stmt
-                        ).one_or_none()
-                        # does not exists in db so add
-                        if not scalar:
-                            models_to_add.add(model)
-                    if models_to_add:
-                        self.repository.session.add_all(list(models_to_add))  # type: ignore[union-attr]
-                        self.repository.session.commit()  # type: ignore[union-attr]
+                    _logger.info(f"Upserted {written} games.")
+                    DATA_VERSION.bump()
                 case _:
                     raise NotImplementedError
+            return self.clean_format_data(data=season_data)
         else:
             _logger.info(
                 f"persist={persist}, not persisting changes in {self.datastore}!"
             )
+        return None
 
     def clean_format_data(self, data: pd.DataFrame) -> pd.DataFrame:
         return self._clean_format_data(X=data, league=self.league)
@@ -1,4 +1,5 @@
 import os
+from typing import Any
 
 workers = int(os.environ.get("GUNICORN_PROCESSES", "1"))
 threads = int(os.environ.get("GUNICORN_THREADS", "4"))
@@ -6,3 +7,47 @@ timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
 bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8080")
 forwarded_allow_ips = "*"
 secure_scheme_headers = {"X-Forwarded-Proto": "https"}
+# Load the app (models, team directory, features) once in the master, the
+# workers forked from it share the warm caches copy-on-write.
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Seconds a worker waits for its warm up before taking traffic anyway.
+WARM_UP_TIMEOUT = float(os.environ.get("GUNICORN_WARM_UP_TIMEOUT", "300"))
+
+
+def when_ready(server: Any) -> None:
+    """Master, before forking the workers."""
+    if not server.cfg.preload_app:
+        return
+    from freekick.datastore import dispose_engine
+    from freekick.service.warm_up import WARM_UP
+
+    # No warm up thread may be running (and holding locks) at fork time.
+    WARM_UP.wait()
+    # The master does not serve requests, close its database connections
+    # so the workers do not inherit them.
+    dispose_engine()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    """Worker, just forked from the master."""
+    if not server.cfg.preload_app:
+        return
+    from freekick.datastore import dispose_engine
+
+    # Never use nor close database connections inherited from the master.
+    dispose_engine(close=False)
+
+
+def post_worker_init(worker: Any) -> None:
+    """Worker, app loaded: gate traffic on the warm up (instant if preloaded)."""
+    from freekick.service.warm_up import WARM_UP
+
+    if not WARM_UP.wait(timeout=WARM_UP_TIMEOUT, heartbeat=worker.notify):
+        worker.log.warning(
+            "Warm up not done after %ss, taking traffic anyway.",
+            WARM_UP_TIMEOUT,
+        )
@@ -1,12 +1,12 @@
 from freekick.learners.learner_utils import (
-    serial_models,
+    MODEL_REGISTRY,
     AllEstimator,
     DEFAULT_ESTIMATOR,
 )
 from .classification import FreekickDecisionTreeClassifier
 
 __all__ = [
-    "serial_models",
+    "MODEL_REGISTRY",
     "AllEstimator",
     "DEFAULT_ESTIMATOR",  # TODO: Remove all use of DEFAULT_ESTIMATOR, use specific estimators
     "FreekickDecisionTreeClassifier"
@@ -0,0 +1,167 @@
+"""Compact, self-describing model artifacts.
+
+A compiled model (see ``compiled.py``) is saved as a directory of flat
+``.npy`` arrays (tree node tables or coefficients) and a ``manifest.json``
+describing them, the features and dtypes the model expects and how it was
+trained::
+
+    epl_FreekickDecisionTreeClassifier/
+        manifest.json
+        threshold.<version>.npy
+        ...
+
+Arrays are loaded with ``mmap_mode="r"``: nothing is deserialized, and the
+workers of a host map the same file pages instead of each holding a private
+copy. Array files are named after the version and the manifest is replaced
+last, so a reader sees the old or the new artifact, never a mix.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .compiled import CompiledLinear, CompiledModel, CompiledTree
+
+ARTIFACT_FORMAT = "freekick-compact"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+_KINDS: dict[str, type[CompiledModel]] = {  # type: ignore [valid-type]
+    "tree": CompiledTree,
+    "linear": CompiledLinear,
+}
+
+
+class ArtifactFormatError(Exception):
+    pass
+
+
+def compact_artifact_dir(model_path: Path) -> Path:
+    """Compact artifact directory of a ``.pkl`` model path."""
+    return model_path.with_suffix("")
+
+
+def _kind(model: CompiledModel) -> str:
+    for kind, cls in _KINDS.items():
+        if isinstance(model, cls):
+            return kind
+    raise ArtifactFormatError(f"Unsupported model: {type(model).__name__}")
+
+
+def save_compact_artifact(
+    model: CompiledModel,
+    directory: Path,
+    metadata: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """Save a compiled model as arrays and a manifest.
+
+    :param model: Compiled model.
+    :param directory: Artifact directory, created if missing.
+    :param metadata: Training metadata to keep in the manifest, e.g. the
+        features with their dtypes and the training data fingerprint.
+    :return: The manifest.
+    """
+    arrays: dict[str, np.ndarray] = {}  # type: ignore [type-arg]
+    params: dict[str, Any] = {}
+    for field in fields(model):
+        value = getattr(model, field.name)
+        if isinstance(value, np.ndarray):
+            arrays[field.name] = np.ascontiguousarray(value)
+        else:
+            params[field.name] = (
+                list(value) if field.name == "features" else value
+            )
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    for name, array in arrays.items():
+        digest.update(name.encode())
+        digest.update(array.dtype.str.encode())
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    version = digest.hexdigest()[:12]
+
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for name, array in arrays.items():
+        file_name = f"{name}.{version}.npy"
+        if not (directory / file_name).exists():
+            # Never rewritten in place, other processes may have it mapped.
+            tmp_path = directory / f".{file_name}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(tmp_path, directory / file_name)
+        files[name] = {
+            "file": file_name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "kind": _kind(model),
+        "version": version,
+        "params": params,
+        "arrays": files,
+        "metadata": metadata or {},
+    }
+    tmp_path = directory / f".{MANIFEST_FILE_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2, default=str))
+    os.replace(tmp_path, directory / MANIFEST_FILE_NAME)
+
+    # Arrays of previous versions. Processes that mapped them keep their
+    # pages until they unmap them.
+    current = {entry["file"] for entry in files.values()}
+    for path in directory.glob("*.npy"):
+        if path.name not in current:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return manifest
+
+
+def load_compact_artifact(
+    directory: Path, mmap: bool = True
+) -> tuple[CompiledModel, dict[str, Any]]:
+    """Load a compiled model saved by save_compact_artifact.
+
+    :param directory: Artifact directory.
+    :param mmap: Memory map the arrays (read only) instead of reading them,
+        defaults to True.
+    :raises ArtifactFormatError: Raised when the manifest is not a
+        supported compact artifact or an array does not match it.
+    :return: The compiled model and its manifest.
+    """
+    manifest = json.loads((directory / MANIFEST_FILE_NAME).read_text())
+    if (
+        manifest.get("format") != ARTIFACT_FORMAT
+        or manifest.get("format_version", 0) > ARTIFACT_FORMAT_VERSION
+        or manifest.get("kind") not in _KINDS
+    ):
+        raise ArtifactFormatError(
+            f"Unsupported model artifact in {directory}: "
+            f"{manifest.get('format')} v{manifest.get('format_version')} "
+            f"({manifest.get('kind')})."
+        )
+    arrays: dict[str, Any] = {}
+    for name, entry in manifest["arrays"].items():
+        array = np.load(
+            directory / entry["file"],
+            mmap_mode="r" if mmap else None,
+            allow_pickle=False,
+        )
+        if array.dtype.str != entry["dtype"] or list(array.shape) != list(
+            entry["shape"]
+        ):
+            raise ArtifactFormatError(
+                f"{entry['file']} does not match the manifest of {directory}."
+            )
+        # A plain ndarray view, still backed by the mapped file.
+        arrays[name] = np.asarray(array)
+    params = dict(manifest["params"])
+    params["features"] = tuple(params.get("features", ()))
+    model = _KINDS[manifest["kind"]](**arrays, **params)
+    return model, manifest
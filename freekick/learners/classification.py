@@ -1,17 +1,22 @@
 """Classification Models for Freekick predictions."""
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional
 
-import joblib
 import pandas as pd
-from sklearn.base import BaseEstimator
-from sklearn.tree import DecisionTreeClassifier
 
 from freekick import ESTIMATOR_LOCATION
 from freekick.datastore.util import Backend, League
 from freekick.utils import _logger
 from freekick.utils.freekick_config import coerce_env_dir_name
 
+from .registry import save_model_artifact
+
+if TYPE_CHECKING:
+    # scikit-learn is slow to import, estimators import it when initialized.
+    from sklearn.base import BaseEstimator
+    from sklearn.tree import DecisionTreeClassifier
+
 
 class BaseClassifier(ABC):
     def __init__(self, league: League) -> None:
@@ -23,7 +28,7 @@ class BaseClassifier(ABC):
             raise ValueError("self.init_model() must return an estimator!!")
 
     @abstractmethod
-    def init_model(self) -> BaseEstimator:
+    def init_model(self) -> "BaseEstimator":
         """Define, initialize and return your Classifier."""
         pass
 
@@ -35,6 +40,7 @@ class BaseClassifier(ABC):
         """
         self.model = self.model.fit(X, y)
         self.features = X.columns
+        self.feature_dtypes = [str(dtype) for dtype in X.dtypes]
         self.is_fit = True
 
     def check_fit(self) -> None:
@@ -88,13 +94,40 @@ class BaseClassifier(ABC):
 
         return df
 
-    def persist_model(self, env: str) -> None:
-        """Serialize the model to disk. Overwrite if file already exists."""
+    def persist_model(
+        self, env: str, metadata: Optional[dict[str, Any]] = None
+    ) -> None:
+        """Serialize the model to disk. Overwrite if file already exists.
+
+        The model is written with a metadata file (version, features and
+        dtypes, training info) and a compact artifact when supported, each
+        swapped in atomically, so the model registry of running workers
+        picks it up.
+
+        :param env: Environment to save the model for.
+        :param metadata: Extra metadata, e.g. training accuracy.
+        """
         env_subdir = coerce_env_dir_name(env_name=env)
         self.check_fit()
         model_path = ESTIMATOR_LOCATION / env_subdir / f"{self.name}.pkl"
-        joblib.dump(self.model, model_path)
-        _logger.info(f"Model serialized to {model_path}")
+        metadata = save_model_artifact(
+            model=self.model,
+            path=model_path,
+            metadata={
+                "league": self.league.value,
+                "estimator": self.__class__.__name__,
+                "features": [
+                    {"name": str(col), "dtype": dtype}
+                    for col, dtype in zip(
+                        self.features, self.feature_dtypes, strict=True
+                    )
+                ],
+                **(metadata or {}),
+            },
+        )
+        _logger.info(
+            f"Model serialized to {model_path} (version {metadata['version']})"
+        )
 
 
 class FreekickDecisionTreeClassifier(BaseClassifier):
@@ -104,7 +137,9 @@ class FreekickDecisionTreeClassifier(BaseClassifier):
         self.backend = backend
         super().__init__(league)
 
-    def init_model(self) -> DecisionTreeClassifier:
+    def init_model(self) -> "DecisionTreeClassifier":
+        from sklearn.tree import DecisionTreeClassifier
+
         match self.backend:
             case Backend.PANDAS:
                 classifier = DecisionTreeClassifier
@@ -0,0 +1,306 @@
+"""Pandas-free inference of fitted estimators.
+
+Fitted decision trees and logistic regressions are exported to flat NumPy
+arrays (node tables, coefficients) and evaluated on a plain feature vector.
+For a single match this skips the DataFrame building, merges and input
+validation around a scikit-learn call, which cost far more than the model.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+from freekick.datastore.util import TeamDirectory
+
+from .learner_utils import ASOF_PRIOR, TRAINING_COLS, WpcPythSnapshot
+
+_EPOCH = datetime(1970, 1, 1)
+DEFAULT_KICK_OFF = time(13, 30)
+
+
+@dataclass(frozen=True)
+class CompiledTree:
+    """A fitted DecisionTreeClassifier as node arrays.
+
+    :param feature: Feature index of each split node, -2 for leaves.
+    :param threshold: Split threshold, a sample goes left when <= threshold.
+    :param left: Left child of each node, -1 for leaves.
+    :param right: Right child of each node, -1 for leaves.
+    :param missing_go_to_left: Whether NaN values go to the left child.
+    :param proba: Class probabilities of each node.
+    :param classes: Class labels, in the order of proba's columns.
+    :param features: Names of the features, in input order, if known.
+    """
+
+    feature: np.ndarray  # type: ignore [type-arg]
+    threshold: np.ndarray  # type: ignore [type-arg]
+    left: np.ndarray  # type: ignore [type-arg]
+    right: np.ndarray  # type: ignore [type-arg]
+    missing_go_to_left: np.ndarray  # type: ignore [type-arg]
+    proba: np.ndarray  # type: ignore [type-arg]
+    classes: np.ndarray  # type: ignore [type-arg]
+    features: tuple[str, ...] = ()
+
+    @classmethod
+    def from_estimator(cls, model: Any) -> "CompiledTree":
+        tree = model.tree_
+        value = tree.value[:, 0, :]
+        return cls(
+            feature=tree.feature.copy(),
+            threshold=tree.threshold.copy(),
+            left=tree.children_left.copy(),
+            right=tree.children_right.copy(),
+            missing_go_to_left=np.asarray(
+                getattr(
+                    tree,
+                    "missing_go_to_left",
+                    np.zeros(tree.node_count, dtype=bool),
+                ),
+                dtype=bool,
+            ),
+            proba=value / value.sum(axis=1, keepdims=True),
+            classes=model.classes_.copy(),
+            features=_feature_names(model),
+        )
+
+    def _leaf(self, x: np.ndarray) -> int:  # type: ignore [type-arg]
+        node = 0
+        while self.left[node] != -1:
+            value = x[self.feature[node]]
+            if np.isnan(value):
+                go_left = self.missing_go_to_left[node]
+            else:
+                go_left = value <= self.threshold[node]
+            node = self.left[node] if go_left else self.right[node]
+        return node
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:  # type: ignore [type-arg]
+        # All samples walk down the tree together, one level per step.
+        nodes = np.zeros(len(X), dtype=np.intp)
+        active = np.arange(len(X))
+        while active.size:
+            node = nodes[active]
+            value = X[active, self.feature[node]]
+            go_left = np.where(
+                np.isnan(value),
+                self.missing_go_to_left[node],
+                value <= self.threshold[node],
+            )
+            nodes[active] = np.where(
+                go_left, self.left[node], self.right[node]
+            )
+            active = active[self.left[nodes[active]] != -1]
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:  # type: ignore [type-arg]
+        # Like scikit-learn, compare float32 features to the thresholds.
+        X = _as_matrix(X).astype("float32")
+        if len(X) == 1:
+            return np.asarray(self.proba[[self._leaf(X[0])]])
+        return np.asarray(self.proba[self._leaves(X)])
+
+    def predict(self, X: Any) -> np.ndarray:  # type: ignore [type-arg]
+        return np.asarray(self.classes[self.predict_proba(X).argmax(axis=1)])
+
+    @property
+    def classes_(self) -> np.ndarray:  # type: ignore [type-arg]
+        return self.classes
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:  # type: ignore [type-arg]
+        return _feature_names_in(self.features)
+
+
+@dataclass(frozen=True)
+class CompiledLinear:
+    """A fitted LogisticRegression as a coefficient matrix.
+
+    :param coef: Coefficients, one row per class (a single row if binary).
+    :param intercept: Intercept of each row of coef.
+    :param classes: Class labels.
+    :param multinomial: Softmax probabilities, one-vs-rest otherwise.
+    :param features: Names of the features, in input order, if known.
+    """
+
+    coef: np.ndarray  # type: ignore [type-arg]
+    intercept: np.ndarray  # type: ignore [type-arg]
+    classes: np.ndarray  # type: ignore [type-arg]
+    multinomial: bool
+    features: tuple[str, ...] = ()
+
+    @classmethod
+    def from_estimator(cls, model: Any) -> "CompiledLinear":
+        return cls(
+            coef=model.coef_.copy(),
+            intercept=np.broadcast_to(
+                model.intercept_, model.coef_.shape[:1]
+            ).copy(),
+            classes=model.classes_.copy(),
+            multinomial=not _is_ovr(model),
+            features=_feature_names(model),
+        )
+
+    def _decision(self, X: Any) -> np.ndarray:  # type: ignore [type-arg]
+        return np.asarray(_as_matrix(X) @ self.coef.T + self.intercept)
+
+    def predict_proba(self, X: Any) -> np.ndarray:  # type: ignore [type-arg]
+        decision = self._decision(X)
+        if decision.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-decision))
+            return np.hstack([1 - positive, positive])
+        if self.multinomial:
+            exp = np.exp(decision - decision.max(axis=1, keepdims=True))
+        else:
+            exp = 1 / (1 + np.exp(-decision))
+        return np.asarray(exp / exp.sum(axis=1, keepdims=True))
+
+    def predict(self, X: Any) -> np.ndarray:  # type: ignore [type-arg]
+        decision = self._decision(X)
+        if decision.shape[1] == 1:
+            return np.asarray(self.classes[(decision[:, 0] > 0).astype(int)])
+        return np.asarray(self.classes[decision.argmax(axis=1)])
+
+    @property
+    def classes_(self) -> np.ndarray:  # type: ignore [type-arg]
+        return self.classes
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:  # type: ignore [type-arg]
+        return _feature_names_in(self.features)
+
+
+CompiledModel = Union[CompiledTree, CompiledLinear]
+
+
+def _is_ovr(model: Any) -> bool:
+    """Whether a LogisticRegression predicts one-vs-rest probabilities,
+    decided as its predict_proba does: liblinear and binary problems are
+    one-vs-rest unless multi_class says otherwise."""
+    multi_class = getattr(model, "multi_class", "deprecated")
+    if multi_class in ("auto", "deprecated"):
+        return bool(
+            model.classes_.size <= 2
+            or getattr(model, "solver", "lbfgs") == "liblinear"
+        )
+    return bool(multi_class in ("ovr", "warn"))
+
+
+def _feature_names(model: Any) -> tuple[str, ...]:
+    return tuple(str(name) for name in getattr(model, "feature_names_in_", ()))
+
+
+def _feature_names_in(features: tuple[str, ...]) -> np.ndarray:  # type: ignore [type-arg]
+    # Same contract as scikit-learn: only set when fitted on named features.
+    if not features:
+        raise AttributeError("Model was not fitted on named features.")
+    return np.array(features, dtype=object)
+
+
+def _as_matrix(X: Any) -> np.ndarray:  # type: ignore [type-arg]
+    """Samples as a 2D float64 array, from an array or a DataFrame."""
+    return np.atleast_2d(np.asarray(X, dtype="float64"))
+
+
+def compile_model(model: Any) -> Optional[CompiledModel]:
+    """Export a fitted estimator to arrays.
+
+    :param model: Fitted scikit-learn estimator.
+    :return: The compiled model, None if the estimator is not supported.
+    """
+    if isinstance(model, (CompiledTree, CompiledLinear)):
+        return model
+
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    if isinstance(model, DecisionTreeClassifier):
+        return CompiledTree.from_estimator(model)
+    if isinstance(model, LogisticRegression):
+        return CompiledLinear.from_estimator(model)
+    return None
+
+
+def timestamp_ns(value: datetime) -> int:
+    """Nanoseconds since the epoch of a naive datetime, as in pandas."""
+    return (value - _EPOCH) // timedelta(microseconds=1) * 1_000
+
+
+@dataclass(frozen=True)
+class TeamFeatures:
+    """Team ids and current wpc/pyth, to build feature vectors from.
+
+    :param version: Version of the wpc/pyth snapshot the features are from.
+    :param season: Season of the features, as an int.
+    :param team_ids: Team id of each team code of the league.
+    :param wpc_pyth: Win percentage and pythagorean expectation by team id.
+    """
+
+    version: int
+    season: int
+    team_ids: dict[str, int]
+    wpc_pyth: dict[int, tuple[float, float]]
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        teams: TeamDirectory,
+        snapshot: WpcPythSnapshot,
+        season: int,
+        league: str,
+    ) -> "TeamFeatures":
+        data = snapshot.data[snapshot.data["season"] == season]
+        return cls(
+            version=snapshot.version,
+            season=season,
+            team_ids=teams.ids(league=league),
+            wpc_pyth={
+                int(team): (float(wpc), float(pyth))
+                for team, wpc, pyth in zip(
+                    data["team"],
+                    data["win_percentage"],
+                    data["pythagorean_expectation"],
+                    strict=True,
+                )
+            },
+        )
+
+    def vector(
+        self,
+        home_team: str,
+        away_team: str,
+        attendance: Optional[float] = None,
+        match_date: Optional[date] = None,
+        kick_off: Optional[time] = None,
+        columns: Sequence[str] = TRAINING_COLS,
+    ) -> np.ndarray:  # type: ignore [type-arg]
+        """Feature vector of a fixture, features in the order of columns.
+
+        :raises KeyError: Raised when a team or column is not found.
+        """
+        home_id = self.team_ids[home_team]
+        away_id = self.team_ids[away_team]
+        today = date.today()
+        match_date = match_date or today
+        # Kick off times are parsed onto today's date, like pd.to_datetime.
+        kick_off_at = datetime.combine(today, kick_off or DEFAULT_KICK_OFF)
+        # As in training, a league team yet to play this season gets the
+        # prior. Teams of other leagues are not in team_ids.
+        prior = (ASOF_PRIOR, ASOF_PRIOR)
+        home_wpc, home_pyth = self.wpc_pyth.get(home_id, prior)
+        away_wpc, away_pyth = self.wpc_pyth.get(away_id, prior)
+        features = {
+            "date": timestamp_ns(datetime.combine(match_date, time())),
+            "day_of_week": match_date.weekday(),
+            "time": timestamp_ns(kick_off_at),
+            "home_team": home_id,
+            "away_team": away_id,
+            "season": self.season,
+            "attendance": np.nan if attendance is None else attendance,
+            "home_win_percentage": home_wpc,
+            "away_win_percentage": away_wpc,
+            "home_pythagorean_expectation": home_pyth,
+            "away_pythagorean_expectation": away_pyth,
+        }
+        return np.array([features[col] for col in columns], dtype="float64")
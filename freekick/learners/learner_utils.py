@@ -1,30 +1,33 @@
 """Utility module for all Machine Learning Operations."""
 
+import hashlib
 import os
+import tempfile
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from functools import lru_cache, partial
-from typing import Any, Optional
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
 
-import joblib
 import numpy as np
 import pandas as pd
-from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
 
 from freekick import ESTIMATOR_LOCATION
-from freekick.datastore import DEFAULT_REPOSITORY
+from freekick.datastore import DEFAULT_REPOSITORY, remove_sessions
 from freekick.datastore.repository import AbstractRepository
 from freekick.datastore.util import (
     DataStore,
     League,
     Season,
     get_league_data_container,
+    get_team_directory,
     season_to_int,
 )
-from freekick.utils import Timer, _logger
-from freekick.utils.freekick_config import coerce_env_dir_name
+from freekick.utils import APP_WORKSPACE_DIR, Timer, _logger
 
 from .classification import BaseClassifier, FreekickDecisionTreeClassifier
+from .registry import ModelRegistry
 from .regression import SoccerLogisticModel
 
 
@@ -38,37 +41,170 @@ DEFAULT_ESTIMATOR = AllEstimator[
 ]  # TODO: Remove, pull each default from workspace settings instead
 
 
-# This cache is ONLY used for caching the WPC and PYTH values for current season
-# (Season.CURRENT) teams so we do not have to compute or query DB for each
-# prediction. e.g. {'epl': {'data': pd.DataFrame, 'last_update': datetime}}
-WPC_PYTH_CACHE: dict[str, dict[str, pd.DataFrame | datetime]] = {}
 WPC_PYTH_CACHE_TIMEOUT: pd.Timedelta = pd.Timedelta(days=1)  # 86400s/1day
 
-pd.options.mode.copy_on_write = True  # Enable copy and write.
 
+@dataclass(frozen=True)
+class WpcPythSnapshot:
+    """Immutable current season wpc/pyth values of a league."""
 
-def _load_model(league: League) -> Any:
-    """Load and deserialize a model."""
-    env = os.environ["ENV"]
-    estimator_cls_name = os.environ.get(f"{league.name}_ESTIMATOR_CLASS")
-    if not estimator_cls_name:
-        _logger.warning(
-            (
-                "Environment estimator not specified for %s!!! Falling "
-                "back to loading 'DEFAULT_ESTIMATOR': %s"
-            ),
-            league.name,
-            DEFAULT_ESTIMATOR,
-        )
-        estimator_cls_name = DEFAULT_ESTIMATOR.__name__
-    env_subdir = coerce_env_dir_name(env_name=env)
-    model_name = f"{league.value}_{estimator_cls_name}.pkl"
-    model_path = ESTIMATOR_LOCATION / env_subdir / model_name
-    model = joblib.load(model_path)
-    _logger.debug(f"     - {model_name}")
-    return model
+    data: pd.DataFrame
+    last_update: datetime
+    version: int
+
+    def is_fresh(self, timeout: pd.Timedelta = WPC_PYTH_CACHE_TIMEOUT) -> bool:
+        return bool((datetime.now() - self.last_update) < timeout)
+
+
+class WpcPythCache:
+    """Per league cache of current season wpc/pyth snapshots.
+
+    - Snapshots are replaced whole under a lock, so readers always see a
+      consistent (data, last_update, version) and keep using the previous
+      snapshot while a new one is computed (stale-while-revalidate).
+    - At most one refresh runs per league. Concurrent callers join the
+      refresh in flight instead of starting their own.
+    - Hit, stale hit, miss and refresh counters are kept in `stats()`.
+    """
+
+    def __init__(self, timeout: pd.Timedelta = WPC_PYTH_CACHE_TIMEOUT) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._snapshots: dict[str, WpcPythSnapshot] = {}
+        self._in_flight: dict[str, threading.Event] = {}
+        self._version = 0
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def get(self, league: League) -> Optional[WpcPythSnapshot]:
+        """Current snapshot, fresh or not, without touching the counters."""
+        return self._snapshots.get(league.value)
+
+    def lookup(self, league: League) -> Optional[WpcPythSnapshot]:
+        """Current snapshot, counted as a hit, stale hit or miss."""
+        snapshot = self._snapshots.get(league.value)
+        with self._lock:
+            if snapshot is None:
+                self._stats["misses"] += 1
+            elif snapshot.is_fresh(self.timeout):
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale_hits"] += 1
+        return snapshot
+
+    def put(self, league: League, data: pd.DataFrame) -> WpcPythSnapshot:
+        """Atomically swap in new values for a league.
+
+        The snapshot's last_update is the oldest last_update in data, so
+        values loaded from storage keep their original age.
+        """
+        last_update = datetime.now()
+        if "last_update" in data.columns and not data.empty:
+            last_update = pd.Timestamp(
+                data["last_update"].min()
+            ).to_pydatetime()
+        with self._lock:
+            self._version += 1
+            snapshot = WpcPythSnapshot(
+                data=data, last_update=last_update, version=self._version
+            )
+            self._snapshots[league.value] = snapshot
+        return snapshot
+
+    def clear(self, league: Optional[League] = None) -> None:
+        with self._lock:
+            if league:
+                self._snapshots.pop(league.value, None)
+            else:
+                self._snapshots.clear()
+
+    def refresh(
+        self,
+        league: League,
+        refresh_func: Callable[[], pd.DataFrame],
+        wait: bool = False,
+    ) -> Optional[WpcPythSnapshot]:
+        """Refresh a league's snapshot unless a refresh is already running.
+
+        :param league: League to refresh.
+        :param refresh_func: Returns the new values for the league.
+        :param wait: If True, block until the refresh (ours or the one in
+            flight) completes and return the resulting snapshot. Otherwise
+            refresh in a background thread and return None immediately.
+        """
+        with self._lock:
+            done = self._in_flight.get(league.value)
+            leader = done is None
+            if done is None:
+                done = self._in_flight[league.value] = threading.Event()
+                self._stats["refreshes"] += 1
+
+        if leader and wait:
+            self._run_refresh(league, refresh_func, done, background=False)
+        elif leader:
+            thread = threading.Thread(
+                target=self._run_refresh,
+                args=(league, refresh_func, done, True),
+                name=f"wpc-pyth-refresh-{league.value}",
+                daemon=True,
+            )
+            thread.start()
+            _logger.info(
+                " Started thread to refresh WPC_PYTH_CACHE: "
+                f"{thread.name} ({thread.ident})"
+            )
+        elif wait:
+            done.wait()
+        return self.get(league) if wait else None
+
+    def join(self) -> None:
+        """Wait for the refreshes in flight, e.g. before a fork."""
+        with self._lock:
+            in_flight = list(self._in_flight.values())
+        for done in in_flight:
+            done.wait()
 
+    def _run_refresh(
+        self,
+        league: League,
+        refresh_func: Callable[[], pd.DataFrame],
+        done: threading.Event,
+        background: bool,
+    ) -> None:
+        try:
+            self.put(league, refresh_func())
+        except Exception:
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+            if not background:
+                raise
+            _logger.exception("WPC_PYTH refresh failed for %s", league)
+        finally:
+            with self._lock:
+                self._in_flight.pop(league.value, None)
+            done.set()
 
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+# This cache is ONLY used for caching the WPC and PYTH values for current season
+# (Season.CURRENT) teams so we do not have to compute or query DB for each
+# prediction.
+WPC_PYTH_CACHE = WpcPythCache()
+
+pd.options.mode.copy_on_write = True  # Enable copy and write.
+
+
+# Timestamps (date, time) are fed to the models as int64 nanoseconds,
+# whatever unit pandas parsed them in (pandas 3 infers it from the input).
+TIMESTAMP_DTYPE = "datetime64[ns]"
 TRAINING_COLS = [
     "date",
     "day_of_week",
@@ -84,125 +220,103 @@ TRAINING_COLS = [
 ]
 
 
-@lru_cache()
-def load_models() -> dict[str, Any]:
-    _logger.debug(" Loading serialized models...")
-    return {league.value: _load_model(league=league) for league in League}
-
-
-serial_models = partial(load_models)
+# Serialized models of each league, loaded on first use and swapped when
+# a new version is persisted.
+MODEL_REGISTRY = ModelRegistry(
+    location=ESTIMATOR_LOCATION, default_estimator=DEFAULT_ESTIMATOR.__name__
+)
 
 
-def compute_wpc_pyth(
-    data: pd.DataFrame, league: League, cache: bool = False
-) -> pd.DataFrame:
-    """Compute win percentage and pythagorean expectation for home and away teams."""
-    # We first identify whether the result was a win for the home team (H),
-    # the away team (A) or a draw (D). We also create the counting variable.
-    data["game_count"] = 1  # represent # games played in each season
-    # home_win=1, draw=0.5,away_win=0
-    data["home_win_value"] = np.where(
-        data["result"] == 1, 1, np.where(data["result"] == 0, 0.5, 0)
-    )
-    # Away win=1, draw=0.5,home_win=0
-    data["away_win_value"] = np.where(
-        data["result"] == -1, 1, np.where(data["result"] == 0, 0.5, 0)
-    )
+def _win_values(result: pd.Series) -> tuple[np.ndarray, np.ndarray]:  # type: ignore [type-arg]
+    """Win value of each game for the home and away team.
 
-    # We have to create separate dfs to calculate home team and away
-    # team performance.
-    home = (
-        data.groupby(["season", "home_team"])[
-            ["game_count", "home_win_value", "home_goal", "away_goal"]
-        ]
-        .sum()
-        .reset_index()
-        .rename(
-            columns={
-                "home_team": "team",
-                "game_count": "game_count_home",
-                "home_goal": "home_goal_home",
-                "away_goal": "away_goal_home",
-            }
-        )
+    A win is worth 1, a draw 0.5 and a loss 0.
+    """
+    result_arr = result.to_numpy()
+    home_win_value = np.where(
+        result_arr == 1, 1.0, np.where(result_arr == 0, 0.5, 0.0)
     )
-
-    # Now we create the mirror image df for the away team results.
-    away = (
-        data.groupby(["season", "away_team"])[
-            ["game_count", "away_win_value", "home_goal", "away_goal"]
-        ]
-        .sum()
-        .reset_index()
-        .rename(
-            columns={
-                "away_team": "team",
-                "game_count": "game_count_away",
-                "home_goal": "home_goal_away",
-                "away_goal": "away_goal_away",
-            }
-        )
+    away_win_value = np.where(
+        result_arr == -1, 1.0, np.where(result_arr == 0, 0.5, 0.0)
     )
+    return home_win_value, away_win_value
 
-    # Merge the home team and away team results
-    home_away = pd.merge(home, away, on=["season", "team"])
 
-    # Sum the results by home and away measures to get the team overall
-    # performance for the season
-    home_away["wins"] = (
-        home_away["home_win_value"] + home_away["away_win_value"]
-    )
-    home_away["game_count"] = (
-        home_away["game_count_home"] + home_away["game_count_away"]
-    )
-    home_away["goals_for"] = (
-        home_away["home_goal_home"] + home_away["away_goal_away"]
-    )
-    home_away["goals_against"] = (
-        home_away["away_goal_home"] + home_away["home_goal_away"]
-    )
+def _season_team_totals(
+    data: pd.DataFrame,
+) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:  # type: ignore [type-arg]
+    """Sum games played, win value and goals per (season, team).
 
-    home_away = home_away.set_index(["season", "team"])
+    Each (season, team) pair is coded to a single integer key so the totals
+    are gathered with np.bincount instead of grouping and merging frames.
 
-    # Create the win percentage and pythagorean expectation
-    home_away["win_percentage"] = home_away["wins"] / home_away["game_count"]
-    home_away["pyth_expectation"] = home_away["goals_for"] ** 2 / (
-        home_away["goals_for"] ** 2 + home_away["goals_against"] ** 2
+    :param data: Games with 'season', 'home_team', 'away_team', 'home_goal',
+        'away_goal' and 'result' columns.
+    :return: Totals for every possible (season, team) pair in key order
+        (pairs that never played have a game_count of 0), and the home and
+        away key of each game. Keys index directly into the totals.
+    """
+    season_codes, seasons = pd.factorize(data["season"].to_numpy())
+    team_codes, teams = pd.factorize(
+        np.concatenate(
+            [data["home_team"].to_numpy(), data["away_team"].to_numpy()]
+        )
     )
+    n_games, n_teams = len(data), len(teams)
+    home_key = season_codes * n_teams + team_codes[:n_games]
+    away_key = season_codes * n_teams + team_codes[n_games:]
+    size = len(seasons) * n_teams
 
-    def _get_wpc(
-        season: str, team: str, perf: pd.DataFrame = home_away
-    ) -> pd.Series:  # type: ignore [type-arg]
-        return perf.loc[(season, team)]["win_percentage"]  # type: ignore
+    home_win_value, away_win_value = _win_values(data["result"])
+    home_goal = np.nan_to_num(data["home_goal"].to_numpy(dtype="float64"))
+    away_goal = np.nan_to_num(data["away_goal"].to_numpy(dtype="float64"))
 
-    def _get_pyth(
-        season: str, team: str, perf: pd.DataFrame = home_away
-    ) -> pd.Series:  # type: ignore [type-arg]
-        return perf.loc[(season, team)]["pyth_expectation"]  # type: ignore
+    def _total(home: Any, away: Any) -> np.ndarray:  # type: ignore [type-arg]
+        """Sum a per game measure over both home and away games of a team."""
+        return np.bincount(home_key, weights=home, minlength=size) + (
+            np.bincount(away_key, weights=away, minlength=size)
+        )
 
-    data["home_win_percentage"] = data.apply(
-        lambda row: _get_wpc(row["season"], row["home_team"]), axis=1
+    totals = pd.DataFrame(
+        {
+            "game_count": _total(None, None),
+            "wins": _total(home_win_value, away_win_value),
+            "goals_for": _total(home_goal, away_goal),
+            "goals_against": _total(away_goal, home_goal),
+        },
+        index=pd.MultiIndex.from_product(
+            [seasons, teams], names=["season", "team"]
+        ),
     )
+    return totals, home_key, away_key
 
-    data["away_win_percentage"] = data.apply(
-        lambda row: _get_wpc(row["season"], row["away_team"]), axis=1
-    )
 
-    data["home_pyth_expectation"] = data.apply(
-        lambda row: _get_pyth(row["season"], row["home_team"]), axis=1
-    )
-    data["away_pyth_expectation"] = data.apply(
-        lambda row: _get_pyth(row["season"], row["away_team"]), axis=1
-    )
+def _wpc_pyth_from_totals(
+    totals: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray]:  # type: ignore [type-arg]
+    """Win percentage and pythagorean expectation from season totals."""
+    goals_for = totals["goals_for"].to_numpy()
+    goals_against = totals["goals_against"].to_numpy()
+    # Pairs that never played are empty slots, so silence 0/0.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_percentage = totals["wins"].to_numpy() / (
+            totals["game_count"].to_numpy()
+        )
+        pyth_expectation = goals_for**2 / (goals_for**2 + goals_against**2)
+    return win_percentage, pyth_expectation
 
-    data = data.drop(
-        columns=[
-            "game_count",
-            "home_win_value",
-            "away_win_value",
-            "home_goal",
-            "away_goal",
-        ]
+
+def compute_wpc_pyth(
+    data: pd.DataFrame, league: League, cache: bool = False
+) -> pd.DataFrame:
+    """Compute win percentage and pythagorean expectation for home and away teams."""
+    totals, home_key, away_key = _season_team_totals(data)
+    win_percentage, pyth_expectation = _wpc_pyth_from_totals(totals)
+    data = data.assign(
+        home_win_percentage=win_percentage[home_key],
+        away_win_percentage=win_percentage[away_key],
+        home_pyth_expectation=pyth_expectation[home_key],
+        away_pyth_expectation=pyth_expectation[away_key],
     )
 
     data["pyth_wpc_id"] = (
@@ -232,17 +346,362 @@ def compute_wpc_pyth(
     data["league"] = league.value
     data = data.drop_duplicates(subset="team")
 
-    now = datetime.now()
-    data["last_update"] = now
+    data["last_update"] = datetime.now()
     if cache:
-        global WPC_PYTH_CACHE  # noqa: F824
-        WPC_PYTH_CACHE[league.value] = {
-            "data": data,
-            "last_update": now,
-        }
+        WPC_PYTH_CACHE.put(league=league, data=data)
     return data
 
 
+class WpcPythAccumulator:
+    """Running per (league, season, team) totals behind win percentage and
+    pythagorean expectation.
+
+    Games are applied as deltas, so refreshing wpc/pyth after new results
+    costs time proportional to the new games rather than the league history.
+    A game is keyed on (season, home_team, away_team) since each team hosts
+    every other team once a season, and its score and result are recorded.
+    Games already applied with the same outcome are skipped, which makes it
+    safe to re-apply an overlapping batch such as a re-fetched season; a
+    game applied with another outcome (a corrected score) has its old
+    contribution replaced. When `path` is set, `save` persists the totals
+    and applied games there as csv so they survive restarts.
+
+    Example
+    -------
+    >>> accumulator = WpcPythAccumulator()
+    >>> accumulator.apply(league=League.EPL, games=season_games)
+    380
+    >>> accumulator.apply(league=League.EPL, games=season_games)
+    0
+    >>> accumulator.wpc_pyth(league=League.EPL, season=Season.CURRENT)
+    """
+
+    GAME_KEY = ["season", "home_team", "away_team"]
+    OUTCOME = ["home_goal", "away_goal", "result"]
+    TOTALS = ["game_count", "wins", "goals_for", "goals_against"]
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._totals: dict[str, pd.DataFrame] = {}
+        # Outcome (home_goal, away_goal, result) of each applied game.
+        self._applied: dict[
+            str, dict[tuple[int, int, int], tuple[float, float, float]]
+        ] = {}
+
+    def _game_keys(self, games: pd.DataFrame) -> list[tuple[int, int, int]]:
+        return list(
+            zip(
+                games["season"].astype("int64").tolist(),
+                games["home_team"].astype("int64").tolist(),
+                games["away_team"].astype("int64").tolist(),
+                strict=True,
+            )
+        )
+
+    def _outcomes(
+        self, games: pd.DataFrame
+    ) -> list[tuple[float, float, float]]:
+        return list(
+            zip(
+                *(
+                    np.nan_to_num(
+                        games[col].to_numpy(dtype="float64")
+                    ).tolist()
+                    for col in self.OUTCOME
+                ),
+                strict=True,
+            )
+        )
+
+    def apply(self, league: League, games: pd.DataFrame) -> int:
+        """Add new games, and score corrections, to the running totals.
+
+        Only updates the totals in memory, see `save`.
+
+        :param league: League the games belong to.
+        :param games: Cleaned games, as returned by a league container load.
+        :return: Number of games applied, new or corrected.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            applied = self._applied.setdefault(league.value, {})
+            # The last row of a game wins, e.g. a corrected score.
+            changes: dict[tuple[int, int, int], int] = {}
+            outcomes = self._outcomes(games)
+            for position, (key, outcome) in enumerate(
+                zip(self._game_keys(games), outcomes, strict=True)
+            ):
+                if applied.get(key) != outcome:
+                    changes[key] = position
+                else:
+                    changes.pop(key, None)
+            if not changes:
+                return 0
+
+            delta, _, _ = _season_team_totals(
+                games.iloc[list(changes.values())]
+            )
+            corrected = [key for key in changes if key in applied]
+            if corrected:
+                # Take out what the corrected games added before.
+                previous, _, _ = _season_team_totals(
+                    pd.DataFrame(
+                        [key + applied[key] for key in corrected],
+                        columns=self.GAME_KEY + self.OUTCOME,
+                    )
+                )
+                delta = delta.sub(previous, fill_value=0)
+            current = self._totals.get(league.value)
+            if current is not None:
+                delta = current.add(delta, fill_value=0)
+            self._totals[league.value] = delta[
+                delta["game_count"] > 0
+            ].sort_index()
+            applied.update(
+                (key, outcomes[position]) for key, position in changes.items()
+            )
+            _logger.info(
+                "Applied %s game(s) to %s wpc/pyth totals, %s corrected.",
+                len(changes),
+                league.value,
+                len(corrected),
+            )
+            return len(changes)
+
+    def _seasons_totals(
+        self, league: League, seasons: set[int]
+    ) -> Optional[pd.DataFrame]:
+        totals = self._totals.get(league.value)
+        if totals is None:
+            return None
+        return totals[totals.index.get_level_values("season").isin(seasons)]
+
+    def rebuild(self, league: League, games: pd.DataFrame) -> int:
+        """Discard the totals of the seasons in games and re-apply them."""
+        seasons = set(games["season"].astype("int64").tolist())
+        with self._lock:
+            self._ensure_loaded()
+            totals = self._totals.get(league.value)
+            if totals is not None:
+                self._totals[league.value] = totals[
+                    ~totals.index.get_level_values("season").isin(seasons)
+                ]
+            self._applied[league.value] = {
+                key: outcome
+                for key, outcome in self._applied.get(league.value, {}).items()
+                if key[0] not in seasons
+            }
+            return self.apply(league=league, games=games)
+
+    def verify(self, league: League, games: pd.DataFrame) -> bool:
+        """Check the running totals of the seasons in games match a rebuild
+        of those games from scratch.
+        """
+        seasons = set(games["season"].astype("int64").tolist())
+        scratch = WpcPythAccumulator()
+        scratch.apply(league=league, games=games)
+        expected = scratch._seasons_totals(league=league, seasons=seasons)
+        with self._lock:
+            self._ensure_loaded()
+            current = self._seasons_totals(league=league, seasons=seasons)
+        if current is None or expected is None:
+            consistent = current is None and expected is None
+        else:
+            consistent = current.index.equals(expected.index) and bool(
+                np.allclose(current.to_numpy(), expected.to_numpy())
+            )
+        if not consistent:
+            _logger.warning(
+                "wpc/pyth totals for %s do not match a rebuild.", league.value
+            )
+        return consistent
+
+    def wpc_pyth(
+        self, league: League, season: Optional[Season] = None
+    ) -> pd.DataFrame:
+        """Win percentage and pythagorean expectation per (season, team).
+
+        :param league: League to get values for.
+        :param season: Only return this season, defaults to all seasons.
+        :return: Frame in the same format returned by compute_wpc_pyth.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            totals = self._totals.get(league.value)
+        if totals is None:
+            totals = pd.DataFrame(
+                columns=self.TOTALS,
+                index=pd.MultiIndex.from_tuples([], names=["season", "team"]),
+            )
+        if season:
+            totals = totals[
+                totals.index.get_level_values("season")
+                == season_to_int(season)
+            ]
+        win_percentage, pyth_expectation = _wpc_pyth_from_totals(totals)
+        data = totals.index.to_frame(index=False)[["team", "season"]]
+        data["win_percentage"] = win_percentage
+        data["pythagorean_expectation"] = pyth_expectation
+        data["pyth_wpc_id"] = (
+            data["team"].astype(str) + "_" + data["season"].astype(str)
+        )
+        data["league"] = league.value
+        data["last_update"] = datetime.now()
+        return data
+
+    def _ensure_loaded(self) -> None:
+        """Lazily read persisted totals the first time they are needed."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not self.path.exists():
+            return
+        for totals_file in self.path.glob("*_totals.csv"):
+            league = totals_file.name.removesuffix("_totals.csv")
+            games_file = self.path / f"{league}_games.csv"
+            if not games_file.exists():
+                continue
+            applied = pd.read_csv(games_file)
+            if not set(self.OUTCOME).issubset(applied.columns):
+                # Written before outcomes were recorded, corrections could
+                # not be applied. Rebuilt from the games applied next.
+                _logger.warning(
+                    "Discarding %s wpc/pyth totals without game outcomes.",
+                    league,
+                )
+                continue
+            self._totals[league] = pd.read_csv(
+                totals_file, index_col=["season", "team"]
+            )
+            self._applied[league] = dict(
+                zip(
+                    self._game_keys(applied),
+                    self._outcomes(applied),
+                    strict=True,
+                )
+            )
+
+    def save(self) -> None:
+        """Persist totals and applied games, if a path was given.
+
+        Only the data maintainer saves; serving processes apply games in
+        memory and never write.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for league, totals in self._totals.items():
+                games = pd.DataFrame(
+                    [
+                        key + outcome
+                        for key, outcome in self._applied[league].items()
+                    ],
+                    columns=self.GAME_KEY + self.OUTCOME,
+                )
+                for name, frame, index in [
+                    (f"{league}_games.csv", games, False),
+                    (f"{league}_totals.csv", totals, True),
+                ]:
+                    # Write a temporary file of our own then rename it, so
+                    # readers never see a partial file.
+                    with tempfile.NamedTemporaryFile(
+                        mode="w",
+                        dir=self.path,
+                        prefix=f".{name}.",
+                        suffix=".tmp",
+                        delete=False,
+                    ) as tmp_file:
+                        frame.to_csv(tmp_file, index=index)
+                    try:
+                        os.replace(tmp_file.name, self.path / name)
+                    except OSError:
+                        os.unlink(tmp_file.name)
+                        raise
+
+
+WPC_PYTH_ACCUMULATOR = WpcPythAccumulator(path=APP_WORKSPACE_DIR / "wpc_pyth")
+
+
+# Value given to a team that has not played yet in the season.
+ASOF_PRIOR = 0.5
+
+
+def add_asof_wpc_pyth(
+    data: pd.DataFrame, history: pd.DataFrame
+) -> pd.DataFrame:
+    """Add each team's win percentage and pythagorean expectation as of
+    kickoff, using only history games of the same season played earlier.
+
+    Training calls this with data=history so no game sees its own or later
+    results. Running season totals are built in one sorted cumulative pass
+    over history and attached with a backward as-of join, O(n log n) overall.
+    For a fixture dated after the last game played, the values equal the
+    season totals that WPC_PYTH_ACCUMULATOR and compute_wpc_pyth produce,
+    which is what the cached current season features served to predict_match
+    hold. A team without earlier games that season gets ASOF_PRIOR.
+
+    :param data: Fixtures with 'season', 'date', 'home_team' and 'away_team'.
+        'date' must be datetime-like.
+    :param history: Played games with the columns above plus 'home_goal',
+        'away_goal' and 'result'.
+    :return: data with home/away win percentage and pythagorean expectation.
+    """
+    home_win_value, away_win_value = _win_values(history["result"])
+    home_goal = np.nan_to_num(history["home_goal"].to_numpy(dtype="float64"))
+    away_goal = np.nan_to_num(history["away_goal"].to_numpy(dtype="float64"))
+    played = pd.DataFrame(
+        {
+            "season": np.tile(history["season"].to_numpy(), 2),
+            "team": np.concatenate(
+                [
+                    history["home_team"].to_numpy(),
+                    history["away_team"].to_numpy(),
+                ]
+            ),
+            "date": np.tile(pd.to_datetime(history["date"]).to_numpy(), 2),
+            "game_count": 1.0,
+            "wins": np.concatenate([home_win_value, away_win_value]),
+            "goals_for": np.concatenate([home_goal, away_goal]),
+            "goals_against": np.concatenate([away_goal, home_goal]),
+        }
+    ).sort_values(["season", "team", "date"], kind="stable")
+    totals = WpcPythAccumulator.TOTALS
+    # Running totals including each game, so a later kickoff sees them.
+    played[totals] = played.groupby(["season", "team"])[totals].cumsum()
+    played = played.sort_values("date", kind="stable")
+
+    n_fixtures = len(data)
+    fixtures = pd.DataFrame(
+        {
+            "position": np.arange(2 * n_fixtures),
+            "season": np.tile(data["season"].to_numpy(), 2),
+            "team": np.concatenate(
+                [data["home_team"].to_numpy(), data["away_team"].to_numpy()]
+            ),
+            "date": np.tile(pd.to_datetime(data["date"]).to_numpy(), 2),
+        }
+    ).astype({"season": played["season"].dtype, "team": played["team"].dtype})
+    fixtures = pd.merge_asof(
+        fixtures.sort_values("date", kind="stable"),
+        played,
+        on="date",
+        by=["season", "team"],
+        allow_exact_matches=False,  # Same day results are not known yet.
+    ).sort_values("position")
+    win_percentage, pyth_expectation = _wpc_pyth_from_totals(fixtures)
+    win_percentage = np.nan_to_num(win_percentage, nan=ASOF_PRIOR)
+    pyth_expectation = np.nan_to_num(pyth_expectation, nan=ASOF_PRIOR)
+    return data.assign(
+        home_win_percentage=win_percentage[:n_fixtures],
+        away_win_percentage=win_percentage[n_fixtures:],
+        home_pythagorean_expectation=pyth_expectation[:n_fixtures],
+        away_pythagorean_expectation=pyth_expectation[n_fixtures:],
+    )
+
+
 def train_soccer_model(
     learner: type[BaseClassifier],
     league: League,
@@ -252,20 +711,20 @@ def train_soccer_model(
     persist: bool = False,
     repository: Optional[AbstractRepository] = None,
 ) -> None:
+    # Only needed for training, slow to import for serving.
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
     _logger.info(f"Retraining predictive model for {league}...")
     league_container = get_league_data_container(league=league.value)(
         datastore=datastore, repository=repository
     )  # type: ignore [call-arg]
     X = league_container.load()
-    X = add_wpc_pyth(
-        data=X,
-        league=league,
-        datastore=datastore,
-        season=None,  # Very Important we specify, season=None
-        repository=repository,
-    )
+    # Point in time features, each game only sees results before kickoff.
+    X = add_asof_wpc_pyth(data=X, history=X)
     y = X["result"].astype("category")
     X = X.drop(columns=["result"])
+    X = X.astype({"date": TIMESTAMP_DTYPE, "time": TIMESTAMP_DTYPE})
     X = X.astype(
         {
             "date": "int64",
@@ -277,6 +736,12 @@ def train_soccer_model(
         }
     )
     X = X[TRAINING_COLS]
+    # Identifies the training data in the model's metadata.
+    fingerprint = hashlib.sha256(
+        pd.util.hash_pandas_object(X.assign(result=y), index=False)
+        .to_numpy()
+        .tobytes()
+    ).hexdigest()
     X_train, X_test, y_train, y_test = train_test_split(
         X,
         y,
@@ -294,27 +759,144 @@ def train_soccer_model(
     _logger.info(f"Accuracy: {accuracy}")
 
     if persist:
-        soccer_model.persist_model(env=env)
+        soccer_model.persist_model(
+            env=env,
+            metadata={
+                "accuracy": float(accuracy),
+                "test_size": test_size,
+                "train_rows": len(X_train),
+                "training_fingerprint": fingerprint,
+            },
+        )
 
 
-def load_wpc_pyth(league: League) -> pd.DataFrame | None:
-    if league.value in WPC_PYTH_CACHE:
-        last_update = WPC_PYTH_CACHE.get(league.value, {}).get(
-            "last_update", pd.Timestamp.min
+def _load_stored_wpc_pyth(
+    league: League,
+    datastore: DataStore = DataStore.DEFAULT,
+    repository: Optional[AbstractRepository] = None,
+) -> pd.DataFrame | None:
+    """Current season wpc/pyth persisted in a datastore, None if not fresh."""
+    try:
+        stored = datastore.value().load_wpc_pyth(
+            league=league,
+            season=Season.CURRENT,
+            repository=repository or DEFAULT_REPOSITORY,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        _logger.warning("WPC PYTH storage lookup miss: %s", e)
+        return None
+
+    last_update = pd.Timestamp(stored["last_update"].min()).to_pydatetime()
+    if (datetime.now() - last_update) >= WPC_PYTH_CACHE.timeout:
+        _logger.warning(
+            "WPC PYTH storage lookup miss: stale, last updated %s", last_update
         )
-        if (datetime.now() - last_update) < WPC_PYTH_CACHE_TIMEOUT:
+        return None
+    _logger.info("WPC PYTH storage hit....")
+    return stored
+
+
+def _compute_current_wpc_pyth(
+    league: League,
+    datastore: DataStore = DataStore.DEFAULT,
+    repository: Optional[AbstractRepository] = None,
+) -> pd.DataFrame:
+    """Fresh current season wpc/pyth, from storage or recomputed."""
+    stored = _load_stored_wpc_pyth(
+        league=league, datastore=datastore, repository=repository
+    )
+    if stored is not None:
+        return stored
+    league_container = get_league_data_container(league=league.value)(
+        datastore=datastore,
+        repository=repository or DEFAULT_REPOSITORY,
+    )  # type: ignore [call-arg]
+    X = league_container.load()
+    X = X[X["season"] == season_to_int(Season.CURRENT)]
+    # In memory only, serving never writes the totals.
+    return apply_new_results(league=league, games=X, cache=False)
+
+
+def _compute_current_wpc_pyth_in_thread(**kwargs: Any) -> pd.DataFrame:
+    """_compute_current_wpc_pyth for a background thread, releasing the
+    thread's database sessions once done."""
+    try:
+        return _compute_current_wpc_pyth(**kwargs)
+    finally:
+        remove_sessions()
+
+
+def refresh_wpc_pyth(
+    league: League,
+    datastore: DataStore = DataStore.DEFAULT,
+    repository: Optional[AbstractRepository] = None,
+    wait: bool = False,
+) -> Optional[WpcPythSnapshot]:
+    """Refresh WPC_PYTH_CACHE for a league, at most one refresh at a time.
+
+    :param league: League to refresh.
+    :param datastore: Datastore to load from, defaults to DataStore.DEFAULT.
+    :param repository: Repository for DataStore.DATABASE, defaults to
+        DEFAULT_REPOSITORY.
+    :param wait: Block until the values are refreshed, defaults to False.
+    :return: The refreshed snapshot if wait, otherwise None.
+    """
+    # Without wait, the refresh only ever runs in a background thread.
+    compute = (
+        _compute_current_wpc_pyth
+        if wait
+        else _compute_current_wpc_pyth_in_thread
+    )
+    return WPC_PYTH_CACHE.refresh(
+        league=league,
+        refresh_func=partial(
+            compute,
+            league=league,
+            datastore=datastore,
+            repository=repository,
+        ),
+        wait=wait,
+    )
+
+
+def load_wpc_pyth(
+    league: League,
+    datastore: DataStore = DataStore.DEFAULT,
+    repository: Optional[AbstractRepository] = None,
+) -> pd.DataFrame | None:
+    """Load current season wpc/pyth from memory or persistent storage.
+
+    The in process WPC_PYTH_CACHE is tried first. A stale snapshot is still
+    returned, while a single background refresh replaces it. Without any
+    snapshot, the datastore's persisted values (pyth_wpc table or
+    <league>_wpc_pyth.csv) are used if their last_update is within the cache
+    timeout, and promoted into the cache.
+
+    :param league: League to load for.
+    :param datastore: Persistent storage to fall back to, defaults to
+        DataStore.DEFAULT.
+    :param repository: Repository for DataStore.DATABASE, defaults to
+        DEFAULT_REPOSITORY.
+    :return: Current season values, None when there are none to serve.
+    """
+    snapshot = WPC_PYTH_CACHE.lookup(league)
+    if snapshot is not None:
+        if snapshot.is_fresh(WPC_PYTH_CACHE.timeout):
             _logger.info("WPC_PYTH cache hit....")
-            return WPC_PYTH_CACHE[league.value]["data"]  # type: ignore [return-value]
         else:
-            _logger.warning(
-                "cache miss for wpc-pyth, trying persistent storage...."
+            _logger.info("WPC_PYTH cache stale, refreshing in background...")
+            refresh_wpc_pyth(
+                league=league, datastore=datastore, repository=repository
             )
-            # Try loading from storage TODO
-            # if fail or does not exists, return None
-            _logger.warning("Storage WPC PYTH not yet implemented...")
-            _logger.warning("WPC PYTH storage lookup miss....")
+        return snapshot.data
 
-    return None
+    _logger.info("cache miss for wpc-pyth, trying persistent storage....")
+    stored = _load_stored_wpc_pyth(
+        league=league, datastore=datastore, repository=repository
+    )
+    if stored is not None:
+        WPC_PYTH_CACHE.put(league=league, data=stored)
+    return stored
 
 
 def add_wpc_pyth(
@@ -333,7 +915,9 @@ def add_wpc_pyth(
                     must exist.
     :param datastore: datastore to use, defaults to DataStore.DEFAULT.
     :param repository: repository to use, defaults to None
-    :raises ValueError: when unsupported season is passed.
+    :raises ValueError: when unsupported season is passed, current season
+        values cannot be computed or a team has no values and is not a team
+        of the league yet to play this season.
     :return: Result with wpc and pyth columns added
     """
     if season not in {Season.CURRENT, None}:
@@ -343,7 +927,9 @@ def add_wpc_pyth(
         )
 
     if season:
-        cached_wpc_pyth = load_wpc_pyth(league=league)
+        cached_wpc_pyth = load_wpc_pyth(
+            league=league, datastore=datastore, repository=repository
+        )
         if (
             isinstance(cached_wpc_pyth, pd.DataFrame)
             and not cached_wpc_pyth.empty
@@ -352,14 +938,18 @@ def add_wpc_pyth(
                 cached_wpc_pyth["season"] == season_to_int(season)
             ]
         else:
-            league_container = get_league_data_container(league=league.value)(
+            # Concurrent cold requests share a single computation.
+            snapshot = refresh_wpc_pyth(
+                league=league,
                 datastore=datastore,
                 repository=repository,
-            )  # type: ignore [call-arg]
-            X = league_container.load()
-            # Filter current season data
-            X = X[X["season"] == season_to_int(season)]
-            X = compute_wpc_pyth(data=X, league=league, cache=True)
+                wait=True,
+            )
+            if snapshot is None:
+                raise ValueError(
+                    f"Unable to compute current season wpc/pyth for {league}"
+                )
+            X = snapshot.data
     else:
         # For all other season, there are no caching so we need to recompute
         # every time. This should only be needed during training so we should
@@ -393,18 +983,79 @@ def add_wpc_pyth(
     data = pd.merge(
         data, home_team_wpc_pyth, how="left", on=["home_team", "season"]
     )
+    # As in training (add_asof_wpc_pyth), a team of the league that has not
+    # played yet this season gets ASOF_PRIOR. Any other gap is an error.
+    wpc_pyth_cols = [
+        f"{side}_{col}"
+        for side in ["home", "away"]
+        for col in ["win_percentage", "pythagorean_expectation"]
+    ]
+    if not data[wpc_pyth_cols].isna().any(axis=None):
+        return data
+    league_teams = get_team_directory(
+        datastore=datastore, repository=repository
+    ).ids(league=league.value)
+    current_season = data["season"].astype("int64") == season_to_int(
+        Season.CURRENT
+    )
+    for side in ["home", "away"]:
+        side_cols = [col for col in wpc_pyth_cols if col.startswith(side)]
+        missing = data[side_cols].isna().any(axis=1)
+        teams = data[f"{side}_team"]
+        yet_to_play = current_season & teams.isin(league_teams.values())
+        unexpected = sorted(map(str, teams[missing & ~yet_to_play].unique()))
+        if unexpected:
+            raise ValueError(
+                f"No {league.value} wpc/pyth found for {side} teams "
+                f"{unexpected}"
+            )
+        if missing.any():
+            _logger.info(
+                "Teams yet to play this season get the prior: %s",
+                sorted(map(str, teams[missing].unique())),
+            )
+    data[wpc_pyth_cols] = data[wpc_pyth_cols].fillna(ASOF_PRIOR)
     return data
 
 
 def compute_cache_all_league_wpc_pyth(
     datastore: DataStore = DataStore.DEFAULT,
 ) -> None:
-    # Compute and cache wpc_pyth but do not persists to disk/database.
+    # Cache wpc_pyth, reusing fresh persisted values when there are some.
+    # Computed values are not persisted to disk/database.
     for league in League:
         with Timer():
-            update_wpc_pyth(
-                league=league, datastore=datastore, persist=False, cache=True
-            )
+            refresh_wpc_pyth(league=league, datastore=datastore, wait=True)
+
+
+def apply_new_results(
+    league: League,
+    games: pd.DataFrame,
+    cache: bool = False,
+    persist: bool = False,
+) -> pd.DataFrame:
+    """Apply new games to the wpc/pyth totals and return the current season.
+
+    Only games not seen before (or with a corrected score) are added to
+    WPC_PYTH_ACCUMULATOR, so this is cheap to call with freshly ingested
+    games or a re-fetched season.
+
+    :param league: League the games belong to.
+    :param games: Cleaned games, e.g. from EPLData.update_current_season.
+    :param cache: If True, also cache the current season values.
+    :param persist: If True, save the totals to the workspace. Only the data
+        maintainer persists, serving keeps them in memory.
+    :return: Current season win percentage and pythagorean expectation.
+    """
+    WPC_PYTH_ACCUMULATOR.apply(league=league, games=games)
+    if persist:
+        WPC_PYTH_ACCUMULATOR.save()
+    wpc_pyth = WPC_PYTH_ACCUMULATOR.wpc_pyth(
+        league=league, season=Season.CURRENT
+    )
+    if cache:
+        WPC_PYTH_CACHE.put(league=league, data=wpc_pyth)
+    return wpc_pyth
 
 
 def update_wpc_pyth(
@@ -412,19 +1063,28 @@ def update_wpc_pyth(
     datastore: Optional[DataStore] = None,
     persist: bool = False,
     cache: bool = False,
+    rebuild: bool = False,
 ) -> None:
     """Update win percentage and pythagorean expectation in persistent storage.
 
     :param league: League for which to update
     :param datastore: Persistent storage for which to update, defaults to None.
                     If None or not provided, update for all DataStore
+    :param rebuild: Recompute the current season totals from scratch instead
+                    of only applying new games, logging a warning if the
+                    running totals had drifted. Defaults to False.
     """
     league_container = get_league_data_container(league=league.value)(
         datastore=datastore or DataStore.DEFAULT, repository=DEFAULT_REPOSITORY
     )  # type: ignore [call-arg]
     X = league_container.load()
     X = X[X["season"] == season_to_int(Season.CURRENT)]
-    wpc_pyth = compute_wpc_pyth(data=X, league=league, cache=cache)
+    if rebuild:
+        WPC_PYTH_ACCUMULATOR.verify(league=league, games=X)
+        WPC_PYTH_ACCUMULATOR.rebuild(league=league, games=X)
+    wpc_pyth = apply_new_results(
+        league=league, games=X, cache=cache, persist=persist
+    )
     if persist:
         # Persists to permanent store
         datastores = [datastore] if datastore else list(DataStore)
@@ -0,0 +1,394 @@
+"""Registry of the serialized models served for each league.
+
+A league's model is ``<ESTIMATOR_LOCATION>/<env>/<league>_<Estimator>.pkl``
+with an optional ``.json`` metadata file next to it, or the compact
+artifact ``<league>_<Estimator>/`` when there is one. The estimator is
+``<LEAGUE>_ESTIMATOR_CLASS`` if set, else the league's estimator in the
+workspace settings, else the default estimator.
+
+Models are loaded per league on first use (or preloaded in the
+background). Every MODEL_REGISTRY_POLL_INTERVAL seconds a lookup checks
+whether the artifact or the estimator setting changed; the new version is
+then loaded in the background and swapped in atomically while requests
+keep using the previous one, so a retrained model is picked up without
+restarting the workers.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import joblib
+
+from freekick.datastore.util import League
+from freekick.utils import _logger, __version__
+from freekick.utils.freekick_config import coerce_env_dir_name
+from freekick.utils.workspace import SETTING_FILE
+
+MODEL_REGISTRY_POLL_INTERVAL = float(
+    os.environ.get("MODEL_REGISTRY_POLL_INTERVAL", "5")
+)
+# "compact" serves the memory mapped compact artifact of a model when it
+# has one (see artifact.py), "pickle" always loads the pickle.
+MODEL_ARTIFACT_FORMAT = os.environ.get("MODEL_ARTIFACT_FORMAT", "compact")
+METADATA_SUFFIX = ".json"
+
+
+class ModelNotFoundError(Exception):
+    pass
+
+
+@dataclass(frozen=True, eq=False)
+class ModelVersion:
+    """A loaded model and the artifact it was loaded from.
+
+    :param league: League the model predicts.
+    :param estimator: Estimator class name.
+    :param path: Path of the serialized model (a directory if compact).
+    :param version: Content hash of the serialized model.
+    :param metadata: Metadata written with the model, empty if missing or
+        written for another version.
+    :param loaded_at: When the model was loaded.
+    :param model: The fitted estimator.
+    """
+
+    league: League
+    estimator: str
+    path: Path
+    version: str
+    metadata: dict[str, Any]
+    loaded_at: datetime
+    model: Any = field(repr=False)
+    # Estimator, path, mtime and size the model was loaded with.
+    stamp: tuple[Any, ...] = field(repr=False, default=())
+    format: str = "pickle"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Readers see the old or the new file, never a partial one.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def save_model_artifact(
+    model: Any, path: Path, metadata: Optional[dict[str, Any]] = None
+) -> dict[str, Any]:
+    """Serialize a model and its metadata, atomically.
+
+    Supported estimators are also saved as a compact artifact next to the
+    pickle, which the registry serves instead.
+
+    :param model: Fitted estimator.
+    :param path: Path of the ``.pkl`` file.
+    :param metadata: Extra metadata, e.g. training accuracy.
+    :return: The metadata written, with the version (content hash) of the
+        serialized model.
+    """
+    # Imported here, artifact imports compiled, which imports learner_utils
+    # and so this module.
+    from .artifact import (
+        MANIFEST_FILE_NAME,
+        compact_artifact_dir,
+        save_compact_artifact,
+    )
+    from .compiled import compile_model
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    data = buffer.getvalue()
+    sha256 = _sha256(data)
+    try:
+        import sklearn
+
+        sklearn_version: Optional[str] = sklearn.__version__
+    except ImportError:
+        sklearn_version = None
+    metadata = {
+        **(metadata or {}),
+        "version": sha256[:12],
+        "sha256": sha256,
+        "estimator_type": type(model).__name__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "freekick_version": str(__version__),
+        "sklearn_version": sklearn_version,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path, data)
+    _write_atomic(
+        path.with_suffix(METADATA_SUFFIX),
+        json.dumps(metadata, indent=2, default=str).encode(),
+    )
+    compiled = compile_model(model)
+    directory = compact_artifact_dir(path)
+    if compiled is not None:
+        save_compact_artifact(
+            model=compiled, directory=directory, metadata=metadata
+        )
+    elif (directory / MANIFEST_FILE_NAME).exists():
+        # An older compact artifact must not shadow this model.
+        (directory / MANIFEST_FILE_NAME).unlink()
+    return metadata
+
+
+class ModelRegistry:
+    """Per league models, lazily loaded and hot swapped.
+
+    - `get` loads a league's model on first use only, so a worker serving
+      one league does not hold the others.
+    - A new artifact or estimator setting is detected at most every
+      `poll_interval` seconds. The new version loads in the background
+      (at most one load per league) and replaces the old one in a single
+      assignment; readers never see a partially loaded model.
+    - If the new artifact cannot be loaded, the current model is kept.
+    """
+
+    def __init__(
+        self,
+        location: Path,
+        default_estimator: str,
+        poll_interval: float = MODEL_REGISTRY_POLL_INTERVAL,
+        settings_file: Path = SETTING_FILE,
+        artifact_format: str = MODEL_ARTIFACT_FORMAT,
+    ) -> None:
+        self.location = location
+        self.default_estimator = default_estimator
+        self.settings_file = settings_file
+        self.artifact_format = artifact_format
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._models: dict[League, ModelVersion] = {}
+        self._checked: dict[League, float] = {}
+        self._loading: dict[League, threading.Lock] = {
+            league: threading.Lock() for league in League
+        }
+        self._swaps = 0
+        # A lock held by another thread at fork time stays locked in the
+        # child, e.g. a preload running in a preloading gunicorn master.
+        os.register_at_fork(after_in_child=self._reset_locks)
+
+    def _reset_locks(self) -> None:
+        self._lock = threading.Lock()
+        self._loading = {league: threading.Lock() for league in League}
+
+    def estimator_name(self, league: League) -> str:
+        """Estimator class name configured for a league."""
+        name = os.environ.get(f"{league.name}_ESTIMATOR_CLASS")
+        if name:
+            return name
+        try:
+            settings = json.loads(self.settings_file.read_text())
+            name = settings["ESTIMATOR"][league.name]
+        except (OSError, KeyError, TypeError, ValueError):
+            name = None
+        return str(name) if name else self.default_estimator
+
+    def artifact_path(self, league: League, estimator: str) -> Path:
+        env_subdir = coerce_env_dir_name(env_name=os.environ["ENV"])
+        return self.location / env_subdir / f"{league.value}_{estimator}.pkl"
+
+    def _stamp(self, league: League) -> tuple[Any, ...]:
+        from .artifact import MANIFEST_FILE_NAME, compact_artifact_dir
+
+        estimator = self.estimator_name(league)
+        path = self.artifact_path(league=league, estimator=estimator)
+        manifest = compact_artifact_dir(path) / MANIFEST_FILE_NAME
+        if self.artifact_format == "compact" and manifest.is_file():
+            path = manifest
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise ModelNotFoundError(
+                f"Serial model {path.name} not found for {league} in "
+                f"{path.parent}."
+            ) from None
+        return (estimator, path, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, league: League, stamp: tuple[Any, ...]) -> ModelVersion:
+        from .artifact import MANIFEST_FILE_NAME, load_compact_artifact
+
+        estimator, path = stamp[0], stamp[1]
+        if path.name == MANIFEST_FILE_NAME:
+            try:
+                model, manifest = load_compact_artifact(path.parent)
+            except Exception:
+                _logger.exception(
+                    f"Loading {path.parent.name} failed, loading the pickle."
+                )
+                path = self.artifact_path(league=league, estimator=estimator)
+            else:
+                _logger.info(
+                    f"Loaded {league} model {path.parent.name} "
+                    f"({manifest['version']}, memory mapped)"
+                )
+                return ModelVersion(
+                    league=league,
+                    estimator=estimator,
+                    path=path.parent,
+                    version=manifest["version"],
+                    metadata=manifest.get("metadata", {}),
+                    loaded_at=datetime.now(),
+                    model=model,
+                    stamp=stamp,
+                    format="compact",
+                )
+        data = path.read_bytes()
+        sha256 = _sha256(data)
+        model = joblib.load(io.BytesIO(data))
+        metadata: dict[str, Any] = {}
+        try:
+            metadata = json.loads(
+                path.with_suffix(METADATA_SUFFIX).read_text()
+            )
+        except (FileNotFoundError, ValueError):
+            pass
+        if metadata.get("sha256") not in (None, sha256):
+            # Written for another version of the artifact.
+            metadata = {}
+        _logger.info(f"Loaded {league} model {path.name} ({sha256[:12]})")
+        return ModelVersion(
+            league=league,
+            estimator=estimator,
+            path=path,
+            version=sha256[:12],
+            metadata=metadata,
+            loaded_at=datetime.now(),
+            model=model,
+            stamp=stamp,
+        )
+
+    def _swap(self, league: League, wait: bool = True) -> ModelVersion:
+        """Load the league's current artifact unless already loaded."""
+        loading = self._loading[league]
+        if not loading.acquire(blocking=wait):
+            # Another thread is loading it, keep serving the current one.
+            return self._models[league]
+        try:
+            stamp = self._stamp(league)
+            current = self._models.get(league)
+            if current is not None and current.stamp == stamp:
+                return current
+            model_version = self._load(league=league, stamp=stamp)
+            with self._lock:
+                self._models[league] = model_version
+                self._checked[league] = time.monotonic()
+                if current is not None:
+                    self._swaps += 1
+            return model_version
+        finally:
+            loading.release()
+
+    def _swap_in_background(self, league: League) -> None:
+        try:
+            self._swap(league=league, wait=False)
+        except Exception:
+            _logger.exception(
+                f"Loading the new {league} model failed, keeping "
+                f"{self._models[league].version}."
+            )
+
+    def check(self, league: League, wait: bool = False) -> ModelVersion:
+        """Swap in a league's model if its artifact or estimator changed.
+
+        :param league: League of the model.
+        :param wait: Load a new version in this thread instead of the
+            background, defaults to False.
+        :raises ModelNotFoundError: Raised when the league has no model
+            loaded and no artifact.
+        :return: The model version in use.
+        """
+        current = self._models.get(league)
+        if current is None:
+            return self._swap(league=league)
+        self._checked[league] = time.monotonic()
+        try:
+            stamp = self._stamp(league)
+        except ModelNotFoundError as e:
+            _logger.warning(f"{e} Keeping {current.path.name}.")
+            return current
+        if stamp == current.stamp:
+            return current
+        if wait:
+            return self._swap(league=league)
+        threading.Thread(
+            target=self._swap_in_background,
+            args=(league,),
+            name=f"model-swap-{league.value}",
+            daemon=True,
+        ).start()
+        return current
+
+    def get(self, league: League) -> Any:
+        """Current model of a league, loaded on first use.
+
+        :raises ModelNotFoundError: Raised when there is no model.
+        """
+        current = self._models.get(league)
+        if current is not None and (
+            time.monotonic() - self._checked.get(league, 0.0)
+            < self.poll_interval
+        ):
+            return current.model
+        return self.check(league).model
+
+    def current(self, league: League) -> Optional[ModelVersion]:
+        """Loaded model version of a league, without loading or checking."""
+        return self._models.get(league)
+
+    def preload(
+        self, leagues: Optional[Iterable[League]] = None
+    ) -> threading.Thread:
+        """Load models in a background thread.
+
+        :param leagues: Leagues to load, defaults to all.
+        :return: The loading thread.
+        """
+
+        def load(leagues: list[League]) -> None:
+            for league in leagues:
+                try:
+                    self.check(league, wait=True)
+                except Exception:
+                    _logger.exception(f"Preloading the {league} model failed.")
+
+        thread = threading.Thread(
+            target=load,
+            args=(list(leagues or League),),
+            name="model-preload",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._checked.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Version, estimator and load time of each loaded model."""
+        with self._lock:
+            return {
+                "swaps": self._swaps,
+                "models": {
+                    league.value: {
+                        "estimator": model.estimator,
+                        "format": model.format,
+                        "version": model.version,
+                        "loaded_at": model.loaded_at.isoformat(),
+                        "created_at": model.metadata.get("created_at"),
+                    }
+                    for league, model in self._models.items()
+                },
+            }
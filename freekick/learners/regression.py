@@ -1,13 +1,15 @@
 """Model for various logistic models."""
 
-from sklearn.linear_model import LogisticRegression as sklearn_LR
-from sklearn.base import BaseEstimator
+from typing import TYPE_CHECKING
 
 from freekick.datastore.util import Backend, League
 from freekick.utils import _logger
 
 from .classification import BaseClassifier
 
+if TYPE_CHECKING:
+    from sklearn.base import BaseEstimator
+
 
 class SoccerLogisticModel(BaseClassifier):
     def __init__(
@@ -16,7 +18,9 @@ class SoccerLogisticModel(BaseClassifier):
         self.backend = backend
         super().__init__(league)
 
-    def init_model(self) -> BaseEstimator:
+    def init_model(self) -> "BaseEstimator":
+        from sklearn.linear_model import LogisticRegression as sklearn_LR
+
         match self.backend:
             case Backend.PANDAS:
                 learner = sklearn_LR
@@ -1,13 +1,41 @@
 from .match_day_predictor import predict_match_day
-from .match_predictor import predict_match
+from .match_predictor import (
+    predict_match,
+    predict_match_probabilities,
+    predict_match_probability,
+    predict_matches,
+)
+from .metrics_service import get_metrics
 from .season_service import get_current_season_teams
+from .season_simulator import predict_season
 from .setting_service import get_setting, update_setting
-from .util import MatchDTO, SettingDTO, SeasonDTO
+from .util import (
+    FixtureDTO,
+    MatchDTO,
+    MatchProbabilityDTO,
+    OutcomeDTO,
+    ProbabilityNotSupportedError,
+    SettingDTO,
+    SeasonDTO,
+    SeasonSimulationDTO,
+    TeamOutlookDTO,
+)
 
 __all__ = [
     "predict_match_day",
     "predict_match",
+    "predict_matches",
+    "predict_match_probability",
+    "predict_match_probabilities",
+    "get_metrics",
+    "FixtureDTO",
+    "predict_season",
+    "SeasonSimulationDTO",
+    "TeamOutlookDTO",
     "MatchDTO",
+    "MatchProbabilityDTO",
+    "OutcomeDTO",
+    "ProbabilityNotSupportedError",
     "SettingDTO",
     "SeasonDTO",
     "get_current_season_teams",
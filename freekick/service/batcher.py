@@ -0,0 +1,198 @@
+"""Coalesce concurrent prediction requests into batches."""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, Optional, TypeVar
+
+from freekick.utils import _logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A batch closes after MICRO_BATCH_WINDOW_MS or once it has
+# MICRO_BATCH_SIZE requests, whichever comes first. A size of 1 disables
+# batching.
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_SIZE = int(os.environ.get("MICRO_BATCH_SIZE", "64"))
+# A caller whose batch is not done after MICRO_BATCH_TIMEOUT_MS calls the
+# handler itself instead.
+MICRO_BATCH_TIMEOUT_MS = float(
+    os.environ.get("MICRO_BATCH_TIMEOUT_MS", "1000")
+)
+
+
+class MicroBatcher(Generic[T, R]):
+    """Run concurrent calls of a function as one call on a batch.
+
+    Callers `submit` single items from any thread and block for their own
+    result. A background thread takes the first waiting item, collects the
+    items arriving within `max_wait` seconds (at most `max_batch_size`)
+    and hands them to `handler` at once, which returns a result per item.
+    If the batch fails, its items are retried one by one so an invalid
+    request only fails its own caller. A caller not served within
+    `timeout` seconds (e.g. behind a slow batch) runs the handler on its
+    item itself.
+
+    The thread starts on first use and again in a forked process (e.g. a
+    gunicorn worker), threads do not survive a fork.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], list[R]],
+        max_batch_size: int = MICRO_BATCH_SIZE,
+        max_wait: float = MICRO_BATCH_WINDOW_MS / 1000,
+        timeout: float = MICRO_BATCH_TIMEOUT_MS / 1000,
+        name: str = "micro-batcher",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(
+                f"max_batch_size must be positive: {max_batch_size}"
+            )
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.name = name
+        self._queue: queue.SimpleQueue[tuple[T, Future[R], float]] = (
+            queue.SimpleQueue()
+        )
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "failed_batches": 0,
+            "timeouts": 0,
+            "max_batch_size": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+        # Batch sizes by power of two bucket, e.g. "<=8" counts 5 to 8.
+        self._batch_sizes: dict[str, int] = {}
+
+    def submit(self, item: T, timeout: Optional[float] = None) -> R:
+        """Add an item to the next batch and wait for its result.
+
+        :param item: Item to pass to the handler.
+        :param timeout: Seconds to wait for the batch before calling the
+            handler directly, defaults to None (the batcher's timeout).
+        :raises Exception: Whatever the handler raised for this item.
+        :return: The handler's result for the item.
+        """
+        if self.max_batch_size == 1:
+            # Batching disabled, no need for the thread hop.
+            return self.handler([item])[0]
+        timeout = self.timeout if timeout is None else timeout
+        self._ensure_worker()
+        future: Future[R] = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Dropped from its batch unless already being handled.
+            future.cancel()
+            with self._lock:
+                self._stats["timeouts"] += 1
+            _logger.warning(
+                f"{self.name}: no result after {timeout}s, "
+                "calling the handler directly."
+            )
+            return self.handler([item])[0]
+
+    def stats(self) -> dict[str, object]:
+        """Batch count, batch size and wait time (enqueue to handler) metrics."""
+        with self._lock:
+            stats: dict[str, object] = dict(self._stats)
+            batches = self._stats["batches"]
+            stats["mean_batch_size"] = (
+                self._stats["items"] / batches if batches else 0.0
+            )
+            stats["mean_wait_ms"] = (
+                self._stats["total_wait_ms"] / self._stats["items"]
+                if self._stats["items"]
+                else 0.0
+            )
+            stats["batch_sizes"] = dict(self._batch_sizes)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _ensure_worker(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                ).start()
+                self._pid = os.getpid()
+
+    def _collect(self) -> list[tuple[T, Future[R], float]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Take what is already waiting, without waiting more.
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Skip the items whose caller timed out and stopped waiting.
+            batch = [
+                entry
+                for entry in self._collect()
+                if entry[1].set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            self._record(batch, started)
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.handler(items)
+                if len(results) != len(items):
+                    raise ValueError(
+                        f"{len(results)} results for {len(items)} items."
+                    )
+            except Exception:
+                _logger.exception(
+                    f"{self.name}: batch of {len(items)} failed, retrying "
+                    "items one by one."
+                )
+                with self._lock:
+                    self._stats["failed_batches"] += 1
+                for item, future, _ in batch:
+                    try:
+                        future.set_result(self.handler([item])[0])
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results, strict=True):
+                future.set_result(result)
+
+    def _record(
+        self, batch: list[tuple[T, Future[R], float]], started: float
+    ) -> None:
+        waits_ms = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        bucket = f"<={1 << (len(batch) - 1).bit_length()}"
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["max_batch_size"] = max(
+                self._stats["max_batch_size"], len(batch)
+            )
+            self._stats["total_wait_ms"] += sum(waits_ms)
+            self._stats["max_wait_ms"] = max(
+                self._stats["max_wait_ms"], *waits_ms
+            )
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
@@ -1,16 +1,93 @@
-from .util import MatchDTO
-
-
-def predict_match_day(league: str) -> list[MatchDTO]:
-    raise NotImplementedError
-    return [
-        MatchDTO(
-            home_team="Team1", away_team="Team2", predicted_winner="TEAM1"
-        ),
-        MatchDTO(
-            home_team="Team3", away_team="Team4", predicted_winner="TEAM4"
-        ),
-        MatchDTO(
-            home_team="Team6", away_team="Team5", predicted_winner="TEAM6"
-        ),
-    ]
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+from freekick.datastore import READ_ONLY_REPOSITORY
+from freekick.datastore.fixtures import FIXTURE_STORE
+from freekick.datastore.util import DataStore, League, Season
+from freekick.utils import _logger
+
+from .match_predictor import predict_matches
+from .util import FixtureDTO, MatchDTO, _prediction_version
+
+REPOSITORY = READ_ONLY_REPOSITORY
+
+
+@dataclass(frozen=True)
+class _GameweekPrediction:
+    # Predictions are valid for the versions of the fixtures, model and
+    # wpc/pyth features they were made with, on the day they were made.
+    version: tuple[Any, ...]
+    matches: list[MatchDTO]
+
+
+_PREDICTIONS: dict[tuple[League, int], _GameweekPrediction] = {}
+_LOCK = threading.Lock()
+
+
+def _features_version(league: League) -> tuple[Any, ...]:
+    # Kick off times are featurized on today's date, like the prediction
+    # matrices, so predictions made yesterday are outdated.
+    return (
+        FIXTURE_STORE.version(league=league),
+        date.today(),
+        *_prediction_version(league),
+    )
+
+
+def predict_match_day(
+    league: str | League, gameweek: Optional[int] = None
+) -> list[MatchDTO]:
+    """Predict all matches of a gameweek of the current season.
+
+    The whole gameweek is predicted in one batched model pass and kept in
+    memory until the model, fixtures or wpc/pyth features change, so
+    repeated requests do not touch the model.
+
+    :param league: League to make predictions in.
+    :param gameweek: Gameweek number, defaults to the current gameweek (the
+        first one with games left to play).
+    :raises GameweekNotFoundError: Raised when there is no such gameweek.
+    :return: Results of prediction, in kick off order.
+    """
+    if isinstance(league, str):
+        league = League[league.upper()]
+    fixtures = FIXTURE_STORE.load(
+        league=league, datastore=DataStore.DEFAULT, repository=REPOSITORY
+    )
+    gameweek = fixtures.current if gameweek is None else gameweek
+    version = _features_version(league)
+    cached = _PREDICTIONS.get((league, gameweek))
+    if cached is not None and cached.version == version:
+        return cached.matches
+
+    _logger.info(f"Request Type: Gameweek {gameweek} Prediction ({league})")
+    games = fixtures.gameweek(gameweek)
+    matches = predict_matches(
+        league=league,
+        fixtures=[
+            FixtureDTO(
+                home_team=game.home_team,
+                away_team=game.away_team,
+                attendance=0,
+                match_date=game.date.date().isoformat(),
+                time=game.time,
+            )
+            for game in games.itertuples(index=False)
+        ],
+        season=Season.CURRENT,
+    )
+    if version[-1] is None:
+        # Predicting loaded the missing wpc/pyth features.
+        version = _features_version(league)
+    with _LOCK:
+        _PREDICTIONS[(league, gameweek)] = _GameweekPrediction(
+            version=version, matches=matches
+        )
+    return matches
+
+
+def clear_match_day_cache() -> None:
+    with _LOCK:
+        _PREDICTIONS.clear()
@@ -1,15 +1,55 @@
-from datetime import datetime
+from datetime import date
+from typing import Any, Hashable, Optional
 
-import pandas as pd
+import numpy as np
 
-from freekick.datastore import DATA_UTIL, DEFAULT_REPOSITORY
-from freekick.datastore.util import League, Season, season_to_int
-from freekick.learners.learner_utils import add_wpc_pyth
+from freekick.datastore import remove_sessions
+from freekick.datastore.util import DATA_VERSION, League, Season
 from freekick.utils import _logger
 
-from .util import MatchDTO, _predict
+from .batcher import MicroBatcher
+from .prediction_matrix import PREDICTION_MATRICES
+from .result_cache import PREDICTION_CACHE_ATTENDANCE_BUCKET, ResultCache
+from .util import (
+    RESULT_CLASSES,
+    RESULT_LABELS,
+    FixtureDTO,
+    MatchDTO,
+    MatchProbabilityDTO,
+    OutcomeDTO,
+    _fixture_features,
+    _predict,
+    _predict_compiled,
+    _predict_proba,
+    _predict_proba_compiled,
+    _prediction_version,
+)
 
-REPOSITORY = DEFAULT_REPOSITORY
+# Predictions of fixtures outside the default context (which is served by
+# the prediction matrix), by fixture context.
+MATCH_CACHE: ResultCache[MatchDTO] = ResultCache()
+
+
+def _cache_key(
+    league: League, season: Season, fixture: FixtureDTO
+) -> Hashable:
+    attendance = fixture.attendance
+    if attendance is not None and PREDICTION_CACHE_ATTENDANCE_BUCKET > 1:
+        attendance = attendance // PREDICTION_CACHE_ATTENDANCE_BUCKET
+    return (
+        league,
+        season,
+        fixture.home_team,
+        fixture.away_team,
+        # No date means today, a cached prediction must not outlive it.
+        fixture.match_date or date.today().isoformat(),
+        fixture.time,
+        attendance,
+    )
+
+
+def _cache_version(league: League) -> tuple[Any, ...]:
+    return (DATA_VERSION.current(), *_prediction_version(league))
 
 
 def predict_match(
@@ -24,7 +64,7 @@ def predict_match(
     """Predict a single match with using data passed from frontend.
 
     Prediction is done via the default pre-configured learner/model for each
-    league in serial_models.
+    league in the model registry.
 
     :param league: League to make prediction in.
     :param home_team: Code of the home team.
@@ -36,58 +76,299 @@ def predict_match(
     :return: Results of prediction.
     :rtype: list[MatchDTO]
     """
-    if isinstance(league, str):
-        league = League[league.upper()]
     _logger.info(
         "Request Type: Single Match Prediction\n"
         " League\t\tHomeTeam\tAwayTeam\tTime\tDate\n"
         f" {league}\t{home_team}\t\t{away_team}\t\t{time}\t{match_date}\n"
     )
+    if isinstance(league, str):
+        league = League[league.upper()]
+    if season == Season.CURRENT and match_date is None and time is None:
+        # Default context, answered from the precomputed predictions.
+        matrix = PREDICTION_MATRICES.get(league)
+        prediction = (
+            matrix.lookup(home_team, away_team, attendance) if matrix else None
+        )
+        if prediction is not None:
+            outcome, _ = prediction
+            return [
+                MatchDTO(
+                    home_team=home_team,
+                    away_team=away_team,
+                    predicted_winner=_winner(home_team, away_team, outcome),
+                )
+            ]
+    fixture = FixtureDTO(
+        home_team=home_team,
+        away_team=away_team,
+        attendance=attendance,
+        match_date=match_date,
+        time=time,
+    )
+    key = _cache_key(league=league, season=season, fixture=fixture)
+    version = _cache_version(league)
+    match = MATCH_CACHE.get(key, version=version)
+    if match is not None:
+        return [match]
+    compiled = _predict_compiled(league=league, fixture=fixture, season=season)
+    if compiled is not None:
+        match = MatchDTO(
+            home_team=home_team,
+            away_team=away_team,
+            predicted_winner=_winner(home_team, away_team, compiled),
+        )
+    else:
+        # Concurrent requests share one feature join and model call.
+        match = MATCH_BATCHER.submit((league, season, fixture))
+    if version[-1] is None:
+        # Predicting loaded the missing wpc/pyth features.
+        version = _cache_version(league)
+    MATCH_CACHE.put(key, version=version, value=match)
+    return [match]
 
-    home_id = DATA_UTIL.get_team_id(team_code=home_team, repository=REPOSITORY)
-    away_id = DATA_UTIL.get_team_id(team_code=away_team, repository=REPOSITORY)
 
-    date = (
-        pd.Timestamp(match_date)
-        if match_date
-        else pd.Timestamp(datetime.now().date())
-    )
-    data = {
-        "date": [date],
-        "day_of_week": date.day_of_week,
-        "time": [pd.to_datetime(time)] if time else [pd.to_datetime("13:30")],
-        "home_team": [home_id],
-        "away_team": [away_id],
-        "season": [season_to_int(season)],
-        "attendance": [attendance],
-    }
-    single_match_df = pd.DataFrame(data).astype(
-        {
-            "date": "int64",
-            "time": "int64",
-            "home_team": "category",
-            "away_team": "category",
-            "season": "category",
-        }
-    )
-    single_match_df = add_wpc_pyth(
-        data=single_match_df,
-        league=league,
-        season=season,
-        repository=REPOSITORY,
+def _predict_batch(
+    requests: list[tuple[League, Season, FixtureDTO]],
+) -> list[MatchDTO]:
+    """Predict coalesced single match requests.
+
+    :param requests: League, season and fixture of each request.
+    :return: Result of each request, one predict_matches call per league
+        and season.
+    """
+    groups: dict[tuple[League, Season], list[int]] = {}
+    for i, (league, season, _) in enumerate(requests):
+        groups.setdefault((league, season), []).append(i)
+    results: list[MatchDTO] = [None] * len(requests)  # type: ignore [list-item]
+    try:
+        for (league, season), indices in groups.items():
+            matches = predict_matches(
+                league=league,
+                fixtures=[requests[i][2] for i in indices],
+                season=season,
+            )
+            for i, match in zip(indices, matches, strict=True):
+                results[i] = match
+    finally:
+        # Runs on the batcher thread, outside any request teardown.
+        remove_sessions()
+    return results
+
+
+MATCH_BATCHER: MicroBatcher[tuple[League, Season, FixtureDTO], MatchDTO] = (
+    MicroBatcher(handler=_predict_batch, name="match-batcher")
+)
+
+
+def _winner(home_team: str, away_team: str, outcome: int) -> str:
+    if outcome > 0:
+        return home_team
+    return away_team if outcome < 0 else "Draw"
+
+
+def predict_matches(
+    league: str | League,
+    fixtures: list[FixtureDTO],
+    season: Season = Season.CURRENT,
+) -> list[MatchDTO]:
+    """Predict a batch of matches with a single model call.
+
+    Team ids are resolved in one lookup, wpc/pyth features attached with
+    one join and the model predicts all fixtures at once, so predicting a
+    full round of fixtures costs about the same as a single match.
+
+    :param league: League to make predictions in.
+    :param fixtures: Fixtures to predict, teams given by code.
+    :param season: Season Code, defaults to Season.CURRENT
+    :return: Results of prediction, in the order of fixtures.
+    """
+    if isinstance(league, str):
+        league = League[league.upper()]
+    if not fixtures:
+        return []
+    _logger.info(
+        f"Request Type: Batch Match Prediction ({len(fixtures)} matches)"
     )
-    pred = _predict(single_match_df, league=league)
+
+    data = _fixture_features(league=league, fixtures=fixtures, season=season)
+    pred = _predict(data, league=league)
     _logger.debug(f"Prediction: {pred}")
-    result_int: int = int(pred[0])
-    result = (
-        "Draw"
-        if result_int == 0
-        else (home_team if result_int > 0 else away_team)
+    outcomes = np.asarray(pred, dtype="int64")
+    home_teams = np.array([fixture.home_team for fixture in fixtures])
+    away_teams = np.array([fixture.away_team for fixture in fixtures])
+    winners = np.select(
+        [outcomes > 0, outcomes < 0],
+        [home_teams, away_teams],
+        default="Draw",
     )
-    match_dto = [
+    match_dtos = [
         MatchDTO(
-            home_team=home_team, away_team=away_team, predicted_winner=result
+            home_team=fixture.home_team,
+            away_team=fixture.away_team,
+            predicted_winner=str(winner),
+        )
+        for fixture, winner in zip(fixtures, winners, strict=True)
+    ]
+    _logger.debug(match_dtos)
+    return match_dtos
+
+
+def _check_outcome_filter(
+    top_k: Optional[int], threshold: Optional[float]
+) -> None:
+    if top_k is not None and not 1 <= top_k <= len(RESULT_LABELS):
+        raise ValueError(
+            f"top_k must be between 1 and {len(RESULT_LABELS)}, got {top_k}"
+        )
+    if threshold is not None and not 0 <= threshold <= 1:
+        raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+
+
+def _probability_dto(
+    home_team: str,
+    away_team: str,
+    proba: np.ndarray,  # type: ignore [type-arg]
+    top_k: Optional[int],
+    threshold: Optional[float],
+) -> MatchProbabilityDTO:
+    """Probabilities of a fixture, outcomes ranked and filtered.
+
+    :param proba: Away win, draw and home win probabilities.
+    """
+    ranked = [
+        OutcomeDTO(outcome=RESULT_LABELS[i], probability=float(proba[i]))
+        for i in np.argsort(-proba, kind="stable")
+        if threshold is None or proba[i] >= threshold
+    ]
+    return MatchProbabilityDTO(
+        home_team=home_team,
+        away_team=away_team,
+        predicted_winner=_winner(
+            home_team, away_team, RESULT_CLASSES[int(np.argmax(proba))]
+        ),
+        away_win=float(proba[0]),
+        draw=float(proba[1]),
+        home_win=float(proba[2]),
+        outcomes=ranked[:top_k],
+    )
+
+
+def predict_match_probabilities(
+    league: str | League,
+    fixtures: list[FixtureDTO],
+    season: Season = Season.CURRENT,
+    top_k: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> list[MatchProbabilityDTO]:
+    """Predict home win, draw and away win probabilities of matches.
+
+    Features are built with one join and the probabilities of all fixtures
+    come from a single predict_proba call. The predicted winner is the
+    most likely result.
+
+    :param league: League to make predictions in.
+    :param fixtures: Fixtures to predict, teams given by code.
+    :param season: Season Code, defaults to Season.CURRENT
+    :param top_k: Only list the k most likely outcomes, defaults to None
+        (all three).
+    :param threshold: Only list outcomes at least this likely, defaults to
+        None (all).
+    :raises ValueError: Raised when top_k or threshold is out of range.
+    :raises ProbabilityNotSupportedError: Raised when the league's model
+        does not predict probabilities.
+    :return: Probabilities of each fixture, in the order of fixtures.
+    """
+    _check_outcome_filter(top_k=top_k, threshold=threshold)
+    if isinstance(league, str):
+        league = League[league.upper()]
+    if not fixtures:
+        return []
+    _logger.info(
+        f"Request Type: Match Probability Prediction ({len(fixtures)} matches)"
+    )
+    data = _fixture_features(league=league, fixtures=fixtures, season=season)
+    proba = _predict_proba(data, league=league)[RESULT_LABELS].to_numpy()
+    return [
+        _probability_dto(
+            home_team=fixture.home_team,
+            away_team=fixture.away_team,
+            proba=row,
+            top_k=top_k,
+            threshold=threshold,
+        )
+        for fixture, row in zip(fixtures, proba, strict=True)
+    ]
+
+
+def predict_match_probability(
+    league: str | League,
+    home_team: str,
+    away_team: str,
+    attendance: int | float | None = None,
+    season: Season = Season.CURRENT,
+    match_date: str | None = None,
+    time: str | None = None,
+    top_k: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> list[MatchProbabilityDTO]:
+    """Predict home win, draw and away win probabilities of a match.
+
+    Like predict_match, the default context is answered from the prediction
+    matrix and other current season fixtures by the compiled model when
+    possible.
+
+    :param league: League to make prediction in.
+    :param home_team: Code of the home team.
+    :param away_team: Code of the away team
+    :param attendance: Approximate number of attendance
+    :param season: Season Code, defaults to Season.CURRENT
+    :param match_date: Date the game is played, defaults to None
+    :param time: Time the game is played, defaults to None
+    :param top_k: Only list the k most likely outcomes, defaults to None
+    :param threshold: Only list outcomes at least this likely, defaults to
+        None
+    :raises ValueError: Raised when top_k or threshold is out of range.
+    :raises ProbabilityNotSupportedError: Raised when the league's model
+        does not predict probabilities.
+    :return: Probabilities of the match.
+    """
+    _check_outcome_filter(top_k=top_k, threshold=threshold)
+    if isinstance(league, str):
+        league = League[league.upper()]
+    fixture = FixtureDTO(
+        home_team=home_team,
+        away_team=away_team,
+        attendance=attendance,
+        match_date=match_date,
+        time=time,
+    )
+    proba = None
+    if season == Season.CURRENT and match_date is None and time is None:
+        matrix = PREDICTION_MATRICES.get(league)
+        prediction = (
+            matrix.lookup(home_team, away_team, attendance) if matrix else None
+        )
+        # NaN when the model does not predict probabilities.
+        if prediction is not None and not np.isnan(prediction[1]).any():
+            proba = prediction[1]
+    if proba is None:
+        proba = _predict_proba_compiled(
+            league=league, fixture=fixture, season=season
+        )
+    if proba is None:
+        return predict_match_probabilities(
+            league=league,
+            fixtures=[fixture],
+            season=season,
+            top_k=top_k,
+            threshold=threshold,
+        )
+    return [
+        _probability_dto(
+            home_team=home_team,
+            away_team=away_team,
+            proba=proba,
+            top_k=top_k,
+            threshold=threshold,
         )
     ]
-    _logger.debug(match_dto)
-    return match_dto
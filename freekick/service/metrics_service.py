@@ -0,0 +1,21 @@
+from freekick.learners.learner_utils import MODEL_REGISTRY, WPC_PYTH_CACHE
+
+from .match_predictor import MATCH_BATCHER, MATCH_CACHE
+from .warm_up import WARM_UP
+
+
+def get_metrics() -> dict[str, dict[str, object]]:
+    """Runtime metrics of the prediction service, for this process.
+
+    :return: Metrics by component: match_batcher (batch sizes and wait
+        times), match_cache (hits, misses, evictions and size),
+        wpc_pyth_cache (hits, misses and refreshes) and model_registry
+        (loaded model versions and swaps) and warm_up (readiness).
+    """
+    return {
+        "match_batcher": MATCH_BATCHER.stats(),
+        "match_cache": dict(MATCH_CACHE.stats()),
+        "wpc_pyth_cache": dict(WPC_PYTH_CACHE.stats()),
+        "model_registry": MODEL_REGISTRY.stats(),
+        "warm_up": WARM_UP.stats(),
+    }
@@ -0,0 +1,189 @@
+"""Precomputed predictions of every current season fixture.
+
+A 20 team league has 380 possible fixtures, so instead of building
+features and calling the model on each request, predictions of every
+(home, away) pair are computed at once for the default context: no match
+date (today), the default kick off time and a default attendance. Requests
+in that context are answered by array indexing.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+import numpy as np
+
+from freekick.datastore import READ_ONLY_REPOSITORY
+from freekick.datastore.fixtures import FIXTURE_STORE, GameweekNotFoundError
+from freekick.datastore.util import DataStore, League, Season
+from freekick.utils import _logger
+
+from .util import (
+    RESULT_LABELS,
+    FixtureDTO,
+    ProbabilityNotSupportedError,
+    _fixture_features,
+    _predict,
+    _predict_proba,
+    _prediction_version,
+)
+
+REPOSITORY = READ_ONLY_REPOSITORY
+# Attendances of the default context: missing (API) and 0 (cli).
+MATRIX_ATTENDANCES = (None, 0)
+
+
+@dataclass(frozen=True)
+class PredictionMatrix:
+    """Predictions of every fixture between the teams of a season.
+
+    :param version: Version of the teams, model and features, and the date
+        the predictions were made for.
+    :param teams: Index of each team code in the arrays.
+    :param outcomes: Predicted result (1 home win, 0 draw, -1 away win) by
+        attendance (index in MATRIX_ATTENDANCES), home team and away team.
+    :param proba: Away win, draw and home win probabilities, same indices
+        as outcomes. NaN if the model does not predict probabilities.
+    """
+
+    version: tuple[Any, ...]
+    teams: dict[str, int]
+    outcomes: np.ndarray  # type: ignore [type-arg]
+    proba: np.ndarray  # type: ignore [type-arg]
+
+    def lookup(
+        self, home_team: str, away_team: str, attendance: Optional[float]
+    ) -> Optional[tuple[int, np.ndarray]]:  # type: ignore [type-arg]
+        """Prediction of a fixture in the default context.
+
+        :return: Outcome and probabilities, None if the fixture is not in
+            the matrix.
+        """
+        home = self.teams.get(home_team)
+        away = self.teams.get(away_team)
+        if home is None or away is None or home == away:
+            return None
+        context = _attendance_index(attendance)
+        if context is None:
+            return None
+        return (
+            int(self.outcomes[context, home, away]),
+            self.proba[context, home, away],
+        )
+
+
+def _attendance_index(attendance: Optional[float]) -> Optional[int]:
+    if attendance is None:
+        return 0
+    return 1 if attendance == 0 else None
+
+
+def _matrix_version(league: League) -> tuple[Any, ...]:
+    return (
+        FIXTURE_STORE.version(league=league),
+        date.today(),
+        *_prediction_version(league),
+    )
+
+
+class PredictionMatrices:
+    """Prediction matrix of each league, rebuilt when outdated.
+
+    A matrix is checked against the current teams, model, wpc/pyth and date
+    on each lookup, so it is recomputed after models load or wpc/pyth
+    refreshes. It is built once however many requests find it outdated.
+    """
+
+    def __init__(self) -> None:
+        self._matrices: dict[League, Optional[PredictionMatrix]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, league: League) -> Optional[PredictionMatrix]:
+        """Up to date prediction matrix of a league.
+
+        :return: The matrix, None if the league has no current season
+            fixtures to take the teams from.
+        """
+        matrix = self._matrices.get(league)
+        if matrix is not None and matrix.version == _matrix_version(league):
+            return matrix
+        with self._lock:
+            matrix = self._matrices.get(league)
+            if matrix is None or matrix.version != _matrix_version(league):
+                matrix = self._build(league)
+                self._matrices[league] = matrix
+        return matrix
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrices.clear()
+
+    @staticmethod
+    def _build(league: League) -> Optional[PredictionMatrix]:
+        try:
+            games = FIXTURE_STORE.load(
+                league=league,
+                datastore=DataStore.DEFAULT,
+                repository=REPOSITORY,
+            ).data
+        except GameweekNotFoundError:
+            return None
+        codes = sorted(set(games["home_team"]) | set(games["away_team"]))
+        pairs = [
+            (home, away) for home in codes for away in codes if home != away
+        ]
+        _logger.info(
+            f"Building {league} prediction matrix: {len(codes)} teams, "
+            f"{len(pairs)} fixtures"
+        )
+        fixtures = [
+            FixtureDTO(home_team=home, away_team=away, attendance=attendance)
+            for attendance in MATRIX_ATTENDANCES
+            for home, away in pairs
+        ]
+        data = _fixture_features(
+            league=league, fixtures=fixtures, season=Season.CURRENT
+        )
+        # Taken after loading the features, which may have loaded wpc/pyth.
+        version = _matrix_version(league)
+        outcomes = np.asarray(_predict(data, league=league), dtype="int8")
+        try:
+            proba = _predict_proba(data, league=league)[RESULT_LABELS]
+            proba = proba.to_numpy()
+        except ProbabilityNotSupportedError:
+            # e.g. SVC without probability estimates.
+            proba = np.full((len(fixtures), 3), np.nan)
+
+        teams = {code: i for i, code in enumerate(codes)}
+        n_teams = len(codes)
+        home = np.tile(
+            [teams[home] for home, _ in pairs], len(MATRIX_ATTENDANCES)
+        )
+        away = np.tile(
+            [teams[away] for _, away in pairs], len(MATRIX_ATTENDANCES)
+        )
+        context = np.repeat(np.arange(len(MATRIX_ATTENDANCES)), len(pairs))
+        outcome_matrix = np.zeros(
+            (len(MATRIX_ATTENDANCES), n_teams, n_teams), dtype="int8"
+        )
+        outcome_matrix[context, home, away] = outcomes
+        proba_matrix = np.full(
+            (len(MATRIX_ATTENDANCES), n_teams, n_teams, 3), np.nan
+        )
+        proba_matrix[context, home, away] = proba
+        return PredictionMatrix(
+            version=version,
+            teams=teams,
+            outcomes=outcome_matrix,
+            proba=proba_matrix,
+        )
+
+
+PREDICTION_MATRICES = PredictionMatrices()
+
+
+def build_prediction_matrices() -> None:
+    """Precompute the prediction matrix of every league."""
+    for league in League:
+        PREDICTION_MATRICES.get(league)
@@ -0,0 +1,86 @@
+"""Bounded in-memory cache of prediction results."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+# Attendances within the same bucket share a cached prediction, e.g. 1000
+# answers 52300 and 52900 alike. 1 only reuses identical attendances.
+PREDICTION_CACHE_ATTENDANCE_BUCKET = int(
+    os.environ.get("PREDICTION_CACHE_ATTENDANCE_BUCKET", "1000")
+)
+
+
+class ResultCache(Generic[V]):
+    """LRU cache whose entries expire and belong to a version.
+
+    - At most `maxsize` entries, the least recently used is evicted first.
+    - Entries older than `ttl` seconds are misses.
+    - Each entry records the version (e.g. model and features) its value
+      was computed with; looking it up with another version is a miss, so
+      refreshing the model or features invalidates it without a flush.
+    - Hit, miss, expired, outdated and eviction counters are kept in
+      `stats()`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float, V]] = (
+            OrderedDict()
+        )
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "outdated": 0,
+            "evictions": 0,
+        }
+
+    def get(self, key: Hashable, version: Any) -> Optional[V]:
+        """Cached value of key if computed with version and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry_version, expires, value = entry
+            if entry_version != version or expires <= time.monotonic():
+                del self._entries[key]
+                self._stats[
+                    "outdated" if entry_version != version else "expired"
+                ] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, version: Any, value: V) -> None:
+        if self.maxsize < 1:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
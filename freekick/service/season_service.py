@@ -1,5 +1,4 @@
-from freekick.datastore import get_or_create_session
-from freekick.datastore.repository import SQLAlchemyRepository
+from freekick.datastore import READ_ONLY_REPOSITORY
 from freekick.datastore.util import DBUtils, Season
 
 from .util import SeasonDTO
@@ -11,8 +10,7 @@ def get_current_season_teams(league: str) -> SeasonDTO:
     :param league: League code
     :return: A SeasonDTO
     """
-    repository = SQLAlchemyRepository(get_or_create_session())
     _, teams = DBUtils.get_teams(
-        repository=repository, league=league, season=Season.CURRENT
+        repository=READ_ONLY_REPOSITORY, league=league, season=Season.CURRENT
     )
     return SeasonDTO(season=Season.CURRENT.value, teams=teams)
@@ -0,0 +1,256 @@
+"""Monte Carlo simulation of the rest of a season."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Optional
+
+import numpy as np
+
+from freekick.datastore import READ_ONLY_REPOSITORY
+from freekick.datastore.fixtures import FIXTURE_STORE
+from freekick.datastore.util import DataStore, League, Season
+from freekick.utils import _logger
+
+from .util import (
+    RESULT_LABELS,
+    FixtureDTO,
+    SeasonSimulationDTO,
+    TeamOutlookDTO,
+    _fixture_features,
+    _predict_proba,
+)
+
+REPOSITORY = READ_ONLY_REPOSITORY
+DEFAULT_SIMULATIONS = 10_000
+# Seasons simulated per draw, bounds a draw's memory to about
+# SHARD_SIZE * remaining games * 8 bytes. Shards are also the unit of work
+# of the process pool, so results only depend on the seed.
+SHARD_SIZE = 10_000
+TOP_FOUR = 4
+RELEGATED = 3
+
+
+@dataclass(frozen=True)
+class SeasonState:
+    """Standings and remaining games of a season, as arrays.
+
+    :param teams: Team codes, teams are referred to by their index in it.
+    :param points: Points of each team so far.
+    :param goal_difference: Goal difference of each team so far, the tie
+        breaker of teams level on points.
+    :param home: Home team index of each remaining game.
+    :param away: Away team index of each remaining game.
+    :param proba: Away win, draw and home win probabilities of each
+        remaining game.
+    """
+
+    teams: np.ndarray  # type: ignore [type-arg]
+    points: np.ndarray  # type: ignore [type-arg]
+    goal_difference: np.ndarray  # type: ignore [type-arg]
+    home: np.ndarray  # type: ignore [type-arg]
+    away: np.ndarray  # type: ignore [type-arg]
+    proba: np.ndarray  # type: ignore [type-arg]
+
+
+def _simulate_shard(
+    state: SeasonState, simulations: int, seed: np.random.SeedSequence
+) -> tuple[np.ndarray, np.ndarray]:  # type: ignore [type-arg]
+    """Simulate the remaining games of a season.
+
+    :return: Number of times each team (rows) finished in each position
+        (columns) and the total points of each team over all simulations.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(state.teams)
+    # One-hot (game, team) matrices scatter the points of every game onto
+    # its teams with a matrix product.
+    home = np.zeros((len(state.home), n_teams), dtype="float32")
+    home[np.arange(len(state.home)), state.home] = 1
+    away = np.zeros((len(state.away), n_teams), dtype="float32")
+    away[np.arange(len(state.away)), state.away] = 1
+    home_win_cut = state.proba[:, 2]
+    draw_cut = state.proba[:, 2] + state.proba[:, 1]
+
+    draws = rng.random((simulations, len(state.home)))
+    home_win = draws < home_win_cut
+    draw = ~home_win & (draws < draw_cut)
+    away_win = ~home_win & ~draw
+    points = (
+        state.points
+        + (3 * home_win + draw).astype("float32") @ home
+        + (3 * away_win + draw).astype("float32") @ away
+    )
+    # Points first, then goal difference, then a coin toss.
+    score = (
+        points * 1_000
+        + state.goal_difference
+        + rng.random((simulations, n_teams)) / 2
+    )
+    ranking = np.argsort(-score, axis=1)
+    positions = np.bincount(
+        (ranking * n_teams + np.arange(n_teams)).ravel(),
+        minlength=n_teams * n_teams,
+    ).reshape(n_teams, n_teams)
+    return positions, points.sum(axis=0)
+
+
+def simulate_season(
+    state: SeasonState,
+    simulations: int = DEFAULT_SIMULATIONS,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> tuple[np.ndarray, np.ndarray]:  # type: ignore [type-arg]
+    """Simulate the rest of a season many times, shards in parallel.
+
+    :param state: Standings and remaining games of the season.
+    :param simulations: Number of seasons to simulate.
+    :param workers: Number of processes, defaults to the number of CPUs.
+        One runs the simulation in this process, as servers should: a pool
+        per call forks the (multi threaded) server process.
+    :param seed: Seed of the random draws, defaults to None (random).
+    :return: Number of times each team (rows) finished in each position
+        (columns) and the expected points of each team.
+    """
+    if simulations < 1:
+        raise ValueError(f"simulations must be positive, got {simulations}")
+    shards = [SHARD_SIZE] * (simulations // SHARD_SIZE)
+    if simulations % SHARD_SIZE:
+        shards.append(simulations % SHARD_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers == 1:
+        results = list(map(_simulate_shard, repeat(state), shards, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(_simulate_shard, repeat(state), shards, seeds)
+            )
+    positions = np.sum([result[0] for result in results], axis=0)
+    points = np.sum([result[1] for result in results], axis=0)
+    return positions, points / simulations
+
+
+def _season_state(
+    league: League, from_gameweek: Optional[int] = None
+) -> SeasonState:
+    """Standings and remaining games of the current season.
+
+    :param league: League of the season.
+    :param from_gameweek: Treat games from this gameweek on as not played
+        yet, defaults to None (the games left to play).
+    :return: The season state, probabilities from the league's model.
+    """
+    games = FIXTURE_STORE.load(
+        league=league, datastore=DataStore.DEFAULT, repository=REPOSITORY
+    ).data
+    remaining = ~games["played"]
+    if from_gameweek is not None:
+        remaining |= games["gameweek"] >= from_gameweek
+    teams = np.unique(games[["home_team", "away_team"]].to_numpy())
+    home = np.searchsorted(teams, games["home_team"].to_numpy())
+    away = np.searchsorted(teams, games["away_team"].to_numpy())
+
+    played = ~remaining.to_numpy()
+    home_goal = games["home_goal"].to_numpy()[played]
+    away_goal = games["away_goal"].to_numpy()[played]
+    home_points = np.select(
+        [home_goal > away_goal, home_goal == away_goal], [3, 1]
+    )
+    away_points = np.select(
+        [away_goal > home_goal, home_goal == away_goal], [3, 1]
+    )
+    n_teams = len(teams)
+    points = np.bincount(
+        home[played], weights=home_points, minlength=n_teams
+    ) + np.bincount(away[played], weights=away_points, minlength=n_teams)
+    goal_difference = np.bincount(
+        home[played], weights=home_goal - away_goal, minlength=n_teams
+    ) + np.bincount(
+        away[played], weights=away_goal - home_goal, minlength=n_teams
+    )
+
+    remaining_games = games[remaining]
+    if len(remaining_games):
+        data = _fixture_features(
+            league=league,
+            fixtures=[
+                FixtureDTO(
+                    home_team=game.home_team,
+                    away_team=game.away_team,
+                    attendance=0,
+                    match_date=game.date.date().isoformat(),
+                    time=game.time,
+                )
+                for game in remaining_games.itertuples(index=False)
+            ],
+            season=Season.CURRENT,
+        )
+        proba = _predict_proba(data, league=league)[RESULT_LABELS].to_numpy()
+        proba = proba / proba.sum(axis=1, keepdims=True)
+    else:
+        proba = np.empty((0, 3))
+    return SeasonState(
+        teams=teams,
+        points=points,
+        goal_difference=goal_difference,
+        home=home[~played],
+        away=away[~played],
+        proba=proba,
+    )
+
+
+def predict_season(
+    league: str | League,
+    simulations: int = DEFAULT_SIMULATIONS,
+    from_gameweek: Optional[int] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> SeasonSimulationDTO:
+    """Predict the final standings of the current season.
+
+    The remaining games are simulated many times, each result drawn from
+    the home win, draw and away win probabilities of the league's model.
+
+    :param league: League to make predictions in.
+    :param simulations: Number of seasons to simulate, defaults to
+        DEFAULT_SIMULATIONS
+    :param from_gameweek: Simulate from this gameweek on, ignoring the
+        results of later games, defaults to None (the games left to play).
+    :param workers: Number of processes, defaults to the number of CPUs.
+    :param seed: Seed of the random draws, defaults to None (random).
+    :return: Title, top four and relegation probabilities and expected
+        points of each team, by expected points.
+    """
+    if isinstance(league, str):
+        league = League[league.upper()]
+    _logger.info(
+        f"Request Type: Season Simulation ({league}, {simulations} runs)"
+    )
+    state = _season_state(league=league, from_gameweek=from_gameweek)
+    positions, expected_points = simulate_season(
+        state=state, simulations=simulations, workers=workers, seed=seed
+    )
+    positions = positions / simulations
+    outlooks = [
+        TeamOutlookDTO(
+            code=str(code),
+            points=int(points),
+            expected_points=round(float(expected), 2),
+            title=float(position[0]),
+            top_four=float(position[:TOP_FOUR].sum()),
+            relegation=float(position[-RELEGATED:].sum()),
+        )
+        for code, points, expected, position in zip(
+            state.teams,
+            state.points,
+            expected_points,
+            positions,
+            strict=True,
+        )
+    ]
+    outlooks.sort(key=lambda outlook: outlook.expected_points, reverse=True)
+    return SeasonSimulationDTO(
+        season=Season.CURRENT.value, simulations=simulations, teams=outlooks
+    )
@@ -1,20 +1,40 @@
 """Data Transfer Objects (DTO) for sending across network."""
 
-import threading
 from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
 
-from freekick.datastore.util import League, TeamName
-from freekick.learners import serial_models
+from freekick.datastore import READ_ONLY_REPOSITORY
+from freekick.datastore.util import (
+    DATA_VERSION,
+    DataStore,
+    League,
+    Season,
+    TeamName,
+    get_team_directory,
+    season_to_int,
+)
+from freekick.learners import MODEL_REGISTRY
+from freekick.learners.compiled import (
+    CompiledModel,
+    TeamFeatures,
+    compile_model,
+)
 from freekick.learners.learner_utils import (
+    TIMESTAMP_DTYPE,
     TRAINING_COLS,
     WPC_PYTH_CACHE,
-    WPC_PYTH_CACHE_TIMEOUT,
-    compute_cache_all_league_wpc_pyth,
+    add_wpc_pyth,
+    refresh_wpc_pyth,
 )
-from freekick.utils import _logger
+from freekick.learners.registry import ModelNotFoundError
+
+# Away win, draw and home win, the column order of predicted probabilities.
+RESULT_CLASSES = [-1, 0, 1]
+RESULT_LABELS = ["away_win", "draw", "home_win"]
 
 
 @dataclass
@@ -24,23 +44,119 @@ class MatchDTO:
     predicted_winner: str
 
 
+@dataclass
+class OutcomeDTO:
+    outcome: str
+    probability: float
+
+
+@dataclass
+class MatchProbabilityDTO:
+    home_team: str
+    away_team: str
+    predicted_winner: str
+    home_win: float
+    draw: float
+    away_win: float
+    # Most likely outcomes first, filtered by top_k and threshold.
+    outcomes: list[OutcomeDTO]
+
+
+@dataclass
+class FixtureDTO:
+    home_team: str
+    away_team: str
+    attendance: int | float | None = None
+    match_date: str | None = None
+    time: str | None = None
+
+
+@dataclass
+class TeamOutlookDTO:
+    code: str
+    points: int
+    expected_points: float
+    title: float
+    top_four: float
+    relegation: float
+
+
+@dataclass
+class SeasonSimulationDTO:
+    season: str
+    simulations: int
+    teams: list[TeamOutlookDTO]
+
+
 class SeasonDTO:
     def __init__(self, season: str, teams: list[TeamName]) -> None:
         self.season = season
         self.teams = teams
 
+
 @dataclass
 class SettingDTO:
     estimator: dict[str, str]
     default_league: str
     models: list[str]
 
+
 class LearnerNotFoundError(Exception):
     """Custom exception for unknown learner/model"""
 
     pass
 
 
+class ProbabilityNotSupportedError(Exception):
+    """The learner does not predict probabilities, e.g. SVC by default."""
+
+    pass
+
+
+def _get_learner(league: League) -> Any:
+    """Serial model of a league, ready to predict.
+
+    :param league: League to make a prediction for.
+    :raises LearnerNotFoundError: Raised when no learner found for league.
+    :return: The league's estimator.
+    """
+    snapshot = WPC_PYTH_CACHE.get(league)
+    if snapshot is None or not snapshot.is_fresh(WPC_PYTH_CACHE.timeout):
+        # Update WPC_PYTH_CACHE in the background without blocking. At most
+        # one refresh runs per league however many requests see it stale.
+        refresh_wpc_pyth(league=league)
+
+    try:
+        # Loaded on first use, swapped when a new version is persisted.
+        return MODEL_REGISTRY.get(league)
+    except ModelNotFoundError as e:
+        raise LearnerNotFoundError(str(e)) from None
+
+
+def _prediction_version(league: League) -> tuple[Any, ...]:
+    """Version of the model and features a league's predictions depend on.
+
+    Changes when the models are reloaded or wpc/pyth is refreshed, so it
+    keys precomputed or cached predictions. Models compare by identity.
+    """
+    snapshot = WPC_PYTH_CACHE.get(league)
+    try:
+        model = MODEL_REGISTRY.get(league)
+    except ModelNotFoundError:
+        model = None
+    return (model, snapshot.version if snapshot else None)
+
+
+def _model_features(model: Any) -> list[str]:
+    """Features a model was trained on, in order.
+
+    Models trained on a DataFrame (and compact artifacts) record them,
+    older ones are assumed to follow TRAINING_COLS.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    return TRAINING_COLS if names is None else [str(name) for name in names]
+
+
 def _predict(data: pd.DataFrame, league: League) -> np.ndarray[np.float64]:  # type: ignore
     """Predict the result of a game(s).
 
@@ -50,25 +166,210 @@ def _predict(data: pd.DataFrame, league: League) -> np.ndarray[np.float64]:  # t
     :return: Array with same length as data. A forecast for each data entry.
     :rtype: np.ndarray
     """
-    time_now = pd.Timestamp.now()
-    last_update = pd.Timestamp(WPC_PYTH_CACHE.get("last_update"))  # type: ignore
-    time_elapsed = time_now - (last_update or pd.Timestamp.min)
-    if not last_update or (time_elapsed > WPC_PYTH_CACHE_TIMEOUT):
-        # Kick off a background thread to update WPC_PYTH_CACHE
-        # Note we are not blocking on the completion of this update
-        thread = threading.Thread(target=compute_cache_all_league_wpc_pyth)
-        thread.start()
-        _logger.info(
-            " Started thread to update WPC_PYTH_CACHE: "
-            f"{thread.name} ({thread.ident})"
+    soccer_model = _get_learner(league)
+    data = data[_model_features(soccer_model)]  # reorder to match training
+    return soccer_model.predict(data)  # type: ignore [no-any-return]
+
+
+def _predict_proba(data: pd.DataFrame, league: League) -> pd.DataFrame:
+    """Predict the probability of each result of a game(s).
+
+    :param data: Input data
+    :param league: League to make a prediction for.
+    :raises LearnerNotFoundError: Raised when no learner found for league.
+    :raises ProbabilityNotSupportedError: Raised when the learner does not
+        predict probabilities.
+    :return: away_win, draw and home_win probabilities, aligned with data.
+    """
+    soccer_model = _get_learner(league)
+    if not hasattr(soccer_model, "predict_proba"):
+        raise ProbabilityNotSupportedError(
+            f"{type(soccer_model).__name__} model of {league} does not "
+            "predict probabilities."
+        )
+    proba = pd.DataFrame(
+        soccer_model.predict_proba(data[_model_features(soccer_model)]),
+        columns=soccer_model.classes_,
+        index=data.index,
+    )
+    # Same labels as BaseClassifier.predict_probability, a result the model
+    # never predicts has probability 0.
+    proba = proba.reindex(columns=RESULT_CLASSES, fill_value=0.0)
+    return proba.rename(
+        columns=dict(zip(RESULT_CLASSES, RESULT_LABELS, strict=True))
+    )
+
+
+def _fixtures_to_frame(
+    fixtures: list[FixtureDTO], season: Season
+) -> pd.DataFrame:
+    """Build the model input of fixtures, without wpc/pyth features.
+
+    :param fixtures: Fixtures to predict.
+    :param season: Season the fixtures are played in.
+    :return: One row per fixture, home_team and away_team as team ids.
+    """
+    teams = get_team_directory(
+        datastore=DataStore.DEFAULT, repository=READ_ONLY_REPOSITORY
+    )
+    today = pd.Timestamp(datetime.now().date())
+    dates = [
+        pd.Timestamp(fixture.match_date) if fixture.match_date else today
+        for fixture in fixtures
+    ]
+    data = {
+        "date": dates,
+        "day_of_week": [date.day_of_week for date in dates],
+        "time": [
+            pd.to_datetime(fixture.time or "13:30") for fixture in fixtures
+        ],
+        # All teams are resolved in one lookup.
+        "home_team": teams.ids_for_codes(
+            pd.Series([fixture.home_team for fixture in fixtures])
+        ),
+        "away_team": teams.ids_for_codes(
+            pd.Series([fixture.away_team for fixture in fixtures])
+        ),
+        "season": season_to_int(season),
+        "attendance": [fixture.attendance for fixture in fixtures],
+    }
+    return (
+        pd.DataFrame(data)
+        .astype({"date": TIMESTAMP_DTYPE, "time": TIMESTAMP_DTYPE})
+        .astype(
+            {
+                "date": "int64",
+                "time": "int64",
+                "home_team": "category",
+                "away_team": "category",
+                "season": "category",
+            }
+        )
+    )
+
+
+def _fixture_features(
+    league: League, fixtures: list[FixtureDTO], season: Season
+) -> pd.DataFrame:
+    """Model input of fixtures, wpc/pyth features attached in one join."""
+    return add_wpc_pyth(
+        data=_fixtures_to_frame(fixtures=fixtures, season=season),
+        league=league,
+        season=season,
+        repository=READ_ONLY_REPOSITORY,
+    )
+
+
+# Compiled model of each league, with the model it was compiled from.
+_COMPILED_MODELS: dict[League, tuple[Any, Optional[CompiledModel]]] = {}
+# Team features of each league, with the (wpc/pyth, data) versions.
+_TEAM_FEATURES: dict[League, tuple[tuple[int, int], TeamFeatures]] = {}
+
+
+def _compiled_learner(
+    league: League, model: Any = None
+) -> Optional[CompiledModel]:
+    model = _get_learner(league) if model is None else model
+    compiled = _COMPILED_MODELS.get(league)
+    if compiled is None or compiled[0] is not model:
+        compiled = (model, compile_model(model))
+        _COMPILED_MODELS[league] = compiled
+    return compiled[1]
+
+
+def _team_features(league: League) -> Optional[TeamFeatures]:
+    snapshot = WPC_PYTH_CACHE.get(league)
+    if snapshot is None:
+        return None
+    version = (snapshot.version, DATA_VERSION.current())
+    features = _TEAM_FEATURES.get(league)
+    if features is None or features[0] != version:
+        features = (
+            version,
+            TeamFeatures.from_snapshot(
+                teams=get_team_directory(
+                    datastore=DataStore.DEFAULT,
+                    repository=READ_ONLY_REPOSITORY,
+                ),
+                snapshot=snapshot,
+                season=season_to_int(Season.CURRENT),
+                league=league.value,
+            ),
         )
+        _TEAM_FEATURES[league] = features
+    return features[1]
+
 
+def _compiled_input(
+    league: League, fixture: FixtureDTO, season: Season
+) -> Optional[tuple[CompiledModel, np.ndarray]]:  # type: ignore [type-arg]
+    """Compiled model of a league and feature vector of a fixture.
+
+    :return: None if the fixture needs the full path: model not compiled,
+        wpc/pyth not loaded yet, unknown team, past season or a date or
+        time that is not in ISO format.
+    """
+    if season != Season.CURRENT:
+        return None
     try:
-        # Load serialized model
-        soccer_model = serial_models()[league.value]
+        match_date = (
+            date.fromisoformat(fixture.match_date)
+            if fixture.match_date
+            else None
+        )
+        kick_off = time.fromisoformat(fixture.time) if fixture.time else None
+    except ValueError:
+        return None
+    if kick_off is not None and kick_off.tzinfo is not None:
+        return None
+    model = _compiled_learner(league)
+    features = _team_features(league)
+    if model is None or features is None:
+        return None
+    try:
+        x = features.vector(
+            home_team=fixture.home_team,
+            away_team=fixture.away_team,
+            attendance=fixture.attendance,
+            match_date=match_date,
+            kick_off=kick_off,
+            columns=_model_features(model),
+        )
     except KeyError:
-        raise LearnerNotFoundError(
-            f"Serial model not found for {league}."
-        ) from None
-    data = data[TRAINING_COLS]  # reorder cols to match training
-    return soccer_model.predict(data)  # type: ignore [no-any-return]
+        return None
+    return model, x
+
+
+def _predict_compiled(
+    league: League, fixture: FixtureDTO, season: Season
+) -> Optional[int]:
+    """Predict a fixture with the compiled model, without pandas.
+
+    :param league: League to make a prediction for.
+    :param fixture: Fixture to predict.
+    :param season: Season the fixture is played in.
+    :return: Predicted result, None if the fixture needs the full path.
+    """
+    compiled = _compiled_input(league=league, fixture=fixture, season=season)
+    if compiled is None:
+        return None
+    model, x = compiled
+    return int(model.predict(x)[0])
+
+
+def _predict_proba_compiled(
+    league: League, fixture: FixtureDTO, season: Season
+) -> Optional[np.ndarray]:  # type: ignore [type-arg]
+    """Away win, draw and home win probabilities from the compiled model.
+
+    :return: The probabilities, None if the fixture needs the full path.
+    """
+    compiled = _compiled_input(league=league, fixture=fixture, season=season)
+    if compiled is None:
+        return None
+    model, x = compiled
+    proba = model.predict_proba(x)[0]
+    # Same columns as _predict_proba, 0 for results never predicted.
+    return np.array(
+        [proba[model.classes == result].sum() for result in RESULT_CLASSES]
+    )
@@ -0,0 +1,190 @@
+"""Warm up of the caches a process serves predictions from.
+
+Loads the models, the team directory, the current season features and the
+prediction matrices ahead of the first request. With gunicorn's
+preload_app the master warms up once and the workers it forks share the
+warm caches copy-on-write; otherwise each worker warms up on its own and
+only takes traffic once done (see gunicorn_config.py).
+"""
+
+import os
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Iterable, Optional
+
+from freekick.datastore import READ_ONLY_REPOSITORY, remove_sessions
+from freekick.datastore.util import DataStore, League, get_team_directory
+from freekick.learners.learner_utils import (
+    MODEL_REGISTRY,
+    WPC_PYTH_CACHE,
+    compute_cache_all_league_wpc_pyth,
+)
+from freekick.utils import _logger
+
+from .prediction_matrix import build_prediction_matrices
+from .util import _compiled_learner, _team_features
+
+# Leagues whose models are loaded at launch, comma separated. Empty to
+# load each model on its first prediction instead.
+MODEL_PRELOAD_LEAGUES = os.environ.get(
+    "MODEL_PRELOAD_LEAGUES", ",".join(league.value for league in League)
+)
+
+
+def preload_leagues() -> list[League]:
+    """Leagues of MODEL_PRELOAD_LEAGUES."""
+    return [
+        League(code.strip().lower())
+        for code in MODEL_PRELOAD_LEAGUES.split(",")
+        if code.strip()
+    ]
+
+
+class WarmUp:
+    """Warm up of this process, and whether it is done.
+
+    - `run` warms up in the calling thread, `start` in a background one.
+    - A failing step is logged and skipped, the request path loads what
+      is missing lazily. The process is ready once every step ran.
+    - The ready state is inherited by forked processes, which share the
+      warm caches.
+    """
+
+    def __init__(self) -> None:
+        self._ready = threading.Event()
+        self._started = False
+        self._thread: Optional[threading.Thread] = None
+        self._errors: list[str] = []
+        self._duration_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def run(
+        self,
+        leagues: Optional[Iterable[League]] = None,
+        compute_wpc_pyth: bool = False,
+    ) -> None:
+        """Warm up the caches of leagues.
+
+        :param leagues: Leagues whose models and features to load,
+            defaults to MODEL_PRELOAD_LEAGUES.
+        :param compute_wpc_pyth: Also compute the current season win
+            percentage and pythagorean expectation of every league and
+            precompute its prediction matrix, defaults to False.
+        """
+        self._started = True
+        leagues = preload_leagues() if leagues is None else list(leagues)
+        steps: list[tuple[str, Callable[[], Any]]] = [
+            (f"{league} model", partial(_load_model, league))
+            for league in leagues
+        ]
+        steps.append(
+            (
+                "team directory",
+                partial(
+                    get_team_directory,
+                    datastore=DataStore.DEFAULT,
+                    repository=READ_ONLY_REPOSITORY,
+                ),
+            )
+        )
+        if compute_wpc_pyth:
+            # Computing Win Percentage and Pythagorean Expectation is very
+            # expensive so lets ensure they are computed at launch. With
+            # the models and features loaded, precompute the predictions
+            # of every current season fixture.
+            steps.append(("wpc/pyth", compute_cache_all_league_wpc_pyth))
+            steps.append(("prediction matrices", build_prediction_matrices))
+        steps.extend(
+            (f"{league} features", partial(_team_features, league))
+            for league in leagues
+        )
+
+        start = time.perf_counter()
+        errors = []
+        try:
+            for name, step in steps:
+                try:
+                    step()
+                except Exception:
+                    _logger.exception(f" Warming up the {name} failed.")
+                    errors.append(name)
+            # E.g. a prediction matrix built from stale features started
+            # a background refresh.
+            WPC_PYTH_CACHE.join()
+        finally:
+            # Sessions are per thread, return this one's connections.
+            remove_sessions()
+            self._errors = errors
+            self._duration_ms = (time.perf_counter() - start) * 1000
+            self._ready.set()
+        _logger.info(f" Warm up done in {self._duration_ms:.0f}ms.")
+
+    def start(
+        self,
+        leagues: Optional[Iterable[League]] = None,
+        compute_wpc_pyth: bool = False,
+    ) -> threading.Thread:
+        """Warm up in a background thread, see `run`."""
+        self._ready.clear()
+        self._started = True
+        self._thread = threading.Thread(
+            target=self.run,
+            args=(leagues, compute_wpc_pyth),
+            name="warm-up",
+            daemon=True,
+        )
+        self._thread.start()
+        return self._thread
+
+    def wait(
+        self,
+        timeout: Optional[float] = None,
+        heartbeat: Optional[Callable[[], None]] = None,
+        interval: float = 1.0,
+    ) -> bool:
+        """Wait until the warm up is done.
+
+        :param timeout: Seconds to wait, defaults to None (no limit).
+        :param heartbeat: Called every `interval` seconds while waiting,
+            e.g. a gunicorn worker's `notify` so it is not timed out.
+        :param interval: Seconds between heartbeats, defaults to 1.0.
+        :return: Whether the warm up is done, False at once if none was
+            started.
+        """
+        if not self._started:
+            return self.ready
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.is_set():
+            remaining = (
+                interval
+                if deadline is None
+                else min(interval, deadline - time.monotonic())
+            )
+            if remaining <= 0:
+                return False
+            if not self._ready.wait(remaining) and heartbeat is not None:
+                heartbeat()
+        if self._thread is not None:
+            # Done, also wait for the thread to exit, e.g. before a fork.
+            self._thread.join()
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "duration_ms": self._duration_ms,
+            "errors": list(self._errors),
+        }
+
+
+def _load_model(league: League) -> None:
+    model = MODEL_REGISTRY.check(league, wait=True).model
+    # The compiled model used for single match predictions.
+    _compiled_learner(league, model=model)
+
+
+WARM_UP = WarmUp()
@@ -1,9 +1,15 @@
 import logging
+import threading
 import unittest
+from types import SimpleNamespace
+from unittest import mock
 
 from flask import Flask
 
+from freekick import gunicorn_config
 from freekick.app import create_app
+from freekick.datastore.util import League
+from freekick.service.warm_up import WARM_UP, WarmUp
 
 
 class AppTestCase(unittest.TestCase):
@@ -14,3 +20,82 @@ class AppTestCase(unittest.TestCase):
         self.assertTrue(
             logging.getLevelName(app.logger.getEffectiveLevel()) == "DEBUG"
         )
+
+    def test_readiness(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        client = app.test_client()
+        with mock.patch.object(WARM_UP, "_ready", threading.Event()):
+            self.assertEqual(client.get("/api/ready").status_code, 503)
+        self.assertTrue(WARM_UP.wait(timeout=60))
+        self.assertEqual(client.get("/api/ready").status_code, 200)
+        self.assertTrue(client.get("/api/metrics").json["warm_up"]["ready"])
+
+
+class WarmUpTestCase(unittest.TestCase):
+    def test_warm_up(self):
+        warm_up = WarmUp()
+        self.assertFalse(warm_up.wait())
+        warm_up.start(leagues=[League.EPL])
+        self.assertTrue(warm_up.wait(timeout=60))
+        self.assertTrue(warm_up.ready)
+        self.assertEqual(warm_up.stats()["errors"], [])
+
+    def test_failed_step_skipped(self):
+        warm_up = WarmUp()
+        with mock.patch(
+            "freekick.service.warm_up._load_model", side_effect=KeyError
+        ):
+            warm_up.run(leagues=[League.EPL])
+        self.assertTrue(warm_up.ready)
+        self.assertEqual(warm_up.stats()["errors"], ["League.EPL model"])
+
+    def test_wait_timeout(self):
+        warm_up = WarmUp()
+        release = threading.Event()
+        heartbeat = mock.Mock()
+        with mock.patch(
+            "freekick.service.warm_up.get_team_directory",
+            side_effect=lambda **kwargs: release.wait(),
+        ):
+            warm_up.start(leagues=[])
+            self.assertFalse(
+                warm_up.wait(timeout=0.05, heartbeat=heartbeat, interval=0.01)
+            )
+            release.set()
+            self.assertTrue(warm_up.wait(timeout=60))
+        self.assertTrue(heartbeat.called)
+
+
+class GunicornConfigTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = SimpleNamespace(cfg=SimpleNamespace(preload_app=True))
+        self.worker = mock.Mock()
+        patcher = mock.patch("freekick.datastore.dispose_engine")
+        self.dispose_engine = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_preloaded_master(self):
+        with mock.patch.object(WARM_UP, "wait") as wait:
+            gunicorn_config.when_ready(self.server)
+        wait.assert_called_once_with()
+        self.dispose_engine.assert_called_once_with()
+
+    def test_post_fork(self):
+        gunicorn_config.post_fork(self.server, self.worker)
+        self.dispose_engine.assert_called_once_with(close=False)
+        self.server.cfg.preload_app = False
+        self.dispose_engine.reset_mock()
+        gunicorn_config.post_fork(self.server, self.worker)
+        self.dispose_engine.assert_not_called()
+
+    def test_readiness_gate(self):
+        with mock.patch.object(WARM_UP, "wait", return_value=True) as wait:
+            gunicorn_config.post_worker_init(self.worker)
+        wait.assert_called_once_with(
+            timeout=gunicorn_config.WARM_UP_TIMEOUT,
+            heartbeat=self.worker.notify,
+        )
+        self.worker.log.warning.assert_not_called()
+        with mock.patch.object(WARM_UP, "wait", return_value=False):
+            gunicorn_config.post_worker_init(self.worker)
+        self.worker.log.warning.assert_called_once()
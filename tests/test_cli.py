@@ -20,10 +20,14 @@ class CliTestCase(unittest.TestCase):
             )
 
     def test_predict_season_called_with_args(self):
-        msg = "Sorry, I cannot predict seasons as yet!"
-        with self.assertRaisesRegex(NotImplementedError, msg):
-            result = self.runner.invoke(cli, "season --league EPL")
-            if result:
-                # We get back a result object instead of directly raising so
-                # manually re-raising.
-                raise result.exception
+        with unittest.mock.patch("entrypoints.cli.predict_season") as season:
+            self.runner.invoke(
+                cli, "season --league EPL -n 1000 --from-gameweek 30"
+            )
+            season.assert_called_once_with(
+                league="EPL",
+                simulations=1000,
+                from_gameweek=30,
+                workers=None,
+                seed=None,
+            )
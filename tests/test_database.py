@@ -1,12 +1,40 @@
+import contextlib
+import io
+import tempfile
+import threading
 import unittest
+from datetime import datetime
+from unittest import mock
 
-from sqlalchemy import create_engine
+import pandas as pd
+from sqlalchemy import create_engine, insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
+from freekick import DATA_DIR
+from freekick.datastore._migrate import (
+    _csv_to_sqlite_migration,
+    create_indexes,
+    enable_wal,
+    fix_legacy_games,
+)
+from freekick.datastore.engine import SQLITE_PRAGMAS, create_db_engine
 from freekick.datastore.model import Base, Team
-from freekick.datastore.repository import SQLAlchemyRepository
-from freekick.datastore.util import DBUtils
+from freekick.datastore.repository import (
+    ReadOnlySessionError,
+    ScopedSQLAlchemyRepository,
+    SQLAlchemyRepository,
+    create_scoped_session,
+)
+from freekick.datastore.util import (
+    DataStore,
+    DBUtils,
+    League,
+    Season,
+    TeamNotFoundError,
+    get_team_directory,
+    season_to_int,
+)
 
 STMT = """
 INSERT INTO team (code, name, league, team_id)
@@ -32,6 +60,262 @@ class DBUtilsTestcase(unittest.TestCase):
         )
         self.assertEqual(team2_code, "T2")
 
+    def test_load_wpc_pyth(self):
+        season = season_to_int(Season.CURRENT)
+        wpc_pyth = pd.DataFrame(
+            {
+                "team": [1, 2],
+                "season": [season, season],
+                "league": [League.EPL.value] * 2,
+                "win_percentage": [0.25, 0.75],
+                "pythagorean_expectation": [0.3, 0.7],
+                "last_update": [datetime(2024, 5, 20)] * 2,
+                "pyth_wpc_id": [f"1_{season}", f"2_{season}"],
+            }
+        )
+        DBUtils().add_or_update_wpc_pyth(
+            data=wpc_pyth, league=League.EPL, repository=self.repository
+        )
+
+        loaded = DBUtils().load_wpc_pyth(
+            league=League.EPL,
+            season=Season.CURRENT,
+            repository=self.repository,
+        )
+        loaded = loaded.sort_values("team").reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            loaded[wpc_pyth.columns], wpc_pyth, check_dtype=False
+        )
+
+    def test_update_wpc_pyth_overwrites_existing(self):
+        season = season_to_int(Season.CURRENT)
+        wpc_pyth = pd.DataFrame(
+            {
+                "team": [1],
+                "season": [season],
+                "league": [League.EPL.value],
+                "win_percentage": [0.25],
+                "pythagorean_expectation": [0.3],
+                "last_update": [datetime(2024, 5, 20)],
+                "pyth_wpc_id": [f"1_{season}"],
+            }
+        )
+        for win_percentage in [0.25, 0.5]:
+            DBUtils().add_or_update_wpc_pyth(
+                data=wpc_pyth.assign(win_percentage=win_percentage),
+                league=League.EPL,
+                repository=self.repository,
+            )
+
+        loaded = DBUtils().load_wpc_pyth(
+            league=League.EPL,
+            season=Season.CURRENT,
+            repository=self.repository,
+        )
+        self.assertEqual(list(loaded["win_percentage"]), [0.5])
+
+    def test_load_wpc_pyth_missing_raises(self):
+        with self.assertRaises(ValueError):
+            DBUtils().load_wpc_pyth(
+                league=League.EPL,
+                season=Season.CURRENT,
+                repository=self.repository,
+            )
+
+
+class TeamDirectoryTestcase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(bind=self.engine)  # create the tables
+        self.repository = SQLAlchemyRepository(session=Session(self.engine))
+        self.repository.session.execute(statement=text(STMT))
+        self.repository.commit()
+        self.addCleanup(get_team_directory.cache_clear)
+
+    def _directory(self):
+        return get_team_directory(
+            datastore=DataStore.DATABASE, repository=self.repository
+        )
+
+    def test_lookups(self):
+        teams = self._directory()
+        codes = teams.codes_for_names(
+            "League1", pd.Series(["Team2", "Team1", "Team2"])
+        )
+        self.assertEqual(list(codes), ["T2", "T1", "T2"])
+        ids = teams.ids_for_codes(codes)
+        self.assertEqual(
+            list(ids),
+            [36806975173364231, 1285731944041560733, 36806975173364231],
+        )
+        self.assertEqual(list(teams.codes_for_ids(ids)), list(codes))
+
+    def test_unknown_team_raises(self):
+        with self.assertRaises(TeamNotFoundError):
+            self._directory().codes_for_names("League2", pd.Series(["Team1"]))
+        with self.assertRaises(TeamNotFoundError):
+            self._directory().ids_for_codes(pd.Series(["T3"]))
+
+    def test_loaded_once_until_teams_added(self):
+        teams = self._directory()
+        self.assertIs(self._directory(), teams)
+
+        DBUtils.add_teams(
+            teams=[Team(code="T3", name="Team3", league="League1", team_id=3)],
+            repository=self.repository,
+        )
+
+        self.assertIsNot(self._directory(), teams)
+        self.assertEqual(len(self._directory()), 3)
+
+
+class UpsertGamesTestcase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(bind=self.engine)  # create the tables
+        self.repository = SQLAlchemyRepository(session=Session(self.engine))
+        self.repository.session.execute(
+            statement=text(
+                "INSERT INTO team (code, name, league, team_id) VALUES "
+                "('ARS', 'Arsenal', 'epl', 1), ('CHE', 'Chelsea', 'epl', 2)"
+            )
+        )
+        self.repository.commit()
+        self.addCleanup(get_team_directory.cache_clear)
+        self.season_data = pd.DataFrame(
+            {
+                "Date": ["2023-08-12", "2023-08-19"],
+                "Time": ["15:00", None],
+                "HomeTeam": ["Arsenal", "Chelsea"],
+                "AwayTeam": ["Chelsea", "Arsenal"],
+                "FTHG": [2, 0],
+                "FTAG": [1, 0],
+                "FTR": ["H", "D"],
+                "season": ["S_2023_2024"] * 2,
+            }
+        )
+
+    def _upsert(self, season_data, update=True):
+        return DBUtils.upsert_games(
+            games=DBUtils.create_game_records(
+                df=season_data, repository=self.repository
+            ),
+            repository=self.repository,
+            update=update,
+        )
+
+    def _games(self):
+        return self.repository.session.execute(
+            text(
+                "SELECT home_team, away_team, home_goal, away_goal, result "
+                "FROM game ORDER BY date"
+            )
+        ).all()
+
+    def test_insert(self):
+        self.assertEqual(self._upsert(self.season_data), 2)
+        self.assertEqual(
+            self._games(),
+            [("ARS", "CHE", 2, 1, "H"), ("CHE", "ARS", 0, 0, "D")],
+        )
+
+    def test_existing_games_are_updated_not_duplicated(self):
+        self._upsert(self.season_data)
+        corrected = self.season_data.copy()
+        corrected.loc[1, ["FTHG", "FTR"]] = [1, "H"]
+
+        self._upsert(corrected)
+
+        self.assertEqual(
+            self._games(),
+            [("ARS", "CHE", 2, 1, "H"), ("CHE", "ARS", 1, 0, "H")],
+        )
+
+    def test_existing_games_are_kept_without_update(self):
+        self._upsert(self.season_data)
+        corrected = self.season_data.copy()
+        corrected.loc[1, ["FTHG", "FTR"]] = [1, "H"]
+
+        self._upsert(corrected, update=False)
+
+        self.assertEqual(self._games()[1], ("CHE", "ARS", 0, 0, "D"))
+
+    def test_dates_are_day_first(self):
+        season_data = self.season_data.assign(Date=["01/09/2023", "11/08/23"])
+
+        self._upsert(season_data)
+
+        self.assertEqual(
+            self.repository.session.execute(
+                text("SELECT date FROM game ORDER BY id")
+            ).all(),
+            [("2023-09-01",), ("2023-08-11",)],
+        )
+
+
+class CsvToSqliteMigrationTestcase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        self.addCleanup(get_team_directory.cache_clear)
+
+    def _count_games(self):
+        with self.engine.connect() as connection:
+            return connection.execute(text("SELECT count(*) FROM game")).one()
+
+    def test_migration_resumes_without_duplicates(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _csv_to_sqlite_migration(engine=self.engine, chunk_size=5000)
+            migrated = self._count_games()
+            _csv_to_sqlite_migration(engine=self.engine, chunk_size=5000)
+
+        games = pd.read_csv(DATA_DIR / "processed" / "epl.csv").dropna(
+            subset=["HomeTeam", "AwayTeam"]
+        )
+        self.assertEqual(migrated, (len(games),))
+        self.assertEqual(self._count_games(), migrated)
+
+    def test_fix_legacy_games(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _csv_to_sqlite_migration(engine=self.engine, chunk_size=5000)
+        opener = (
+            "SELECT id, date FROM game WHERE season = 'S_2023_2024' "
+            "AND home_team = 'BUR' AND away_team = 'MCI'"
+        )
+        copy_game = (
+            "INSERT INTO game (home_team, away_team, home_goal, away_goal, "
+            "season, league, date, result) SELECT home_team, away_team, "
+            "home_goal, away_goal, season, league, date, result FROM game "
+            "WHERE id = :id"
+        )
+        with self.engine.begin() as connection:
+            game_id, date = connection.execute(text(opener)).one()
+            self.assertEqual(date, "2023-08-11")
+            # A database from an older version: the opener stored with its
+            # teams swapped and month first, and again as it should be, and
+            # another game stored twice.
+            connection.execute(text("DROP INDEX ix_game_natural_key"))
+            connection.execute(text(copy_game), {"id": game_id})
+            connection.execute(
+                text(
+                    "UPDATE game SET date = '2023-11-08', home_team = 'MCI', "
+                    "away_team = 'BUR' WHERE id = :id"
+                ),
+                {"id": game_id},
+            )
+            connection.execute(text(copy_game), {"id": game_id + 1})
+        (count,) = self._count_games()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            fix_legacy_games(engine=self.engine)
+            create_indexes(engine=self.engine)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(
+                [date for _, date in connection.execute(text(opener))],
+                ["2023-08-11"],
+            )
+        self.assertEqual(self._count_games(), (count - 2,))
+
 
 class SQLAlchemyRepositoryTestcase(unittest.TestCase):
     def setUp(self) -> None:
@@ -68,3 +352,99 @@ class SQLAlchemyRepositoryTestcase(unittest.TestCase):
         self.assertEqual(code, t9999.code)
         self.assertEqual(name, t9999.name)
         self.assertEqual(league, t9999.league)
+
+
+class ScopedSQLAlchemyRepositoryTestcase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(bind=self.engine)  # create the tables
+
+    def test_session_per_thread(self):
+        repository = ScopedSQLAlchemyRepository(
+            create_scoped_session(engine=self.engine)
+        )
+        self.addCleanup(repository.remove)
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(repository.session)
+        )
+        thread.start()
+        thread.join()
+
+        self.assertIs(repository.session, repository.session)
+        self.assertIsNot(sessions[0], repository.session)
+
+    def test_remove_releases_session(self):
+        repository = ScopedSQLAlchemyRepository(
+            create_scoped_session(engine=self.engine)
+        )
+        session = repository.session
+        repository.remove()
+        self.assertIsNot(repository.session, session)
+
+    def test_dispose_engine_after_fork(self):
+        import freekick.datastore as datastore
+
+        engine = mock.Mock()
+        session = mock.Mock()
+        registry = datastore.get_scoped_session(read_only=True)
+        with mock.patch.object(datastore, "DEFAULT_ENGINE", engine):
+            registry.registry.set(session)
+            datastore.dispose_engine(close=False)
+        engine.dispose.assert_called_once_with(close=False)
+        # Dropped, without closing the inherited connection.
+        session.close.assert_not_called()
+        self.assertFalse(registry.registry.has())
+
+    def test_read_only_rejects_writes(self):
+        repository = ScopedSQLAlchemyRepository(
+            create_scoped_session(engine=self.engine, read_only=True)
+        )
+        self.addCleanup(repository.remove)
+        with self.assertRaises(ReadOnlySessionError):
+            repository.add(
+                Team(code="T1", name="Team1", league="League1", team_id=1)
+            )
+            repository.commit()
+        repository.session.rollback()
+        with self.assertRaises(ReadOnlySessionError):
+            repository.session.execute(insert(Team).values(code="T1"))
+        # Reads still work
+        self.assertEqual(repository.session.scalars(select(Team)).all(), [])
+
+
+class SQLitePerformanceProfileTestcase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.engine = create_db_engine(
+            f"sqlite:///{self.tmp_dir.name}/freekick.db"
+        )
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(bind=self.engine)
+
+    def _pragma(self, connection, pragma):
+        return connection.execute(text(f"PRAGMA {pragma}")).scalar()
+
+    def test_pragmas(self):
+        with self.engine.connect() as connection:
+            self.assertEqual(self._pragma(connection, "synchronous"), 1)
+            self.assertEqual(
+                self._pragma(connection, "busy_timeout"),
+                SQLITE_PRAGMAS["busy_timeout"],
+            )
+
+    def test_optimize(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            enable_wal(engine=self.engine)
+            create_indexes(engine=self.engine)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(self._pragma(connection, "journal_mode"), "wal")
+            plan = connection.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT home_team FROM game "
+                    "WHERE league = 'epl' AND season = 'S_2023_2024'"
+                )
+            ).all()
+        self.assertIn("COVERING INDEX ix_game_natural_key", plan[0][-1])
@@ -1,11 +1,33 @@
+import shutil
+import tempfile
+import threading
 import unittest
+import unittest.mock
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from dateutil.parser import parse
 
 from freekick import DATA_DIR
-from freekick.datastore.util import DataStore, EPLData, League
+from freekick.datastore.fixtures import (
+    FIXTURES_FILE_NAME,
+    FixtureStore,
+    GameweekNotFoundError,
+    assign_gameweeks,
+    season_file_name,
+)
+from freekick.datastore.util import (
+    CLEANED_DATA_CACHE,
+    DATA_VERSION,
+    DataStore,
+    EPLData,
+    League,
+    Season,
+    _do_load_data,
+    _source_fingerprint,
+    load_csv,
+)
 
 
 class DatastoreTestCase(unittest.TestCase):
@@ -25,3 +47,217 @@ class DatastoreTestCase(unittest.TestCase):
             lambda d: parse(d) if isinstance(d, str) else np.nan
         )
         self.assertEqual(len(df), len(data))
+
+    def test_update_current_season_from_raw_season_file(self):
+        file_name = "season_2023-2024.csv"
+        raw = pd.read_csv(DATA_DIR / "raw" / League.EPL.value / file_name)
+        self.assertEqual(raw["Date"][0], "11/08/2023")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.epl_data._raw_data_path = Path(tmp_dir)
+            (Path(tmp_dir) / League.EPL.value).mkdir()
+            with (
+                unittest.mock.patch.object(
+                    self.epl_data, "_read_csv", return_value=raw
+                ),
+                # Re-stitching writes the processed league file.
+                unittest.mock.patch.object(
+                    self.epl_data, "read_stitch_raw_data"
+                ),
+            ):
+                data = self.epl_data.update_current_season(persist=True)
+        self.assertEqual(len(data), len(raw))
+        self.assertEqual(data["date"].min(), pd.Timestamp("2023-08-11"))
+        self.assertEqual(data["date"].max(), pd.Timestamp("2024-05-19"))
+        # 13/08/2023 was a Sunday.
+        sunday = data[data["date"] == pd.Timestamp("2023-08-13")]
+        self.assertEqual(set(sunday["day_of_week"]), {6})
+
+
+class CleanedDataCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        tmp_path = Path(self.tmp_dir.name)
+        patcher = unittest.mock.patch.object(
+            CLEANED_DATA_CACHE, "path", tmp_path / "cleaned"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Work on a copy of the league data so it can be modified.
+        shutil.copy(DATA_DIR / "processed" / "epl.csv", tmp_path)
+        self.epl_data = EPLData(datastore=DataStore.CSV, repository=None)
+        self.epl_data._processed_data_path = tmp_path
+
+    def test_unchanged_source_is_served_from_cache(self):
+        data = self.epl_data.load()
+        with unittest.mock.patch(
+            "freekick.datastore.util._do_load_data"
+        ) as load:
+            cached = self.epl_data.load()
+            load.assert_not_called()
+        pd.testing.assert_frame_equal(cached, data)
+
+    def test_source_is_fingerprinted_once_per_version(self):
+        patcher = unittest.mock.patch.object(
+            DATA_VERSION, "path", Path(self.tmp_dir.name) / "data_version"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.epl_data.load()
+        with unittest.mock.patch(
+            "freekick.datastore.util._source_fingerprint",
+            wraps=_source_fingerprint,
+        ) as fingerprint:
+            self.epl_data.load()
+            fingerprint.assert_not_called()
+            DATA_VERSION.bump()
+            self.addCleanup(_do_load_data.cache_clear)
+            self.epl_data.load()
+            fingerprint.assert_called_once()
+
+    def test_changed_source_is_reloaded(self):
+        data = self.epl_data.load()
+        file_path = self.epl_data._processed_data_path / "epl.csv"
+        games = pd.read_csv(file_path)
+        games.iloc[:-1].to_csv(file_path, index=False)
+        _do_load_data.cache_clear()
+        self.addCleanup(_do_load_data.cache_clear)
+
+        self.assertEqual(len(self.epl_data.load()), len(data) - 1)
+        self.assertEqual(len(list(CLEANED_DATA_CACHE.path.iterdir())), 1)
+
+    def test_failed_put_keeps_the_previous_file(self):
+        data = self.epl_data.load()
+        cache = CLEANED_DATA_CACHE
+        with unittest.mock.patch.object(
+            pd.DataFrame, "to_parquet", side_effect=OSError("disk full")
+        ):
+            cache.put(
+                league=League.EPL,
+                datastore=DataStore.CSV,
+                key="new",
+                data=data,
+            )
+        # Neither the previous file nor a temporary file is left behind.
+        (cached,) = cache.path.iterdir()
+        self.assertFalse(cached.name.endswith("_new.parquet"))
+        pd.testing.assert_frame_equal(self.epl_data.load(), data)
+
+        cache.put(
+            league=League.EPL, datastore=DataStore.CSV, key="new", data=data
+        )
+        (cached,) = cache.path.iterdir()
+        self.assertTrue(cached.name.endswith("_new.parquet"))
+
+
+class DataVersionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.tmp_path = Path(self.tmp_dir.name)
+        patcher = unittest.mock.patch.object(
+            DATA_VERSION, "path", self.tmp_path / "data_version"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bump(self):
+        self.assertEqual(DATA_VERSION.current(), 0)
+        self.assertEqual(DATA_VERSION.bump(), 1)
+        self.assertEqual(DATA_VERSION.current(), 1)
+
+    def test_concurrent_bumps_are_not_lost(self):
+        threads = [
+            threading.Thread(
+                target=lambda: [DATA_VERSION.bump() for _ in range(10)]
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(DATA_VERSION.current(), 80)
+        self.assertEqual(
+            [p.name for p in self.tmp_path.iterdir() if p.suffix == ".tmp"],
+            [],
+        )
+
+    def test_cached_load_reloads_after_bump(self):
+        file_path = self.tmp_path / "games.csv"
+        pd.DataFrame({"a": [1]}).to_csv(file_path, index=False)
+        self.assertEqual(len(load_csv(file_path)), 1)
+
+        pd.DataFrame({"a": [1, 2]}).to_csv(file_path, index=False)
+        self.assertEqual(len(load_csv(file_path)), 1)  # Still cached
+        DATA_VERSION.bump()
+        self.assertEqual(len(load_csv(file_path)), 2)
+
+
+class FixtureStoreTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        (self.path / "epl").mkdir()
+        self.store = FixtureStore(path=self.path)
+        pd.DataFrame(
+            {
+                "Div": ["E0", "E0", "E0"],
+                "Date": ["11/08/2023", "12/08/2023", "19/08/2023"],
+                "Time": ["20:00", "12:30", "15:00"],
+                "HomeTeam": ["Burnley", "Arsenal", "Man City"],
+                "AwayTeam": ["Man City", "Nott'm Forest", "Arsenal"],
+                "FTHG": [0, 2, 1],
+                "FTAG": [3, 1, 1],
+            }
+        ).to_csv(
+            self.path / "epl" / season_file_name(Season.CURRENT), index=False
+        )
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_assign_gameweeks(self):
+        gameweeks = assign_gameweeks(
+            pd.Series(["A", "C", "B", "D", "A"]),
+            pd.Series(["B", "D", "C", "A", "C"]),
+        )
+        np.testing.assert_array_equal(gameweeks, [1, 1, 2, 2, 3])
+
+    def test_load(self):
+        fixtures = self.store.load(league=League.EPL, datastore=DataStore.CSV)
+        self.assertEqual(list(fixtures.gameweeks), [1, 2])
+        # Season is over, the last gameweek is the current one.
+        self.assertEqual(fixtures.current, 2)
+        self.assertEqual(
+            fixtures.gameweek(1)[["home_team", "away_team"]].values.tolist(),
+            [["BUR", "MCI"], ["ARS", "FOR"]],
+        )
+        self.assertIs(
+            self.store.load(league=League.EPL, datastore=DataStore.CSV),
+            fixtures,
+        )
+        with self.assertRaises(GameweekNotFoundError):
+            fixtures.gameweek(3)
+
+    def test_fixtures_file(self):
+        pd.DataFrame(
+            {
+                "Div": ["E0", "E0", "SP1"],
+                "Date": ["26/08/2023", "19/08/2023", "26/08/2023"],
+                "Time": ["15:00", "15:00", "15:00"],
+                "HomeTeam": ["Arsenal", "Man City", "Sevilla"],
+                "AwayTeam": ["Burnley", "Arsenal", "Girona"],
+            }
+        ).to_csv(self.path / "epl" / FIXTURES_FILE_NAME, index=False)
+        fixtures = self.store.load(league=League.EPL, datastore=DataStore.CSV)
+        self.assertEqual(len(fixtures.data), 4)
+        self.assertEqual(fixtures.current, 3)
+        self.assertFalse(fixtures.gameweek()["played"].any())
+
+    def test_no_fixtures(self):
+        with self.assertRaises(GameweekNotFoundError):
+            FixtureStore(path=self.path / "missing").load(
+                league=League.EPL, datastore=DataStore.CSV
+            )
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from freekick import ROOT_DIR
+
+# Cumulative import time budget (microseconds) of the entrypoints. Around
+# 0.6s locally, mostly pandas and sqlalchemy, the rest is head room for
+# slower machines.
+IMPORT_TIME_BUDGET_US = 2_000_000
+# Only needed by training, scraping, raw data stitching or to unpickle a
+# model, so importing an entrypoint should not import them.
+LAZY_MODULES = ["dask", "bs4", "requests", "sklearn", "scipy"]
+
+
+def _import(statement: str) -> tuple[int, list[str]]:
+    """Import in a fresh interpreter.
+
+    :return: Cumulative import time (us) of the imported module and the
+        LAZY_MODULES that got imported.
+    """
+    module = statement.split()[1]
+    code = (
+        f"import sys; {statement}; "
+        f"print(*[m for m in {LAZY_MODULES} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        env={**os.environ, "ENV": "TEST"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = max(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.endswith(f" {module}")
+    )
+    return cumulative_us, result.stdout.split()
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_cli(self):
+        cumulative_us, lazy_modules = _import("import entrypoints.cli")
+        self.assertEqual(lazy_modules, [])
+        self.assertLess(cumulative_us, IMPORT_TIME_BUDGET_US)
+
+    def test_app_factory(self):
+        cumulative_us, lazy_modules = _import(
+            "from freekick.app import create_app"
+        )
+        self.assertEqual(lazy_modules, [])
+        self.assertLess(cumulative_us, IMPORT_TIME_BUDGET_US)
+
+    def test_no_database_connection_on_import(self):
+        code = (
+            "import freekick.datastore as d, entrypoints.cli; "
+            "print(d.DEFAULT_ENGINE)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT_DIR,
+            env={**os.environ, "ENV": "TEST"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "None")
@@ -1,6 +1,29 @@
+import json
+import os
+import tempfile
+import time
 import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+import numpy as np
 from parameterized import parameterized
 from tests import ensure_test_env  # noqa: F401
+from freekick.learners import MODEL_REGISTRY
+from freekick.learners.artifact import (
+    MANIFEST_FILE_NAME,
+    ArtifactFormatError,
+    compact_artifact_dir,
+    load_compact_artifact,
+    save_compact_artifact,
+)
+from freekick.learners.compiled import compile_model
+from freekick.learners.registry import (
+    ModelNotFoundError,
+    ModelRegistry,
+    save_model_artifact,
+)
 from freekick.learners.learner_utils import League
 from freekick.utils import load_config, get_default_estimator
 from freekick import ESTIMATOR_LOCATION
@@ -44,3 +67,259 @@ class EstimatorTestCase(unittest.TestCase):
                 f"{league} in env 'DEV'!"
             ),
         )
+
+
+class CompiledModelTestCase(unittest.TestCase):
+    """Compiled models predict like the scikit-learn estimators."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(600, 5))
+        self.y = np.select(
+            [self.X[:, 0] + self.X[:, 1] > 0.5, self.X[:, 2] < -0.5],
+            [1, -1],
+            default=0,
+        )
+
+    def assert_parity(self, model, X):
+        compiled = compile_model(model)
+        np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+        np.testing.assert_allclose(
+            compiled.predict_proba(X), model.predict_proba(X)
+        )
+
+    def test_decision_tree(self):
+        from sklearn.tree import DecisionTreeClassifier
+
+        X = self.X.copy()
+        X[::7, 3] = np.nan
+        model = DecisionTreeClassifier(random_state=0).fit(X, self.y)
+        self.assert_parity(model, X)
+
+    @parameterized.expand([(3,), (2,)])
+    def test_logistic_regression(self, n_classes: int):
+        from sklearn.linear_model import LogisticRegression
+
+        y = np.clip(self.y, -1, n_classes - 2)
+        model = LogisticRegression().fit(self.X, y)
+        self.assert_parity(model, self.X)
+
+    def test_liblinear_logistic_regression(self):
+        from sklearn.linear_model import LogisticRegression
+
+        # liblinear fits one-vs-rest, even with multi_class left at auto.
+        model = LogisticRegression(solver="liblinear").fit(self.X, self.y)
+        self.assert_parity(model, self.X)
+
+    def test_serial_model(self):
+        model = MODEL_REGISTRY.get(League.EPL)
+        X = np.random.default_rng(0).normal(size=(200, model.n_features_in_))
+        self.assert_parity(model, X * 1e3)
+
+    def test_unsupported_model(self):
+        from sklearn.dummy import DummyClassifier
+
+        model = DummyClassifier().fit(self.X, self.y)
+        self.assertIsNone(compile_model(model))
+
+
+class ModelRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        from sklearn.dummy import DummyClassifier
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.location = Path(tmp_dir.name)
+        self.registry = ModelRegistry(
+            location=self.location,
+            default_estimator="DummyClassifier",
+            poll_interval=0,
+            settings_file=self.location / "config.json",
+        )
+        patcher = mock.patch.dict(
+            os.environ, {"ENV": "TEST", "EPL_ESTIMATOR_CLASS": ""}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        X = np.zeros((4, 1))
+        self.models = [
+            DummyClassifier(strategy="constant", constant=result).fit(
+                X, [-1, 0, 1, result]
+            )
+            for result in (1, -1)
+        ]
+
+    def _save(self, model, estimator="DummyClassifier", **metadata):
+        path = self.location / "test" / f"epl_{estimator}.pkl"
+        return save_model_artifact(model=model, path=path, metadata=metadata)
+
+    def test_lazy_load(self):
+        metadata = self._save(self.models[0], accuracy=0.5)
+        self.assertIsNone(self.registry.current(League.EPL))
+        self.assertEqual(
+            self.registry.get(League.EPL).constant, self.models[0].constant
+        )
+        loaded = self.registry.current(League.EPL)
+        self.assertEqual(loaded.version, metadata["version"])
+        self.assertEqual(loaded.metadata["accuracy"], 0.5)
+
+    def test_hot_swap(self):
+        self._save(self.models[0])
+        first = self.registry.get(League.EPL)
+        self.assertIs(self.registry.get(League.EPL), first)
+        self._save(self.models[1])
+        loaded = self.registry.check(League.EPL, wait=True)
+        self.assertEqual(loaded.model.constant, -1)
+        self.assertIs(self.registry.get(League.EPL), loaded.model)
+        self.assertEqual(self.registry.stats()["swaps"], 1)
+
+    def test_background_swap(self):
+        self._save(self.models[0])
+        first = self.registry.get(League.EPL)
+        self._save(self.models[1])
+        # The current model serves requests while the new one loads.
+        self.assertIs(self.registry.check(League.EPL).model, first)
+        for _ in range(100):
+            if self.registry.current(League.EPL).model is not first:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.registry.get(League.EPL).constant, -1)
+
+    def test_estimator_setting_change(self):
+        self._save(self.models[0])
+        self._save(self.models[1], estimator="OtherClassifier")
+        self.assertEqual(self.registry.get(League.EPL).constant, 1)
+        with mock.patch.dict(
+            os.environ, {"EPL_ESTIMATOR_CLASS": "OtherClassifier"}
+        ):
+            loaded = self.registry.check(League.EPL, wait=True)
+        self.assertEqual(loaded.estimator, "OtherClassifier")
+        self.assertEqual(loaded.model.constant, -1)
+
+    def test_workspace_setting_change(self):
+        self._save(self.models[0])
+        self._save(self.models[1], estimator="OtherClassifier")
+        self.assertEqual(self.registry.get(League.EPL).constant, 1)
+        (self.location / "config.json").write_text(
+            json.dumps({"ESTIMATOR": {"EPL": "OtherClassifier"}})
+        )
+        loaded = self.registry.check(League.EPL, wait=True)
+        self.assertEqual(loaded.estimator, "OtherClassifier")
+
+    def test_missing_artifact(self):
+        with self.assertRaises(ModelNotFoundError):
+            self.registry.get(League.EPL)
+        self._save(self.models[0])
+        model = self.registry.get(League.EPL)
+        with mock.patch.dict(
+            os.environ, {"EPL_ESTIMATOR_CLASS": "MissingClassifier"}
+        ):
+            # Keeps the loaded model.
+            self.assertIs(self.registry.get(League.EPL), model)
+
+    def test_stale_metadata_ignored(self):
+        self._save(self.models[0], accuracy=0.5)
+        path = self.location / "test" / "epl_DummyClassifier.pkl"
+        joblib.dump(self.models[1], path)
+        self.registry.get(League.EPL)
+        self.assertEqual(self.registry.current(League.EPL).metadata, {})
+
+
+class CompactArtifactTestCase(unittest.TestCase):
+    """Compact artifacts load as memory mapped compiled models."""
+
+    def setUp(self):
+        from sklearn.tree import DecisionTreeClassifier
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.location = Path(tmp_dir.name)
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(300, 4))
+        y = np.select([self.X[:, 0] > 0.5, self.X[:, 1] < -0.5], [1, -1], 0)
+        self.model = DecisionTreeClassifier(random_state=0).fit(self.X, y)
+        patcher = mock.patch.dict(
+            os.environ, {"ENV": "TEST", "EPL_ESTIMATOR_CLASS": ""}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        directory = self.location / "epl_DecisionTreeClassifier"
+        manifest = save_compact_artifact(
+            model=compile_model(self.model),
+            directory=directory,
+            metadata={"training_fingerprint": "abc"},
+        )
+        model, loaded = load_compact_artifact(directory)
+        self.assertEqual(loaded, json.loads(json.dumps(manifest)))
+        self.assertIsInstance(model.threshold.base, np.memmap)
+        np.testing.assert_array_equal(
+            model.predict(self.X), self.model.predict(self.X)
+        )
+        np.testing.assert_allclose(
+            model.predict_proba(self.X), self.model.predict_proba(self.X)
+        )
+        # Saving the same model again keeps the arrays, a new one
+        # replaces them.
+        save_compact_artifact(compile_model(self.model), directory)
+        self.assertEqual(
+            len(list(directory.glob("*.npy"))), len(manifest["arrays"])
+        )
+        other = compile_model(self.model.fit(self.X, self.X[:, 2] > 0))
+        new_manifest = save_compact_artifact(other, directory)
+        self.assertNotEqual(new_manifest["version"], manifest["version"])
+        self.assertEqual(
+            {path.name for path in directory.glob("*.npy")},
+            {entry["file"] for entry in new_manifest["arrays"].values()},
+        )
+
+    def test_invalid_manifest(self):
+        directory = self.location / "epl_DecisionTreeClassifier"
+        save_compact_artifact(compile_model(self.model), directory)
+        manifest_path = directory / MANIFEST_FILE_NAME
+        manifest = json.loads(manifest_path.read_text())
+        manifest["format_version"] += 1
+        manifest_path.write_text(json.dumps(manifest))
+        with self.assertRaises(ArtifactFormatError):
+            load_compact_artifact(directory)
+
+    def test_registry_serves_compact(self):
+        path = self.location / "test" / "epl_DecisionTreeClassifier.pkl"
+        metadata = save_model_artifact(
+            model=self.model, path=path, metadata={"accuracy": 0.5}
+        )
+        self.assertTrue(
+            (compact_artifact_dir(path) / MANIFEST_FILE_NAME).is_file()
+        )
+        loaded = {}
+        for artifact_format in ("compact", "pickle"):
+            registry = ModelRegistry(
+                location=self.location,
+                default_estimator="DecisionTreeClassifier",
+                settings_file=self.location / "config.json",
+                artifact_format=artifact_format,
+            )
+            loaded[artifact_format] = registry.check(League.EPL)
+            np.testing.assert_array_equal(
+                loaded[artifact_format].model.predict(self.X),
+                self.model.predict(self.X),
+            )
+        self.assertEqual(loaded["compact"].format, "compact")
+        self.assertEqual(loaded["compact"].metadata["accuracy"], 0.5)
+        self.assertEqual(loaded["pickle"].format, "pickle")
+        self.assertEqual(loaded["pickle"].version, metadata["version"])
+
+    def test_registry_falls_back_to_pickle(self):
+        path = self.location / "test" / "epl_DecisionTreeClassifier.pkl"
+        save_model_artifact(model=self.model, path=path)
+        for array in compact_artifact_dir(path).glob("*.npy"):
+            array.unlink()
+        registry = ModelRegistry(
+            location=self.location,
+            default_estimator="DecisionTreeClassifier",
+            settings_file=self.location / "config.json",
+        )
+        loaded = registry.check(League.EPL)
+        self.assertEqual(loaded.format, "pickle")
+        self.assertEqual(loaded.path, path)
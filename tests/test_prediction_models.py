@@ -1,13 +1,39 @@
 """Runs a series of tests to validate modules against specifies threshold"""
 
+import tempfile
 import unittest
-from datetime import datetime
+import unittest.mock
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
 from statistics import mean
 
+import numpy as np
 import pandas as pd
 
-from freekick.datastore.util import DataStore, EPLData, League, Season
-from freekick.learners.learner_utils import season_to_int, add_wpc_pyth
+from freekick.datastore.util import (
+    CSVUtils,
+    DataStore,
+    EPLData,
+    League,
+    Season,
+    get_team_directory,
+)
+from freekick.learners.compiled import TeamFeatures
+from freekick.learners.learner_utils import (
+    ASOF_PRIOR,
+    WPC_PYTH_CACHE,
+    WPC_PYTH_CACHE_TIMEOUT,
+    WpcPythAccumulator,
+    WpcPythCache,
+    add_asof_wpc_pyth,
+    add_wpc_pyth,
+    compute_wpc_pyth,
+    load_wpc_pyth,
+    season_to_int,
+)
+
 # from freekick.learners.classification import FreekickDecisionTreeClassifier
 
 # from sklearn.model_selection import cross_val_predict
@@ -60,3 +86,351 @@ class TestLearnerModels(unittest.TestCase):
             "home_pythagorean_expectation",
         }
         self.assertTrue(new_cols.issubset(data.columns))
+
+
+def sample_games() -> pd.DataFrame:
+    # Two seasons so totals must not leak across seasons.
+    return pd.DataFrame(
+        {
+            "season": [1, 1, 1, 2, 2],
+            "home_team": [10, 20, 30, 10, 20],
+            "away_team": [20, 30, 10, 20, 10],
+            "home_goal": [2.0, 1.0, 0.0, 0.0, 3.0],
+            "away_goal": [1.0, 1.0, 2.0, 0.0, 1.0],
+            "result": [1, 0, -1, 0, 1],
+            "date": pd.to_datetime(
+                [
+                    "2020-08-01",
+                    "2020-08-08",
+                    "2020-08-15",
+                    "2021-08-01",
+                    "2021-08-08",
+                ]
+            ),
+        }
+    )
+
+
+class ComputeWpcPythTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = sample_games()
+
+    def test_compute_wpc_pyth(self):
+        wpc_pyth = compute_wpc_pyth(data=self.data, league=League.EPL)
+        # One row per team, taken from the first season each team played.
+        self.assertEqual(list(wpc_pyth["team"]), [10, 20, 30])
+        self.assertEqual(list(wpc_pyth["season"]), [1, 1, 1])
+        self.assertEqual(
+            list(wpc_pyth["pyth_wpc_id"]), ["10_1", "20_1", "30_1"]
+        )
+        # Season 1: 10 won both, 20 lost and drew, 30 drew and lost.
+        self.assertEqual(list(wpc_pyth["win_percentage"]), [1.0, 0.25, 0.25])
+        self.assertEqual(
+            list(wpc_pyth["pythagorean_expectation"]),
+            [16 / 17, 4 / 13, 1 / 10],
+        )
+        self.assertTrue((wpc_pyth["league"] == League.EPL.value).all())
+
+    def test_compute_wpc_pyth_does_not_mutate_input(self):
+        columns = list(self.data.columns)
+        compute_wpc_pyth(data=self.data, league=League.EPL)
+        self.assertEqual(list(self.data.columns), columns)
+
+
+class WpcPythAccumulatorTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        self.games = sample_games()
+        self.accumulator = WpcPythAccumulator(path=self.path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_apply_skips_games_already_applied(self):
+        self.assertEqual(self.accumulator.apply(League.EPL, self.games), 5)
+        self.assertEqual(self.accumulator.apply(League.EPL, self.games), 0)
+
+    def test_incremental_matches_rebuild(self):
+        self.accumulator.apply(League.EPL, self.games.iloc[:2])
+        self.accumulator.apply(League.EPL, self.games.iloc[1:])
+        self.assertTrue(self.accumulator.verify(League.EPL, self.games))
+        self.assertFalse(
+            self.accumulator.verify(League.EPL, self.games.iloc[:2])
+        )
+
+    def test_wpc_pyth_matches_compute_wpc_pyth(self):
+        season_one = self.games[self.games["season"] == 1]
+        self.accumulator.apply(League.EPL, season_one)
+        expected = compute_wpc_pyth(season_one, league=League.EPL)
+        wpc_pyth = self.accumulator.wpc_pyth(league=League.EPL)
+        columns = ["team", "season", "win_percentage", "pyth_wpc_id"]
+        pd.testing.assert_frame_equal(
+            wpc_pyth[columns],
+            expected[columns].sort_values("team").reset_index(drop=True),
+        )
+
+    def test_corrected_score_replaces_old_contribution(self):
+        self.accumulator.apply(League.EPL, self.games)
+        corrected = self.games.copy()
+        # 2-1 home win corrected to a 2-2 draw.
+        corrected.loc[0, ["away_goal", "result"]] = [2.0, 0]
+        self.assertEqual(self.accumulator.apply(League.EPL, corrected), 1)
+        self.assertTrue(self.accumulator.verify(League.EPL, corrected))
+        self.assertEqual(self.accumulator.apply(League.EPL, corrected), 0)
+
+    def test_totals_persist_across_instances(self):
+        self.accumulator.apply(League.EPL, self.games.iloc[:3])
+        # Applying only updates the totals in memory.
+        self.assertEqual(list(self.path.iterdir()), [])
+        self.accumulator.save()
+        self.assertEqual(
+            sorted(path.name for path in self.path.iterdir()),
+            ["epl_games.csv", "epl_totals.csv"],
+        )
+        reloaded = WpcPythAccumulator(path=self.path)
+        corrected = self.games.copy()
+        corrected.loc[1, ["home_goal", "result"]] = [2.0, 1]
+        self.assertEqual(reloaded.apply(League.EPL, corrected), 3)
+        self.assertTrue(reloaded.verify(League.EPL, corrected))
+
+
+class AsOfWpcPythTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.games = sample_games()
+
+    def test_only_earlier_games_are_used(self):
+        data = add_asof_wpc_pyth(data=self.games, history=self.games)
+        # Nobody has played at the first game of each season.
+        for row in [0, 3]:
+            self.assertEqual(data["home_win_percentage"][row], ASOF_PRIOR)
+            self.assertEqual(data["away_win_percentage"][row], ASOF_PRIOR)
+        # Second game: 20 lost 1-2 in its only game, 30 has not played.
+        self.assertEqual(data["home_win_percentage"][1], 0.0)
+        self.assertEqual(data["home_pythagorean_expectation"][1], 1 / 5)
+        self.assertEqual(data["away_win_percentage"][1], ASOF_PRIOR)
+        # Second game of season 2 ignores season 1 and sees only the draw.
+        self.assertEqual(data["home_win_percentage"][4], 0.5)
+        self.assertEqual(data["away_win_percentage"][4], 0.5)
+
+    def test_after_last_game_matches_season_totals(self):
+        season_one = self.games[self.games["season"] == 1]
+        fixture = pd.DataFrame(
+            {
+                "season": [1],
+                "date": [pd.Timestamp("2020-09-01")],
+                "home_team": [10],
+                "away_team": [20],
+            }
+        )
+        data = add_asof_wpc_pyth(data=fixture, history=season_one)
+        totals = compute_wpc_pyth(season_one, league=League.EPL)
+        totals = totals.set_index("team")
+        self.assertEqual(
+            data["home_win_percentage"][0], totals["win_percentage"][10]
+        )
+        self.assertEqual(
+            data["away_pythagorean_expectation"][0],
+            totals["pythagorean_expectation"][20],
+        )
+
+    def test_real_season_sees_only_earlier_results(self):
+        data = EPLData(datastore=DataStore.CSV).load()
+        season = data[data["season"] == 20232024].reset_index(drop=True)
+        # Stored dates are day first, e.g. the opener on 11/08/2023.
+        self.assertEqual(season["date"].min(), pd.Timestamp("2023-08-11"))
+        self.assertEqual(season["date"].max(), pd.Timestamp("2024-05-19"))
+
+        asof = add_asof_wpc_pyth(data=season, history=season)
+
+        columns = [
+            f"{side}_{col}"
+            for side in ["home", "away"]
+            for col in ["win_percentage", "pythagorean_expectation"]
+        ]
+        for day, games in asof.groupby("date"):
+            # Dropping the day's own and later results must change nothing.
+            earlier = season[season["date"] < day]
+            expected = add_asof_wpc_pyth(
+                data=season.loc[games.index], history=earlier
+            )
+            np.testing.assert_allclose(games[columns], expected[columns])
+
+
+class LoadWpcPythTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = unittest.mock.patch.object(
+            CSVUtils, "wpc_pyth_base_path", Path(self.tmp_dir.name)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.addCleanup(WPC_PYTH_CACHE.clear, League.EPL)
+        WPC_PYTH_CACHE.clear(League.EPL)
+
+    def _persist(self, last_update: datetime, team: int = 1) -> None:
+        season = season_to_int(Season.CURRENT)
+        CSVUtils().update_wpc_pyth(
+            data=pd.DataFrame(
+                {
+                    "team": [team],
+                    "season": [season],
+                    "league": [League.EPL.value],
+                    "win_percentage": [0.5],
+                    "pythagorean_expectation": [0.5],
+                    "last_update": [last_update],
+                    "pyth_wpc_id": [f"{team}_{season}"],
+                }
+            ),
+            league=League.EPL,
+        )
+
+    def test_storage_hit_is_promoted_to_memory(self):
+        self._persist(last_update=datetime.now())
+        data = load_wpc_pyth(league=League.EPL, datastore=DataStore.CSV)
+        self.assertEqual(list(data["team"]), [1])
+        self.assertIs(WPC_PYTH_CACHE.get(League.EPL).data, data)
+        # Served from memory from now on.
+        with unittest.mock.patch.object(CSVUtils, "load_wpc_pyth") as load:
+            load_wpc_pyth(league=League.EPL, datastore=DataStore.CSV)
+            load.assert_not_called()
+
+    def test_teams_yet_to_play_get_the_prior(self):
+        team_ids = get_team_directory(datastore=DataStore.CSV).ids()
+        self._persist(last_update=datetime.now(), team=team_ids["ARS"])
+        data = pd.DataFrame(
+            {
+                "home_team": [team_ids["ARS"]],
+                "away_team": [team_ids["AVL"]],
+                "season": [season_to_int(Season.CURRENT)],
+            }
+        )
+        data = add_wpc_pyth(
+            data=data, league=League.EPL, datastore=DataStore.CSV
+        )
+        self.assertEqual(data["home_win_percentage"][0], 0.5)
+        self.assertEqual(data["away_win_percentage"][0], ASOF_PRIOR)
+        self.assertEqual(data["away_pythagorean_expectation"][0], ASOF_PRIOR)
+
+        features = TeamFeatures(
+            version=1,
+            season=season_to_int(Season.CURRENT),
+            team_ids={"T1": 1, "T2": 2},
+            wpc_pyth={1: (0.75, 0.6)},
+        )
+        vector = features.vector(
+            "T1",
+            "T2",
+            columns=["home_win_percentage", "away_pythagorean_expectation"],
+        )
+        self.assertEqual(list(vector), [0.75, ASOF_PRIOR])
+
+    def test_other_missing_teams_raise(self):
+        team_ids = get_team_directory(datastore=DataStore.CSV).ids()
+        self._persist(last_update=datetime.now(), team=team_ids["ARS"])
+        other_league = get_team_directory(datastore=DataStore.CSV).ids(
+            league="bundesliga"
+        )
+        for away_team, season in [
+            # Not a team of the league.
+            (next(iter(other_league.values())), Season.CURRENT),
+            # Not a team yet to play, the season is over.
+            (team_ids["AVL"], Season.S_2018_2019),
+        ]:
+            data = pd.DataFrame(
+                {
+                    "home_team": [team_ids["ARS"]],
+                    "away_team": [away_team],
+                    "season": [season_to_int(season)],
+                }
+            )
+            with self.assertRaisesRegex(ValueError, "wpc/pyth found for"):
+                add_wpc_pyth(
+                    data=data, league=League.EPL, datastore=DataStore.CSV
+                )
+
+    def test_stale_storage_is_a_miss(self):
+        self._persist(
+            last_update=datetime.now() - WPC_PYTH_CACHE_TIMEOUT - timedelta(1)
+        )
+        self.assertIsNone(
+            load_wpc_pyth(league=League.EPL, datastore=DataStore.CSV)
+        )
+
+    def test_missing_storage_is_a_miss(self):
+        self.assertIsNone(
+            load_wpc_pyth(league=League.EPL, datastore=DataStore.CSV)
+        )
+
+
+class WpcPythCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = WpcPythCache()
+        self.data = pd.DataFrame(
+            {"team": [1], "last_update": [datetime.now()]}
+        )
+
+    def test_concurrent_refreshes_run_once(self):
+        calls = []
+
+        def slow_refresh():
+            calls.append(1)
+            time.sleep(0.2)
+            return self.data
+
+        snapshots = []
+        threads = [
+            threading.Thread(
+                target=lambda: snapshots.append(
+                    self.cache.refresh(League.EPL, slow_refresh, wait=True)
+                )
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({snapshot.version for snapshot in snapshots}), 1)
+        self.assertEqual(self.cache.stats()["refreshes"], 1)
+
+    def test_stale_snapshot_served_while_refreshing(self):
+        stale = self.data.assign(
+            last_update=datetime.now() - WPC_PYTH_CACHE_TIMEOUT - timedelta(1)
+        )
+        old = self.cache.put(League.EPL, stale)
+        release = threading.Event()
+
+        def blocked_refresh():
+            release.wait()
+            return self.data
+
+        self.assertIsNone(self.cache.refresh(League.EPL, blocked_refresh))
+        self.assertIs(self.cache.lookup(League.EPL), old)
+        release.set()
+        new = self.cache.refresh(League.EPL, lambda: self.data, wait=True)
+
+        self.assertTrue(new.is_fresh())
+        self.assertGreater(new.version, old.version)
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+
+    def test_lookup_counters(self):
+        self.cache.lookup(League.EPL)
+        self.cache.put(League.EPL, self.data)
+        self.cache.lookup(League.EPL)
+        stats = self.cache.stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (1, 1))
+
+    def test_failed_refresh_keeps_snapshot(self):
+        old = self.cache.put(League.EPL, self.data)
+
+        def failing_refresh():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.cache.refresh(League.EPL, failing_refresh, wait=True)
+        self.assertIs(self.cache.get(League.EPL), old)
+        self.assertEqual(self.cache.stats()["refresh_errors"], 1)
@@ -0,0 +1,736 @@
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from freekick.app import create_app
+from freekick.datastore.util import League, Season
+from freekick.service import (
+    FixtureDTO,
+    ProbabilityNotSupportedError,
+    predict_match,
+    predict_match_day,
+    predict_match_probabilities,
+    predict_match_probability,
+    predict_matches,
+)
+from freekick.service import match_day_predictor
+from freekick.service.batcher import MicroBatcher
+from freekick.service.match_predictor import MATCH_CACHE
+from freekick.service.result_cache import ResultCache
+from freekick.service.prediction_matrix import PREDICTION_MATRICES
+from freekick.service.season_simulator import (
+    SeasonState,
+    predict_season,
+    simulate_season,
+)
+from freekick.service import util as service_util
+
+FIXTURES = [
+    FixtureDTO(home_team="ARS", away_team="CHE", attendance=60000),
+    FixtureDTO(home_team="LIV", away_team="MUN", attendance=53000),
+    FixtureDTO(
+        home_team="MCI",
+        away_team="TOT",
+        attendance=55000,
+        match_date="2024-03-02",
+        time="17:30",
+    ),
+]
+
+
+class PredictMatchesTestCase(unittest.TestCase):
+    def test_batch_matches_single_predictions(self):
+        batch = predict_matches(league=League.EPL, fixtures=FIXTURES)
+        single = [
+            predict_match(
+                league=League.EPL,
+                home_team=fixture.home_team,
+                away_team=fixture.away_team,
+                attendance=fixture.attendance,
+                match_date=fixture.match_date,
+                time=fixture.time,
+            )[0]
+            for fixture in FIXTURES
+        ]
+        self.assertEqual(batch, single)
+
+    def test_single_model_call(self):
+        with mock.patch(
+            "freekick.service.match_predictor._predict",
+            wraps=service_util._predict,
+        ) as predict:
+            predictions = predict_matches(league="epl", fixtures=FIXTURES)
+        predict.assert_called_once()
+        self.assertEqual(len(predictions), len(FIXTURES))
+
+    def test_empty_batch(self):
+        self.assertEqual(predict_matches(league="epl", fixtures=[]), [])
+
+
+class CompiledPredictionTestCase(unittest.TestCase):
+    def test_parity_with_full_prediction(self):
+        fixtures = [
+            FixtureDTO(
+                home_team=home,
+                away_team=away,
+                attendance=attendance,
+                match_date=match_date,
+                time=time,
+            )
+            for home, away in [("ARS", "CHE"), ("BUR", "MCI"), ("LUT", "LIV")]
+            for attendance in [None, 0, 25_000.0, 60_000]
+            for match_date in [None, "2024-03-02"]
+            for time in [None, "17:30"]
+        ]
+        outcomes = {"Draw": 0}
+        expected = [
+            outcomes.get(
+                match.predicted_winner,
+                1 if match.predicted_winner == match.home_team else -1,
+            )
+            for match in predict_matches(league="epl", fixtures=fixtures)
+        ]
+        compiled = [
+            service_util._predict_compiled(
+                league=League.EPL, fixture=fixture, season=Season.CURRENT
+            )
+            for fixture in fixtures
+        ]
+        self.assertEqual(compiled, expected)
+
+    def test_falls_back(self):
+        for fixture, season in [
+            # Not in ISO format.
+            (FixtureDTO("ARS", "CHE", 0, match_date="03/02/2024"), None),
+            (FixtureDTO("ARS", "CHE", 0, time="5:30 PM"), None),
+            (FixtureDTO("XXX", "CHE", 0), None),
+            (FixtureDTO("ARS", "CHE", 0), Season.S_2022_2023),
+        ]:
+            self.assertIsNone(
+                service_util._predict_compiled(
+                    league=League.EPL,
+                    fixture=fixture,
+                    season=season or Season.CURRENT,
+                )
+            )
+
+
+class PredictMatchProbabilitiesTestCase(unittest.TestCase):
+    def _predict(self, proba, **kwargs):
+        with mock.patch(
+            "freekick.service.match_predictor._predict_proba",
+            return_value=pd.DataFrame(
+                [proba], columns=["away_win", "draw", "home_win"]
+            ),
+        ):
+            return predict_match_probabilities(
+                league=League.EPL, fixtures=FIXTURES[:1], **kwargs
+            )[0]
+
+    def test_probabilities(self):
+        predictions = predict_match_probabilities(
+            league=League.EPL, fixtures=FIXTURES
+        )
+        self.assertEqual(
+            [p.predicted_winner for p in predictions],
+            [
+                p.predicted_winner
+                for p in predict_matches(league=League.EPL, fixtures=FIXTURES)
+            ],
+        )
+        for prediction in predictions:
+            self.assertAlmostEqual(
+                prediction.home_win + prediction.draw + prediction.away_win,
+                1.0,
+            )
+            self.assertEqual(len(prediction.outcomes), 3)
+
+    def test_single_model_call(self):
+        with mock.patch(
+            "freekick.service.match_predictor._predict_proba",
+            wraps=service_util._predict_proba,
+        ) as model_call:
+            predict_match_probabilities(league=League.EPL, fixtures=FIXTURES)
+        model_call.assert_called_once()
+
+    def test_single_match_paths(self):
+        # Matrix, compiled model and full path give the same probabilities.
+        expected = predict_match_probabilities(
+            league=League.EPL, fixtures=FIXTURES
+        )
+        for compiled in (True, False):
+            with mock.patch(
+                "freekick.service.match_predictor._predict_proba_compiled",
+                wraps=(
+                    service_util._predict_proba_compiled
+                    if compiled
+                    else lambda **kwargs: None
+                ),
+            ):
+                predictions = [
+                    predict_match_probability(
+                        league=League.EPL,
+                        home_team=fixture.home_team,
+                        away_team=fixture.away_team,
+                        attendance=fixture.attendance,
+                        match_date=fixture.match_date,
+                        time=fixture.time,
+                    )[0]
+                    for fixture in FIXTURES
+                ]
+            self.assertEqual(predictions, expected)
+
+    def test_top_k_and_threshold(self):
+        prediction = self._predict([0.2, 0.3, 0.5])
+        self.assertEqual(prediction.predicted_winner, "ARS")
+        self.assertEqual(
+            [outcome.outcome for outcome in prediction.outcomes],
+            ["home_win", "draw", "away_win"],
+        )
+        prediction = self._predict([0.2, 0.3, 0.5], top_k=1)
+        self.assertEqual(
+            [outcome.outcome for outcome in prediction.outcomes], ["home_win"]
+        )
+        prediction = self._predict([0.2, 0.3, 0.5], threshold=0.25)
+        self.assertEqual(
+            [outcome.outcome for outcome in prediction.outcomes],
+            ["home_win", "draw"],
+        )
+        self.assertEqual(prediction.away_win, 0.2)
+
+    def test_invalid_filter(self):
+        with self.assertRaises(ValueError):
+            predict_match_probabilities(
+                league=League.EPL, fixtures=FIXTURES, top_k=4
+            )
+        with self.assertRaises(ValueError):
+            predict_match_probabilities(
+                league=League.EPL, fixtures=FIXTURES, threshold=1.5
+            )
+
+    def test_model_without_probabilities(self):
+        with mock.patch.object(
+            service_util, "_get_learner", return_value=object()
+        ):
+            with self.assertRaises(ProbabilityNotSupportedError):
+                predict_match_probabilities(
+                    league=League.EPL, fixtures=FIXTURES
+                )
+
+
+class MicroBatcherTestCase(unittest.TestCase):
+    def _submit_concurrently(self, batcher, items):
+        results = {}
+
+        def submit(item):
+            try:
+                results[item] = batcher.submit(item, timeout=10)
+            except ValueError as e:
+                results[item] = e
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in items]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_requests_coalesced(self):
+        batches = []
+        release = threading.Event()
+
+        def handler(items):
+            # Hold the first batch so the other requests queue up.
+            release.wait(timeout=10)
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(
+            handler=handler, max_batch_size=8, max_wait=0.05
+        )
+        threading.Timer(0.2, release.set).start()
+        results = self._submit_concurrently(batcher, range(10))
+
+        self.assertEqual(results, {i: i * 2 for i in range(10)})
+        self.assertLess(len(batches), 10)
+        self.assertTrue(all(len(batch) <= 8 for batch in batches))
+        stats = batcher.stats()
+        self.assertEqual(stats["batches"], len(batches))
+        self.assertEqual(stats["items"], 10)
+        self.assertEqual(stats["max_batch_size"], max(map(len, batches)))
+
+    def test_failure_isolated(self):
+        def handler(items):
+            if 3 in items:
+                raise ValueError("invalid item")
+            return list(items)
+
+        batcher = MicroBatcher(
+            handler=handler, max_batch_size=8, max_wait=0.05
+        )
+        results = self._submit_concurrently(batcher, range(5))
+
+        self.assertIsInstance(results.pop(3), ValueError)
+        self.assertEqual(results, {i: i for i in (0, 1, 2, 4)})
+
+    def test_timed_out_request_handled_directly(self):
+        release = threading.Event()
+        handled = []
+
+        def handler(items):
+            if threading.current_thread().name == "micro-batcher":
+                # A stuck batch.
+                release.wait(timeout=10)
+            handled.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(
+            handler=handler, max_batch_size=8, max_wait=0.01, timeout=0.05
+        )
+        self.addCleanup(release.set)
+        self.assertEqual(batcher.submit(1), 2)
+        self.assertEqual(batcher.submit(2), 4)
+        self.assertEqual(batcher.stats()["timeouts"], 2)
+
+        release.set()
+        self.assertEqual(batcher.submit(3, timeout=10), 6)
+        # The second item was dropped from its batch once timed out.
+        self.assertFalse(any(2 in items for items in handled[2:]))
+
+    def test_batching_disabled(self):
+        batcher = MicroBatcher(handler=lambda items: items, max_batch_size=1)
+        self.assertEqual(batcher.submit(1), 1)
+        self.assertEqual(batcher.stats()["batches"], 0)
+
+    def test_predict_match_batched(self):
+        MATCH_CACHE.clear()
+        fixture = FIXTURES[2]
+        with (
+            mock.patch(
+                "freekick.service.match_predictor._predict_compiled",
+                return_value=None,
+            ),
+            mock.patch(
+                "freekick.service.match_predictor.predict_matches",
+                wraps=predict_matches,
+            ) as batch,
+        ):
+            prediction = predict_match(
+                home_team=fixture.home_team,
+                away_team=fixture.away_team,
+                league=League.EPL,
+                attendance=fixture.attendance,
+                match_date=fixture.match_date,
+                time=fixture.time,
+            )
+        batch.assert_called_once()
+        self.assertEqual(
+            prediction,
+            predict_matches(league=League.EPL, fixtures=[fixture]),
+        )
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+        cache.put("a", version=1, value="A")
+        cache.put("b", version=1, value="B")
+        cache.get("a", version=1)
+        cache.put("c", version=1, value="C")
+        self.assertIsNone(cache.get("b", version=1))
+        self.assertEqual(cache.get("a", version=1), "A")
+        self.assertEqual(cache.get("c", version=1), "C")
+        self.assertEqual(
+            cache.stats(),
+            {
+                "hits": 3,
+                "misses": 1,
+                "expired": 0,
+                "outdated": 0,
+                "evictions": 1,
+                "size": 2,
+            },
+        )
+
+    def test_expired_and_outdated(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+        cache.put("a", version=1, value="A")
+        self.assertIsNone(cache.get("a", version=2))
+        cache.put("a", version=1, value="A")
+        with mock.patch(
+            "freekick.service.result_cache.time.monotonic",
+            return_value=time.monotonic() + 61,
+        ):
+            self.assertIsNone(cache.get("a", version=1))
+        stats = cache.stats()
+        self.assertEqual((stats["outdated"], stats["expired"]), (1, 1))
+        self.assertEqual(stats["size"], 0)
+
+
+class MatchCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        MATCH_CACHE.clear()
+
+    def _predict_match(self, attendance, **kwargs):
+        return predict_match(
+            league=League.EPL,
+            home_team="MCI",
+            away_team="TOT",
+            attendance=attendance,
+            match_date="2024-03-02",
+            time="17:30",
+            **kwargs,
+        )
+
+    def test_repeated_request_cached(self):
+        with mock.patch(
+            "freekick.service.match_predictor._predict_compiled",
+            wraps=service_util._predict_compiled,
+        ) as model_call:
+            first = self._predict_match(55_100)
+            # Same attendance bucket.
+            second = self._predict_match(55_900)
+            self._predict_match(56_000)
+        self.assertEqual(first, second)
+        self.assertEqual(model_call.call_count, 2)
+
+    def test_invalidated_by_model_refresh(self):
+        self._predict_match(55_000)
+        with mock.patch(
+            "freekick.service.match_predictor._prediction_version",
+            return_value=("new model", 1),
+        ):
+            self._predict_match(55_000)
+        self.assertEqual(MATCH_CACHE.stats()["outdated"], 1)
+
+
+class PredictionMatrixTestCase(unittest.TestCase):
+    def setUp(self):
+        PREDICTION_MATRICES.clear()
+        MATCH_CACHE.clear()
+
+    def test_matches_full_prediction(self):
+        fixtures = [
+            FixtureDTO(home_team=home, away_team=away, attendance=attendance)
+            for home, away in [("ARS", "CHE"), ("BUR", "MCI"), ("LUT", "LIV")]
+            for attendance in [None, 0]
+        ]
+        expected = predict_matches(league="epl", fixtures=fixtures)
+        with mock.patch(
+            "freekick.service.match_predictor.predict_matches"
+        ) as full_prediction:
+            predictions = [
+                predict_match(
+                    league="epl",
+                    home_team=fixture.home_team,
+                    away_team=fixture.away_team,
+                    attendance=fixture.attendance,
+                )[0]
+                for fixture in fixtures
+            ]
+        full_prediction.assert_not_called()
+        self.assertEqual(predictions, expected)
+
+    def test_custom_context_falls_back(self):
+        with (
+            mock.patch(
+                "freekick.service.match_predictor._predict_compiled",
+                return_value=None,
+            ),
+            mock.patch(
+                "freekick.service.match_predictor.predict_matches",
+                side_effect=lambda league, fixtures, season: [
+                    mock.Mock() for _ in fixtures
+                ],
+            ) as full_prediction,
+        ):
+            predict_match(
+                league="epl", home_team="ARS", away_team="CHE", attendance=1
+            )
+            predict_match(
+                league="epl",
+                home_team="ARS",
+                away_team="CHE",
+                attendance=0,
+                match_date="2024-03-02",
+            )
+            # Not a current season team.
+            predict_match(
+                league="epl", home_team="LEE", away_team="CHE", attendance=0
+            )
+        self.assertEqual(full_prediction.call_count, 3)
+
+    def test_rebuilt_when_outdated(self):
+        matrix = PREDICTION_MATRICES.get(League.EPL)
+        self.assertIs(PREDICTION_MATRICES.get(League.EPL), matrix)
+        with mock.patch(
+            "freekick.service.prediction_matrix._prediction_version",
+            return_value=("new", "version"),
+        ):
+            rebuilt = PREDICTION_MATRICES.get(League.EPL)
+        self.assertIsNot(rebuilt, matrix)
+        np.testing.assert_array_equal(rebuilt.outcomes, matrix.outcomes)
+
+
+class PredictMatchDayTestCase(unittest.TestCase):
+    def setUp(self):
+        match_day_predictor.clear_match_day_cache()
+
+    def test_predictions_cached(self):
+        with mock.patch(
+            "freekick.service.match_day_predictor.predict_matches",
+            wraps=match_day_predictor.predict_matches,
+        ) as predict:
+            first = predict_match_day(league="epl", gameweek=1)
+            second = predict_match_day(league="epl", gameweek=1)
+        predict.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual(first[0].home_team, "BUR")
+
+    def test_cache_invalidated_by_new_features(self):
+        predict_match_day(league=League.EPL, gameweek=1)
+        with (
+            mock.patch.object(
+                match_day_predictor,
+                "_features_version",
+                return_value=("new", "version"),
+            ),
+            mock.patch(
+                "freekick.service.match_day_predictor.predict_matches",
+                return_value=[],
+            ) as predict,
+        ):
+            predict_match_day(league=League.EPL, gameweek=1)
+        predict.assert_called_once()
+
+    def test_cache_invalidated_at_midnight(self):
+        predict_match_day(league=League.EPL, gameweek=1)
+        tomorrow = date.today() + timedelta(days=1)
+        with (
+            mock.patch.object(match_day_predictor, "date") as mock_date,
+            mock.patch(
+                "freekick.service.match_day_predictor.predict_matches",
+                return_value=[],
+            ) as predict,
+        ):
+            mock_date.today.return_value = tomorrow
+            predict_match_day(league=League.EPL, gameweek=1)
+        predict.assert_called_once()
+
+
+class SimulateSeasonTestCase(unittest.TestCase):
+    def setUp(self):
+        # A leads B by a point, C is far behind. A and B play each other.
+        self.state = SeasonState(
+            teams=np.array(["A", "B", "C"]),
+            points=np.array([10.0, 9.0, 0.0]),
+            goal_difference=np.array([5.0, 5.0, -10.0]),
+            home=np.array([1]),
+            away=np.array([0]),
+            proba=np.array([[0.25, 0.25, 0.5]]),
+        )
+
+    def test_certain_results(self):
+        state = SeasonState(
+            **{**self.state.__dict__, "proba": np.array([[0.0, 0.0, 1.0]])}
+        )
+        positions, points = simulate_season(state, simulations=100, seed=0)
+        np.testing.assert_array_equal(points, [10, 12, 0])
+        np.testing.assert_array_equal(positions[:, 0], [0, 100, 0])
+        np.testing.assert_array_equal(positions[2], [0, 0, 100])
+
+    def test_probabilities(self):
+        positions, points = simulate_season(
+            self.state, simulations=25_000, seed=0
+        )
+        # B wins the league only by winning the game, a draw leaves A top.
+        self.assertAlmostEqual(positions[1, 0] / 25_000, 0.5, delta=0.02)
+        self.assertAlmostEqual(points[0], 10 + 3 * 0.25 + 0.25, delta=0.05)
+        np.testing.assert_array_equal(positions.sum(axis=0), 25_000)
+
+    def test_reproducible(self):
+        first = simulate_season(self.state, simulations=25_000, seed=7)
+        second = simulate_season(
+            self.state, simulations=25_000, seed=7, workers=2
+        )
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+    def test_predict_season(self):
+        prediction = predict_season(
+            league="epl", simulations=1000, from_gameweek=40, workers=1
+        )
+        self.assertEqual(len(prediction.teams), 20)
+        self.assertAlmostEqual(
+            sum(team.title for team in prediction.teams), 1.0
+        )
+        self.assertAlmostEqual(
+            sum(team.relegation for team in prediction.teams), 3.0
+        )
+
+
+class MatchBatchApiTestCase(unittest.TestCase):
+    def setUp(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        self.client = app.test_client()
+
+    def test_batch_prediction(self):
+        response = self.client.post(
+            "/api/match/batch",
+            json={
+                "league": "epl",
+                "fixtures": [
+                    {"home_team": f.home_team, "away_team": f.away_team}
+                    for f in FIXTURES
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [match["home_team"] for match in response.json],
+            [fixture.home_team for fixture in FIXTURES],
+        )
+
+    def test_batch_size_limit(self):
+        fixture = {"home_team": "ARS", "away_team": "CHE"}
+        with mock.patch("freekick.api.match.MAX_BATCH_SIZE", 1):
+            response = self.client.post(
+                "/api/match/batch",
+                json={"league": "epl", "fixtures": [fixture, fixture]},
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_league(self):
+        response = self.client.post(
+            "/api/match/batch",
+            json={
+                "league": "xyz",
+                "fixtures": [{"home_team": "ARS", "away_team": "CHE"}],
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_teams(self):
+        for url in ["/api/match/batch", "/api/match/batch/probability"]:
+            response = self.client.post(
+                url,
+                json={
+                    "league": "epl",
+                    "fixtures": [
+                        {"home_team": "ARS", "away_team": "CHE"},
+                        {"home_team": "XYZ", "away_team": "CHE"},
+                    ],
+                },
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(
+                "fixtures[1].home_team=XYZ", response.json["message"]
+            )
+            self.assertNotIn("fixtures[0]", response.json["message"])
+
+
+class MatchProbabilityApiTestCase(unittest.TestCase):
+    def setUp(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        self.client = app.test_client()
+
+    def test_match_probability(self):
+        response = self.client.post(
+            "/api/match/probability",
+            query_string={
+                "league": "epl",
+                "home_team": "ARS",
+                "away_team": "CHE",
+                "top_k": 2,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        (prediction,) = response.json
+        self.assertEqual(len(prediction["outcomes"]), 2)
+        self.assertIn("home_win", prediction)
+
+    def test_batch_probability(self):
+        response = self.client.post(
+            "/api/match/batch/probability",
+            json={
+                "league": "epl",
+                "threshold": 0.5,
+                "fixtures": [
+                    {"home_team": f.home_team, "away_team": f.away_team}
+                    for f in FIXTURES
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), len(FIXTURES))
+
+    def test_invalid_top_k(self):
+        response = self.client.post(
+            "/api/match/probability",
+            query_string={
+                "league": "epl",
+                "home_team": "ARS",
+                "away_team": "CHE",
+                "top_k": 0,
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class MetricsApiTestCase(unittest.TestCase):
+    def test_metrics(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        response = app.test_client().get("/api/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("batches", response.json["match_batcher"])
+        self.assertIn("hits", response.json["match_cache"])
+        self.assertIn("wpc_pyth_cache", response.json)
+
+
+class GameweekApiTestCase(unittest.TestCase):
+    def setUp(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        self.client = app.test_client()
+
+    def test_gameweek_prediction(self):
+        response = self.client.post(
+            "/api/gameweek/", json={"league": "epl", "gameweek": 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 10)
+
+    def test_unknown_gameweek(self):
+        response = self.client.post(
+            "/api/gameweek/", json={"league": "epl", "gameweek": 99}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class SeasonSimulationApiTestCase(unittest.TestCase):
+    def setUp(self):
+        app = create_app(mode="DEVELOPMENT", init_wpc_pyth=False)
+        self.client = app.test_client()
+
+    def test_simulation(self):
+        with mock.patch(
+            "freekick.api.season.predict_season", wraps=predict_season
+        ) as predict:
+            response = self.client.get(
+                "/api/season/epl/simulation?simulations=100&from_gameweek=40"
+            )
+        # Simulated in the server process, never in a forked pool.
+        self.assertEqual(predict.call_args.kwargs["workers"], 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["simulations"], 100)
+        self.assertEqual(len(response.json["teams"]), 20)
+
+    def test_simulations_limit(self):
+        response = self.client.get(
+            "/api/season/epl/simulation?simulations=100000000"
+        )
+        self.assertEqual(response.status_code, 400)